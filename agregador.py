@@ -0,0 +1,179 @@
+from array import array # Para guardar colunas de números de forma compacta
+from bisect import bisect_left, insort # Para manter o ranking em ordem sem ordenar tudo de novo
+from fractions import Fraction # Para a média de eficiência sair exata
+from operator import truediv # A divisão como função, para usar no map
+from dinheiro import custo_total, custos_totais, dividir_arredondando # O custo de cada um e as divisões de centavos, arredondados sempre do mesmo jeito
+import ranking # Para pegar os piores de um ranking sem ordenar de novo
+
+class Agregados:
+    """
+    Faz todas as contas que os relatórios precisam numa passada só pelos dados:
+    somas e contagens por área, totais, média de eficiência e o ranking de
+    eficiência. Depois disso, cada opção do menu só lê o resultado pronto.
+    Quando poucos funcionários mudam, as contas são corrigidas só para eles.
+    As somas são em centavos inteiros, então nunca perdem centavos. A eficiência
+    (custo em centavos / anos) fica num float só para ordenar o ranking: como ela
+    sai de uma divisão de inteiros, empates e ordem são os mesmos da conta exata.
+    """
+    def __init__(self, armazem, calcular_custo_total):
+        self.armazem = armazem # De onde vieram os dados
+        self.versao = armazem.versao # Qual versão dos dados foi usada (se mudar, as contas ficam velhas)
+        self.calcular_custo_total = calcular_custo_total # Como calcular o custo de uma pessoa (em centavos)
+
+        quantidade_departamentos = len(armazem.departamentos) # Quantas áreas diferentes existem
+        self.somas_salario = array('q', [0]) * quantidade_departamentos # Soma dos salários de cada área, em centavos
+        self.contagens = array('l', [0]) * quantidade_departamentos # Quantos funcionários tem cada área
+        if calcular_custo_total is custo_total: # O custo de sempre: a coluna inteira de uma vez, sem uma chamada por pessoa
+            custos = array('q', custos_totais(armazem.salarios)) # Custo de cada funcionário, em centavos
+        else:
+            custos = array('q', map(calcular_custo_total, armazem.salarios))
+        anos = array('l', [experiencia or 1 for experiencia in armazem.experiencias]) # Anos de experiência (nunca negativos; no mínimo 1 para não dividir por zero)
+        self.eficiencias = array('d', map(truediv, custos, anos)) # Eficiência de cada funcionário
+        self.total_salarios = 0 # Soma de todos os salários, em centavos
+        self.custos_por_experiencia = {} # Anos de experiência -> soma dos custos de quem entra nas contas (para a média exata)
+        validos = [] # Quem tem salário ou experiência (os outros ficam de fora das contas de eficiência)
+
+        codigos, salarios, experiencias = armazem.codigos_departamento, armazem.salarios, armazem.experiencias
+        por_experiencia = self.custos_por_experiencia
+        for i in armazem.posicoes_em_ordem(): # Uma passada só, na ordem da planilha (para os empates do ranking)
+            codigo, salario = codigos[i], salarios[i]
+            self.somas_salario[codigo] += salario # Soma o salário na área certa
+            self.contagens[codigo] += 1 # Conta mais um funcionário na área
+            self.total_salarios += salario # Soma no total geral
+            if salario == 0 and experiencias[i] == 0: # Sem salário nem experiência não entra nas contas de eficiência
+                continue
+            validos.append(i) # Guarda a posição de quem vale
+            por_experiencia[anos[i]] = por_experiencia.get(anos[i], 0) + custos[i] # Soma para a média
+
+        self.ranking = sorted(validos, key=self.eficiencias.__getitem__) # Do mais eficiente para o menos eficiente (empates na ordem da planilha)
+        self._ranking_por_departamento = None # Ranking de cada área, montado só se alguém pedir
+
+    def atualizado(self, armazem):
+        """Diz se estas contas ainda valem para esses dados."""
+        return armazem is self.armazem and armazem.versao == self.versao
+
+    def _eficiencia(self, salario, experiencia):
+        """Custo por ano de experiência, em centavos (no mínimo 1 ano para não dividir por zero)."""
+        return self.calcular_custo_total(salario) / max(experiencia, 1)
+
+    def eficiencia_exata(self, i):
+        """A eficiência do funcionário da posição i sem arredondar nada (uma fração de centavos)."""
+        return Fraction(self.calcular_custo_total(self.armazem.salarios[i]), max(self.armazem.experiencias[i], 1))
+
+    def eficiencia_em_centavos(self, i):
+        """A eficiência do funcionário da posição i arredondada para centavos (para mostrar)."""
+        eficiencia = self.eficiencias[i]
+        if eficiencia >= 0: # O float veio de uma divisão de inteiros por poucos anos: fica longe demais do meio centavo para errar o arredondamento
+            return int(eficiencia + 0.5)
+        return dividir_arredondando(self.calcular_custo_total(self.armazem.salarios[i]), max(self.armazem.experiencias[i], 1))
+
+    def _somar_custo(self, salario, experiencia, sinal):
+        """Soma (sinal 1) ou tira (sinal -1) o custo de alguém da soma da sua faixa de experiência."""
+        anos = max(experiencia, 1)
+        self.custos_por_experiencia[anos] = self.custos_por_experiencia.get(anos, 0) + sinal * self.calcular_custo_total(salario)
+
+    def _chave_ranking(self, i):
+        """Como o ranking é ordenado: pela eficiência e, nos empates, pela linha na planilha (não pelo lugar nas colunas)."""
+        return (self.eficiencias[i], self.armazem.posicoes_planilha[i])
+
+    def adicionar_linha(self, i):
+        """Coloca nas contas o funcionário da posição i (depois que ele entrou ou mudou no armazém)."""
+        armazem = self.armazem
+        codigo, salario, experiencia = armazem.codigos_departamento[i], armazem.salarios[i], armazem.experiencias[i]
+        if codigo >= len(self.contagens): # Apareceu uma área nova
+            faltam = codigo + 1 - len(self.contagens)
+            self.somas_salario.extend([0] * faltam)
+            self.contagens.extend([0] * faltam)
+        eficiencia = self._eficiencia(salario, experiencia)
+        if i == len(self.eficiencias): # Funcionário novo no fim das colunas
+            self.eficiencias.append(eficiencia)
+        else:
+            self.eficiencias[i] = eficiencia
+        self.somas_salario[codigo] += salario
+        self.contagens[codigo] += 1
+        self.total_salarios += salario
+        if salario == 0 and experiencia == 0: # Fica fora das contas de eficiência
+            return
+        self._somar_custo(salario, experiencia, 1)
+        insort(self.ranking, i, key=self._chave_ranking) # Encaixa no lugar certo do ranking
+        if self._ranking_por_departamento is not None: # Se o ranking por área já existe, mantém ele também
+            while codigo >= len(self._ranking_por_departamento): # Área nova
+                self._ranking_por_departamento.append([])
+            insort(self._ranking_por_departamento[codigo], i, key=self._chave_ranking)
+
+    def remover_linha(self, i):
+        """Tira das contas o funcionário da posição i (antes de ele sair ou mudar no armazém)."""
+        armazem = self.armazem
+        codigo, salario, experiencia = armazem.codigos_departamento[i], armazem.salarios[i], armazem.experiencias[i]
+        self.somas_salario[codigo] -= salario
+        self.contagens[codigo] -= 1
+        self.total_salarios -= salario
+        if salario == 0 and experiencia == 0: # Ele não estava nas contas de eficiência
+            return
+        self._somar_custo(salario, experiencia, -1)
+        chave = self._chave_ranking(i)
+        del self.ranking[bisect_left(self.ranking, chave, key=self._chave_ranking)] # Acha ele no ranking e tira
+        if self._ranking_por_departamento is not None: # Tira do ranking da área também
+            ranking_area = self._ranking_por_departamento[codigo]
+            del ranking_area[bisect_left(ranking_area, chave, key=self._chave_ranking)]
+
+    def reordenar_departamentos(self, ordem):
+        """Acompanha a troca dos códigos das áreas no armazém ('ordem' são os códigos velhos, na ordem nova)."""
+        somas, contagens = self.somas_salario, self.contagens # Áreas novas demais ainda não têm contas: ficam com zero
+        self.somas_salario = array('q', [somas[velho] if velho < len(somas) else 0 for velho in ordem])
+        self.contagens = array('l', [contagens[velho] if velho < len(contagens) else 0 for velho in ordem])
+        if self._ranking_por_departamento is not None:
+            antigos = self._ranking_por_departamento
+            self._ranking_por_departamento = [antigos[velho] if velho < len(antigos) else [] for velho in ordem]
+
+    def sincronizar(self):
+        """Marca que as contas já acompanham a versão atual dos dados."""
+        self.versao = self.armazem.versao
+
+    def media_eficiencia(self):
+        """
+        Média exata (uma fração de centavos) do custo por ano de experiência de quem entra nas contas.
+        Soma as faixas de experiência (poucas) em vez de cada pessoa, então não perde nada nem demora.
+        """
+        soma = sum(Fraction(custos, anos) for anos, custos in self.custos_por_experiencia.items())
+        return soma / len(self.ranking)
+
+    def melhor_eficiencia(self):
+        """O menor custo por ano de experiência (exato)."""
+        return self.eficiencia_exata(self.ranking[0])
+
+    def melhores(self):
+        """Quem empatou no melhor custo-benefício, na ordem da planilha (o começo do ranking)."""
+        melhor = self.melhor_eficiencia()
+        resultado = []
+        for i in self.ranking:
+            if self.eficiencia_exata(i) != melhor: # Acabaram os empatados (compara exato com exato: o float quase nunca é igual à fração)
+                break
+            resultado.append(i)
+        return resultado
+
+    def piores(self, quantidade):
+        """Os menos eficientes primeiro, com os empatados na ordem da planilha."""
+        return ranking.piores(self.ranking, self.eficiencias, quantidade)
+
+    def ranking_departamentos(self):
+        """
+        Um ranking de eficiência para cada área (índice de ordem por departamento).
+        É montado só na primeira vez que alguém pede, repartindo o ranking geral
+        (que já está em ordem, então não precisa ordenar nada), e depois é mantido
+        junto com o ranking geral.
+        """
+        if self._ranking_por_departamento is None: # Primeira vez: monta
+            por_departamento = [[] for _ in self.contagens] # Uma lista para cada área
+            codigos = self.armazem.codigos_departamento
+            for i in self.ranking: # Já vem em ordem, então cada lista também fica em ordem
+                por_departamento[codigos[i]].append(i)
+            self._ranking_por_departamento = por_departamento
+        return self._ranking_por_departamento
+
+    def piores_do_departamento(self, codigo, quantidade):
+        """Os menos eficientes de uma área, sem ordenar nada."""
+        ranking_departamentos = self.ranking_departamentos()
+        if codigo >= len(ranking_departamentos): # Área sem ninguém nas contas
+            return []
+        return ranking.piores(ranking_departamentos[codigo], self.eficiencias, quantidade)
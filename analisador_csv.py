@@ -1,26 +1,121 @@
 import csv # Para ler e escrever arquivos de tabela (CSV)
 import urllib.request # Para acessar coisas na internet, como planilhas do Google
 import io # Para trabalhar com textos como se fossem arquivos
+import hashlib # Para dar um nome curto à cópia salva de um link qualquer
+from array import array # Para guardar onde cada linha da planilha nova está nas colunas, sem um objeto por linha
+from operator import lt # Para conferir, sem um laço Python, se as colunas seguem a ordem da planilha
+from fractions import Fraction # Para contas com dinheiro que não perdem centavos
+import dinheiro # O dinheiro fica em centavos inteiros, com arredondamento certinho
+from agregador import Agregados # As contas de todos os relatórios, feitas numa passada só
+from cenarios import SimuladorCenarios # Muitos cenários de economia de uma vez
+import ranking # Para mostrar o ranking em páginas
+from armazem_funcionarios import ArmazemFuncionarios # Onde os funcionários ficam guardados em colunas
+from instrumentacao import ETAPA_DESLIGADA, do_ambiente as medicoes_do_ambiente # Medições opcionais de cada etapa
+
+COLUNAS_OBRIGATORIAS = ["nome", "departamento", "salario", "experiencia_anos", "status_emprego"] # Nomes de colunas que não podem faltar
+MAX_AVISOS = 20 # Quantos avisos de linha bagunçada a gente guarda no máximo (o resto só é contado)
+TITULO_EFICIENCIA = "Quem tem o melhor custo em relação à experiência (Custo por Ano de Experiência):" # Primeira linha do ranking de eficiência
+RELATORIOS = { # O que você pode digitar -> qual relatório isso chama
+    "1": "custo_por_departamento", "custo total por departamento": "custo_por_departamento",
+    "2": "custo_medio", "custo medio por funcionario ativo": "custo_medio",
+    "3": "mais_menos_custoso", "departamento mais e menos custoso": "mais_menos_custoso",
+    "4": "eficiencia_por_experiencia", "eficiencia por ano de experiencia": "eficiencia_por_experiencia",
+    "5": "melhor_custo_beneficio", "melhor custo-beneficio": "melhor_custo_beneficio",
+    "6": "projetar_economia", "projecao de economia": "projetar_economia", "custos": "projetar_economia",
+    "7": "menos_eficientes_por_departamento", "menos eficientes por departamento": "menos_eficientes_por_departamento",
+}
+
+def arrumar_linha(linha):
+    """
+    Arruma uma linha da tabela. Devolve (nome, departamento, salário em centavos, experiência, data de contratação),
+    ou None se o funcionário não está ativo. Se os números vierem bagunçados, dá ValueError.
+    Fica fora da classe para poder rodar em outros processos.
+    """
+    if linha.get("status_emprego", "").lower() != "ativo": # Se o funcionário não está 'ativo', ignora
+        return None
+    salario = dinheiro.para_centavos(linha.get("salario", "0")) # Guarda em centavos ('5500,00' sai pelo caminho rápido de lá)
+    experiencia = max(0, int(linha.get("experiencia_anos", "0"))) # Pega a experiência, transforma em número e garante que não é negativo
+    return linha.get("nome"), linha.get("departamento"), salario, experiencia, linha.get("data_contratacao")
+
+def montar_url_csv(url):
+    """
+    Transforma o link da planilha no link que baixa ela como CSV (ou None se o link não serve).
+    Um link direto para um arquivo .csv também vale, do jeito que veio.
+    """
+    if url.startswith(("http://", "https://")) and url.split("?")[0].split("#")[0].endswith(".csv"): # Link direto para um CSV
+        return url
+    if "docs.google.com/spreadsheets/d/" not in url: # Vê se é mesmo uma URL de planilha do Google
+        return None
+
+    sheet_id_part = url.split("d/")[1].split("/")[0] # Pega o pedacinho que identifica sua planilha
+    gid_param = f"&gid={url.split('#gid=')[1].split('&')[0]}" if "#gid=" in url else "" # Vê se tem um código para uma aba específica
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id_part}/export?format=csv{gid_param}" # Monta o link para baixar a planilha como CSV
 
 class CSVAnalyzer:
     """
     Essa é a parte inteligente do programa. Ela pega os dados dos funcionários,
     faz todas as contas de custo e eficiência.
     """
-    def __init__(self, sheets_url="https://docs.google.com/spreadsheets/d/1gIFTAgtLZIPCXqy5CaQxQ8s6MVFH2IGl-uG45N1MFJs/edit?usp=sharing"):
-        self.data = [] # Aqui vamos guardar os dados limpos dos funcionários que vamos usar
+    def __init__(self, sheets_url="https://docs.google.com/spreadsheets/d/1gIFTAgtLZIPCXqy5CaQxQ8s6MVFH2IGl-uG45N1MFJs/edit?usp=sharing", armazem=None, streaming=False, cache=None, instrumentacao=None):
+        self.data = ArmazemFuncionarios() # Aqui vamos guardar os dados limpos dos funcionários, em colunas
         self.headers = [] # Aqui ficam os nomes das colunas da tabela
         self.raw_data = [] # Dados brutos, como vieram da tabela antes de serem arrumados
         self.google_sheets_url = sheets_url # Onde sua planilha do Google está na internet
-        self._load_and_validate_initial_data() # Logo que o programa começa, ele já tenta pegar e arrumar os dados
+        self.streaming = streaming # Se True, lê a planilha aos pouquinhos, sem guardar o texto inteiro nem o raw_data (só as colunas arrumadas, que crescem com os funcionários ativos)
+        self._validacao_streaming = None # Resultado da arrumação quando ela já foi feita durante a leitura
+        self._cache_agregados = None # Contas prontas dos relatórios (refeitas quando os dados mudam)
+        self._cache_simulador = None # Ordem e somas acumuladas dos cenários de economia (montadas no primeiro pedido)
+        self._etag = None # "Versão" da planilha que o Google mandou da última vez
+        self._last_modified = None # Quando a planilha mudou pela última vez, segundo o Google
+        self._indice_por_chave = None # Posição de cada funcionário pela chave (nome, data de contratação), montado no primeiro atualizar()
+        self.cache = cache # Onde guardar a cópia binária dos dados arrumados (um CacheSnapshots), ou None para não guardar
+        self.instrumentacao = instrumentacao if instrumentacao is not None else medicoes_do_ambiente() # Mede cada etapa (desligado, a não ser que peçam)
+        if armazem is not None: # Se alguém já entregou os funcionários prontos (ex: nos testes de velocidade)
+            self.data = armazem # Usa eles direto, sem ir na internet
+            self._agregados() # Já deixa as contas prontas
+        else:
+            self._load_and_validate_initial_data() # Logo que o programa começa, ele já tenta pegar e arrumar os dados
+
+    @classmethod
+    def de_varias_planilhas(cls, urls, max_conexoes=8, max_processos=None):
+        """
+        Monta um analisador com os funcionários de várias planilhas/abas juntos.
+        Elas são baixadas ao mesmo tempo e arrumadas em processos separados;
+        cada funcionário lembra de onde veio (veja data.origem(i)).
+        """
+        from ingestao_paralela import carregar_varias # Só carrega essa parte quando alguém precisa
+        armazem, avisos = carregar_varias(urls, max_conexoes, max_processos)
+        for aviso in avisos[:MAX_AVISOS]: # Mostra os primeiros problemas
+            print(aviso)
+        print(f"Dados prontos para usar! {len(armazem)} funcionários de {len(armazem.origens)} planilha(s)/aba(s).")
+        return cls(urls[0] if urls else "", armazem=armazem)
+
+    def medicoes(self):
+        """
+        O que foi medido em cada etapa da carga, das atualizações e dos relatórios: tempo, linhas,
+        bytes, linhas rejeitadas e memória (veja Instrumentacao.resumo). Vazio se as medições estão desligadas.
+        """
+        return self.instrumentacao.resumo()
 
     def _load_and_validate_initial_data(self):
         """
         Primeiro, a gente tenta pegar os dados da planilha na internet.
         Se não der certo, a gente usa uns dados de emergência que já vêm no programa.
         Depois, a gente dá uma olhada se esses dados estão certinhos.
+        Se tiver uma cópia salva no disco que ainda vale, ela é usada e a internet nem é chamada.
         """
+        carregou = False
+        if self.cache is not None: # Tenta a cópia salva primeiro
+            with self.instrumentacao.etapa("cache") as etapa:
+                carregou = self._carregar_do_cache()
+                etapa.linhas = len(self.data)
+        if carregou:
+            self._agregados() # Já faz as contas de todos os relatórios de uma vez
+            print("Dados prontos para usar! Dados carregados da cópia salva no computador.")
+            return True, "Dados carregados da cópia salva."
+
         load_success, load_message = self._load_from_sheets(self.google_sheets_url) # Tenta pegar os dados da planilha
+        veio_da_planilha = load_success # Só os dados da planilha de verdade vão para a cópia salva
         
         if not load_success: # Se não conseguiu pegar da internet
             print(f"Aviso: Não consegui pegar os dados da internet ({load_message}). Vou tentar usar os dados de segurança.")
@@ -42,153 +137,404 @@ Pedro Lima,35,Fortaleza,Desenvolvedor,7200,8,Superior,Ativo,2019-05-18,TI"""
                 print(f"Erro grave: Não consegui pegar os dados de lugar nenhum: {e}") # Se nem os dados de segurança funcionam
                 return False, f"Erro grave: {e}"
 
-        validate_success, validate_message = self._validate_data() # Agora, a gente verifica se os dados estão corretos
+        if self._validacao_streaming is not None: # Se os dados já foram arrumados enquanto chegavam da internet
+            validate_success, validate_message = self._validacao_streaming
+        else:
+            with self.instrumentacao.etapa("validacao") as etapa:
+                validate_success, validate_message = self._validate_data(etapa=etapa) # Agora, a gente verifica se os dados estão corretos
         if not validate_success: # Se os dados não estão certinhos
             print(f"Erro ao arrumar os dados: {validate_message}") # Avisa que não conseguiu arrumar
-            self.data = [] # Limpa os dados se estiverem bagunçados
+            self.data = ArmazemFuncionarios() # Limpa os dados se estiverem bagunçados
         else:
+            self._agregados() # Já faz as contas de todos os relatórios de uma vez
+            if veio_da_planilha:
+                self._salvar_no_cache() # Guarda uma cópia para a próxima vez abrir rápido
             print(f"Dados prontos para usar! {load_message}. {validate_message}") # Avisa que está tudo certo
         
         return validate_success, validate_message # Diz se deu tudo certo no final
 
+    def _montar_url_csv(self, url):
+        """Transforma o link da planilha no link que baixa ela como CSV (ou None se o link não serve)."""
+        return montar_url_csv(url)
+
+    def _chave_cache(self):
+        """O nome da cópia salva: um resumo do link que baixa o CSV (o mesmo para a mesma planilha e aba)."""
+        url = self._montar_url_csv(self.google_sheets_url) or self.google_sheets_url # O link de download já tem o código da planilha e da aba
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+    def _carregar_do_cache(self):
+        """
+        Usa a cópia salva no disco se ela ainda vale. Se ela já passou da validade,
+        pergunta para a planilha se mudou (com ETag/Last-Modified); se não mudou, usa a cópia mesmo assim.
+        """
+        copia = self.cache.carregar(self._chave_cache()) # Lê a cópia do disco
+        if copia is None: # Não tem cópia
+            return False
+        armazem, infos = copia
+        if not infos["fresca"] and not self._planilha_nao_mudou(infos["etag"], infos["last_modified"]): # Cópia velha e a planilha mudou
+            return False
+        if not infos["fresca"]: # A planilha não mudou: a cópia vale por mais um tempo
+            self.cache.tocar(self._chave_cache())
+        self.data = armazem
+        self._etag, self._last_modified = infos["etag"], infos["last_modified"]
+        self._indice_por_chave = None
+        return True
+
+    def _planilha_nao_mudou(self, etag, last_modified):
+        """Pergunta para a planilha, sem baixar ela, se mudou desde a versão que a gente tem."""
+        csv_url = self._montar_url_csv(self.google_sheets_url)
+        if csv_url is None or not (etag or last_modified): # Sem como perguntar
+            return False
+        cabecalhos = {"If-None-Match": etag} if etag else {"If-Modified-Since": last_modified}
+        try:
+            with urllib.request.urlopen(urllib.request.Request(csv_url, headers=cabecalhos)): # Abre e fecha sem ler a tabela
+                return False # Respondeu com a tabela: mudou
+        except urllib.error.HTTPError as e:
+            return e.code == 304 # 304 quer dizer "não mudou nada"
+        except Exception: # Sem internet: melhor não confiar numa cópia velha
+            return False
+
+    def _salvar_no_cache(self):
+        """Guarda a cópia binária dos dados arrumados, se tiver um cache."""
+        if self.cache is None:
+            return
+        try:
+            with self.instrumentacao.etapa("salvar_cache") as etapa:
+                self.cache.salvar(self._chave_cache(), self.data, self._etag, self._last_modified)
+                etapa.linhas = len(self.data)
+        except OSError as e: # Disco cheio ou sem permissão: o programa continua sem a cópia
+            print(f"Aviso: Não consegui salvar a cópia dos dados no computador: {e}")
+
     def _load_from_sheets(self, url):
         """Pega a tabela direto da sua planilha do Google Sheets."""
-        if "docs.google.com/spreadsheets/d/" not in url: # Vê se é mesmo uma URL de planilha do Google
+        csv_url = self._montar_url_csv(url) # Monta o link de download
+        if csv_url is None: # Se o link não é de uma planilha do Google
             return False, "Essa não parece ser uma URL de Planilha Google."
 
-        sheet_id_part = url.split("d/")[1].split("/")[0] # Pega o pedacinho que identifica sua planilha
-        gid_param = f"&gid={url.split('#gid=')[1].split('&')[0]}" if "#gid=" in url else "" # Vê se tem um código para uma aba específica
-        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id_part}/export?format=csv{gid_param}" # Monta o link para baixar a planilha como CSV
-
         try:
-            with urllib.request.urlopen(csv_url) as response: # Tenta abrir o link
-                csv_content = response.read().decode('utf-8') # Lê o que veio e transforma em texto que a gente entende
-                csv_file = io.StringIO(csv_content) # Transforma o texto em um arquivo de mentira
-                
-                reader = csv.DictReader(csv_file) # Prepara para ler a tabela
-                self.headers = reader.fieldnames # Guarda os nomes das colunas
-                self.raw_data = [row for row in reader] # Pega todas as linhas da tabela
+            with self.instrumentacao.etapa("conexao"): # Até o servidor começar a responder
+                response = urllib.request.urlopen(csv_url) # Tenta abrir o link
+            with response:
+                self._guardar_versao_planilha(response) # Lembra a versão para o atualizar() perguntar se mudou
+                if self.streaming: # No modo streaming, a gente lê e arruma linha por linha enquanto os dados chegam
+                    with self.instrumentacao.etapa("leitura_e_validacao") as etapa: # Baixar, ler e arrumar acontecem juntos
+                        texto = io.TextIOWrapper(self.instrumentacao.contar_bytes(response, etapa), encoding='utf-8', newline='') # Vai transformando os bytes em texto aos pedaços
+                        reader = csv.DictReader(texto) # Lê uma linha da tabela de cada vez
+                        self.headers = reader.fieldnames # Guarda os nomes das colunas
+                        self._validacao_streaming = self._validate_data(reader, etapa) # Arruma as linhas conforme chegam, sem guardar o raw_data
+                    return True, "Dados da planilha do Google lidos aos poucos com sucesso."
+                with self.instrumentacao.etapa("download") as etapa:
+                    conteudo = response.read() # Lê o que veio
+                    etapa.bytes = len(conteudo)
+                with self.instrumentacao.etapa("csv") as etapa:
+                    csv_content = conteudo.decode('utf-8') # Transforma em texto que a gente entende
+                    csv_file = io.StringIO(csv_content) # Transforma o texto em um arquivo de mentira
+                    
+                    reader = csv.DictReader(csv_file) # Prepara para ler a tabela
+                    self.headers = reader.fieldnames # Guarda os nomes das colunas
+                    self.raw_data = [row for row in reader] # Pega todas as linhas da tabela
+                    etapa.linhas = len(self.raw_data)
                 return True, "Dados da planilha do Google pegos com sucesso." # Avisa que deu tudo certo
         except urllib.error.URLError as e: # Se não conseguiu conectar na internet
             return False, f"Problema para conectar na internet: {e}"
         except Exception as e: # Se deu algum outro problema inesperado
             return False, f"Não consegui pegar os dados: {e}"
 
-    def _validate_data(self):
-        """Dá uma geral nos dados, filtra só quem importa e arruma os números."""
-        required_headers = ["nome", "departamento", "salario", "experiencia_anos", "status_emprego"] # Nomes de colunas que não podem faltar
+    def _guardar_versao_planilha(self, response):
+        """Guarda o ETag e o Last-Modified que vieram na resposta."""
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+
+    def _validate_data(self, linhas=None, etapa=ETAPA_DESLIGADA):
+        """
+        Dá uma geral nos dados, filtra só quem importa e arruma os números.
+        As linhas podem vir de qualquer lugar que entregue uma de cada vez;
+        se ninguém passar nada, usa o raw_data. Quantas linhas foram lidas e
+        quantas foram rejeitadas ficam anotadas na etapa das medições.
+        """
+        required_headers = COLUNAS_OBRIGATORIAS # Nomes de colunas que não podem faltar
         
         if not self.headers or not all(h in self.headers for h in required_headers): # Vê se todas as colunas importantes estão lá
             return False, f"Faltam colunas importantes. Precisa ter: {required_headers}"
 
-        processed_funcionarios = [] # Lista para guardar só os funcionários que servem
+        processed_funcionarios = ArmazemFuncionarios() # Colunas para guardar só os funcionários que servem
         warnings = [] # Lista para avisar sobre problemas em alguma linha
-        for i, linha in enumerate(self.raw_data): # Olha cada linha de funcionário
-            if linha.get("status_emprego", "").lower() != "ativo": # Se o funcionário não está 'ativo', ignora
-                continue
-            
+        linhas_ignoradas = 0 # Quantas linhas bagunçadas a gente pulou
+        i = -1 # Posição da última linha lida (continua -1 se a tabela vier vazia)
+        for i, linha in enumerate(self.raw_data if linhas is None else linhas): # Olha cada linha de funcionário
             try:
-                salario = float(linha.get("salario", "0").replace(",", ".")) # Pega o salário, troca vírgula por ponto e transforma em número
-                experiencia = max(0, int(linha.get("experiencia_anos", "0"))) # Pega a experiência, transforma em número e garante que não é negativo
-
-                processed_funcionarios.append({ # Adiciona o funcionário arrumado na lista
-                    "nome": linha.get("nome"),
-                    "departamento": linha.get("departamento"),
-                    "salario": salario,
-                    "experiencia": experiencia
-                })
+                funcionario = arrumar_linha(linha) # Filtra quem não está ativo e arruma os números
+                if funcionario is None: # Se o funcionário não está 'ativo', ignora
+                    continue
+                processed_funcionarios.adicionar(*funcionario) # Adiciona o funcionário arrumado nas colunas
             except (ValueError, KeyError) as e: # Se o salário ou experiência vierem bagunçados
-                warnings.append(f"Aviso: A linha {i+2} está com algum dado bagunçado (salário ou experiência). Vou ignorar. Erro: {e}") # Avisa que ignorou a linha
+                linhas_ignoradas += 1 # Conta mais uma linha pulada
+                if len(warnings) < MAX_AVISOS: # Guarda só os primeiros avisos, para a memória não crescer com a planilha
+                    warnings.append(f"Aviso: A linha {i+2} está com algum dado bagunçado (salário ou experiência). Vou ignorar. Erro: {e}") # Avisa que ignorou a linha
                 continue # Pula para o próximo funcionário
         
+        etapa.linhas, etapa.rejeitadas = i + 1, linhas_ignoradas # Anota nas medições (uma vez só, não a cada linha)
+        if linhas_ignoradas > len(warnings): # Se teve mais linhas bagunçadas do que avisos guardados
+            warnings.append(f"Aviso: mais {linhas_ignoradas - len(warnings)} linhas bagunçadas também foram ignoradas.")
         self.data = processed_funcionarios # Guarda só os funcionários que estão ok
+        self._indice_por_chave = None # Os dados são outros, então o índice por chave precisa ser refeito
         if not self.data: # Se não sobrou nenhum funcionário depois de arrumar
             return False, "Nenhum funcionário ativo e com dados válidos foi encontrado. Não tem como fazer as contas."
         return True, "Dados arrumados e prontos para as contas!" + ("\n" + "\n".join(warnings) if warnings else "") # Avisa que está tudo certo ou mostra os avisos
 
+    def atualizar(self):
+        """
+        Busca a planilha de novo e aplica só o que mudou: quem entrou, quem mudou e quem saiu.
+        Pergunta com ETag/Last-Modified antes; se a planilha não mudou, nem baixa a tabela.
+        """
+        sucesso, mensagem, novidade = self.baixar_atualizacao() # Primeiro só baixa e arruma
+        if novidade is None: # Não mudou ou deu problema
+            return sucesso, mensagem
+        return self.aplicar_atualizacao(novidade) # Depois aplica
+
+    def baixar_atualizacao(self):
+        """
+        Primeira metade do atualizar(): baixa e arruma a planilha nova sem mexer nos dados atuais
+        (assim quem está lendo os relatórios não precisa esperar a internet).
+        Devolve (deu certo, mensagem, novidade); a novidade é None quando não tem nada para aplicar.
+        """
+        if len(self.data.origens) > 1: # Os dados vieram de várias planilhas juntas
+            return False, "Atualizar só funciona com os dados de uma planilha só.", None
+        csv_url = self._montar_url_csv(self.google_sheets_url) # Monta o link de download
+        if csv_url is None: # Se o link não é de uma planilha do Google
+            return False, "Essa não parece ser uma URL de Planilha Google.", None
+
+        cabecalhos = {} # Perguntas para o servidor responder "não mudou" sem mandar a tabela
+        if self._etag:
+            cabecalhos["If-None-Match"] = self._etag
+        if self._last_modified:
+            cabecalhos["If-Modified-Since"] = self._last_modified
+
+        try:
+            with self.instrumentacao.etapa("atualizacao_download") as etapa, urllib.request.urlopen(urllib.request.Request(csv_url, headers=cabecalhos)) as response: # Tenta abrir o link
+                reader = csv.DictReader(io.TextIOWrapper(self.instrumentacao.contar_bytes(response, etapa), encoding='utf-8', newline='')) # Lê uma linha de cada vez
+                if not reader.fieldnames or not all(h in reader.fieldnames for h in COLUNAS_OBRIGATORIAS): # Vê se as colunas importantes continuam lá
+                    return False, f"Faltam colunas importantes. Precisa ter: {COLUNAS_OBRIGATORIAS}", None
+                funcionarios = [] # Só os funcionários ativos, já arrumados
+                rejeitadas = 0 # Linhas bagunçadas que ficaram de fora
+                for linha in reader:
+                    try:
+                        funcionario = arrumar_linha(linha) # Arruma do mesmo jeito que na carga
+                    except (ValueError, KeyError): # Linha bagunçada fica de fora, como na carga
+                        rejeitadas += 1
+                        continue
+                    if funcionario is not None: # Só quem está ativo
+                        funcionarios.append(funcionario)
+                etapa.linhas, etapa.rejeitadas = reader.line_num - 1, rejeitadas # line_num conta o cabeçalho também
+                novidade = (funcionarios, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except urllib.error.HTTPError as e: # O servidor respondeu com um código diferente de sucesso
+            if e.code == 304: # 304 quer dizer "não mudou nada"
+                if self.cache is not None: # A cópia salva continua valendo
+                    self.cache.tocar(self._chave_cache())
+                return True, "A planilha não mudou desde a última vez.", None
+            return False, f"Problema para atualizar a planilha: {e}", None
+        except urllib.error.URLError as e: # Se não conseguiu conectar na internet
+            return False, f"Problema para conectar na internet: {e}", None
+        except Exception as e: # Se deu algum outro problema inesperado
+            return False, f"Não consegui atualizar os dados: {e}", None
+        return True, "Planilha baixada.", novidade
+
+    def aplicar_atualizacao(self, novidade):
+        """Segunda metade do atualizar(): aplica nos dados o que veio do baixar_atualizacao()."""
+        funcionarios, etag, last_modified = novidade
+        with self.instrumentacao.etapa("atualizacao_aplicar") as etapa:
+            novos, alterados, removidos = self._aplicar_diferencas(funcionarios) # Compara com o que a gente já tem e aplica só as mudanças
+            etapa.linhas = len(funcionarios)
+        self._etag, self._last_modified = etag, last_modified # Só lembra a versão nova depois de aplicar
+
+        self.raw_data = [] # Os dados brutos antigos não valem mais
+        if novos or alterados or removidos: # Se algo mudou, a cópia salva também precisa mudar
+            self._salvar_no_cache()
+        elif self.cache is not None: # Nada mudou: a cópia continua valendo
+            self.cache.tocar(self._chave_cache())
+        return True, f"Planilha atualizada: {novos} novo(s), {alterados} alterado(s), {removidos} removido(s)."
+
+    def _aplicar_diferencas(self, funcionarios):
+        """
+        Compara os funcionários novos (já arrumados) com os que já temos, pela chave (nome, data de contratação),
+        e corrige as contas só para quem entrou, mudou ou saiu. Devolve quantos de cada.
+        Cada um fica com a sua linha na planilha nova (que decide os empates) e as áreas ficam na ordem em
+        que aparecem nela, então os relatórios saem iguais aos de uma carga do zero da mesma planilha.
+        """
+        agregados = self._agregados() # Garante que as contas estão em dia antes de mexer
+        if self._indice_por_chave is None: # Primeira atualização: monta o índice por chave
+            self._indice_por_chave = dict(self.data.chaves())
+        armazem, indice = self.data, self._indice_por_chave
+        posicoes_planilha = armazem.posicoes_planilha
+        lugares = array('q') # Onde está nas colunas quem está em cada linha da planilha nova (-1 para quem é novo)
+        novos, alterados = [], [] # (linha na planilha nova, chave) de quem entrou e (posição, linha) de quem mudou
+        areas = {} # As áreas na ordem em que aparecem na planilha nova
+        vistos = {} # Quantas vezes cada (nome, data) apareceu na planilha nova
+        ordem_mantida = True # Se quem não mudou continua na mesma ordem entre si (aí o ranking continua em ordem)
+        ultima_linha = -1 # Linha antiga do último que não mudou
+
+        for linha, (nome, departamento, salario, experiencia, data_contratacao) in enumerate(funcionarios): # Primeiro só compara
+            areas.setdefault(departamento, None)
+            ocorrencia = vistos.get((nome, data_contratacao), 0) # Separa pessoas repetidas
+            vistos[(nome, data_contratacao)] = ocorrencia + 1
+            chave = (nome, data_contratacao, ocorrencia)
+            i = indice.get(chave, -1) # Onde essa pessoa está nas colunas (se já estava)
+            lugares.append(i)
+            if i < 0: # Funcionário novo
+                novos.append((linha, chave))
+            elif (armazem.departamento(i), armazem.salarios[i], armazem.experiencias[i]) != (departamento, salario, experiencia): # Mudou alguma coisa
+                alterados.append((i, linha))
+            elif posicoes_planilha[i] > ultima_linha:
+                ultima_linha = posicoes_planilha[i]
+            else: # Linhas trocaram de lugar na planilha
+                ordem_mantida = False
+        if not ordem_mantida: # O ranking não dá para corrigir aos poucos: é refeito na próxima consulta
+            agregados = None
+
+        removidos = 0
+        for chave, i in list(indice.items()): # Quem não apareceu na planilha nova saiu
+            if vistos.get(chave[:2], 0) <= chave[2]:
+                if agregados is not None:
+                    agregados.remover_linha(i)
+                armazem.remover(i)
+                del indice[chave]
+                removidos += 1
+        if agregados is not None:
+            for i, _ in alterados: # Tira os valores velhos das contas, enquanto o ranking ainda usa as linhas velhas
+                agregados.remover_linha(i)
+
+        for linha, i in enumerate(lugares): # Quem ficou vai para a sua linha nova (sem trocar a ordem entre eles)
+            if i >= 0:
+                posicoes_planilha[i] = linha
+        for i, linha in alterados:
+            _, departamento, salario, experiencia, _ = funcionarios[linha]
+            armazem.alterar(i, departamento, salario, experiencia)
+            if agregados is not None:
+                agregados.adicionar_linha(i) # E coloca os valores novos
+        for linha, chave in novos: # Quem entrou vai para o fim das colunas, lembrando a sua linha na planilha
+            i = armazem.adicionar(*funcionarios[linha], posicao_planilha=linha)
+            indice[chave] = lugares[linha] = i
+            if agregados is not None:
+                agregados.adicionar_linha(i)
+        armazem.na_ordem_da_planilha = all(map(lt, lugares, lugares[1:])) # As colunas seguem a ordem da planilha?
+
+        ordem_areas = [armazem.codigo_departamento(departamento) for departamento in areas]
+        if ordem_areas != list(range(len(ordem_areas))): # As áreas mudaram de ordem na planilha: os códigos seguem a ordem nova
+            ordem_areas = armazem.reordenar_departamentos(ordem_areas)
+            if agregados is not None:
+                agregados.reordenar_departamentos(ordem_areas)
+
+        if agregados is not None:
+            agregados.sincronizar() # As contas acompanham os dados de novo
+        if armazem.precisa_compactar(): # Se sobrou buraco demais, aperta as colunas
+            armazem.compactar() # As contas serão refeitas na próxima consulta
+            self._indice_por_chave = None
+        return len(novos), len(alterados), removidos
+
     # --- As contas e análises que o programa faz ---
 
     def _calcular_custo_total(self, salario):
-        """Calcula quanto custa um funcionário para a empresa (salário mais todos os extras)."""
-        return salario * 1.8 # Multiplica por 1.8 porque são 80% a mais de custos
+        """Calcula quanto custa um funcionário para a empresa (salário mais todos os extras), em centavos."""
+        return dinheiro.custo_total(salario) # Multiplica por 1.8 porque são 80% a mais de custos, arredondando para o centavo
+
+    def _agregados(self):
+        """Devolve as contas prontas dos relatórios, refazendo só se os dados mudaram."""
+        if self._cache_agregados is None or not self._cache_agregados.atualizado(self.data): # Se não tem contas ou elas ficaram velhas
+            with self.instrumentacao.etapa("agregados") as etapa:
+                self._cache_agregados = Agregados(self.data, dinheiro.custo_total) # Faz tudo numa passada só (o mesmo custo do _calcular_custo_total)
+                etapa.linhas = len(self.data)
+        return self._cache_agregados
 
-    def _calcular_eficiencia(self, salario, experiencia):
-        """Calcula o custo de um funcionário por cada ano de experiência que ele tem."""
-        custo_total = self._calcular_custo_total(salario) # Pega o custo total do funcionário
-        return custo_total / max(experiencia, 1) # Divide pelo tempo de experiência (no mínimo 1 para não dividir por zero)
+    def preparar_contas(self):
+        """Deixa as contas dos relatórios prontas agora, e não só no primeiro relatório (ex: logo depois de uma atualização)."""
+        self._agregados()
 
     def custo_por_departamento(self):
         """Mostra o custo total de cada área da empresa e avisa se alguma está com pouca gente."""
         if not self.data: # Vê se tem dados para calcular
             return "Não tem dados de funcionários para calcular o custo por área."
         
-        custos = {} # Aqui vamos somar o custo de cada área
-        departamento_contagem = {} # Aqui vamos contar quantos funcionários tem em cada área
-
-        for f in self.data: # Para cada funcionário
-            dep = f["departamento"] # Pega a área dele
-            departamento_contagem[dep] = departamento_contagem.get(dep, 0) + 1 # Conta mais um funcionário para a área
-            custos[dep] = custos.get(dep, 0) + self._calcular_custo_total(f["salario"]) # Soma o custo do funcionário no total da área
+        agregados = self._agregados() # Somas e contagens por área já prontas
 
         output = ["Quanto cada área da empresa custa:"] # Monta a mensagem final
-        for dep, count in departamento_contagem.items(): # Para cada área
-            if count < 2: # Se a área tem menos de 2 funcionários
-                output.append(f"Aviso: A área '{dep}' tem menos de 2 funcionários. Fique de olho!") # Dá um alerta
+        for codigo, count in enumerate(agregados.contagens): # Para cada área
+            if 0 < count < 2: # Se a área tem menos de 2 funcionários
+                output.append(f"Aviso: A área '{self.data.departamentos[codigo]}' tem menos de 2 funcionários. Fique de olho!") # Dá um alerta
         
-        if not custos: # Se não conseguiu calcular nada
-            output.append("Nenhum custo calculado. Será que tem dados de funcionários?")
-        else:
-            for dep, valor in custos.items(): # Mostra o custo de cada área
-                output.append(f"{dep}: R$ {valor:.2f}") # Formata bonitinho o valor
+        for codigo, soma in enumerate(agregados.somas_salario): # Mostra o custo de cada área
+            if agregados.contagens[codigo] == 0: # Área que ficou sem ninguém depois de uma atualização
+                continue
+            output.append(f"{self.data.departamentos[codigo]}: R$ {dinheiro.formatar(self._calcular_custo_total(soma))}") # Formata bonitinho o valor
         return "\n".join(output) # Junta tudo em uma mensagem só
 
     def custo_medio(self):
         """Calcula quanto custa em média cada funcionário ativo na empresa."""
         if not self.data: # Vê se tem dados para calcular
             return "Não tem dados de funcionários para calcular o custo médio."
-        total_custo = sum(self._calcular_custo_total(f["salario"]) for f in self.data) # Soma o custo de todos os funcionários
-        media = total_custo / len(self.data) # Divide pelo número de funcionários para ter a média
-        return f"Custo médio por funcionário ativo: R$ {media:.2f}" # Mostra o resultado
+        total_custo = self._calcular_custo_total(self._agregados().total_salarios) # Custo de todo mundo, a partir da soma já pronta
+        media = dinheiro.arredondar(Fraction(total_custo, len(self.data))) # Divide pelo número de funcionários para ter a média
+        return f"Custo médio por funcionário ativo: R$ {dinheiro.formatar(media)}" # Mostra o resultado
 
     def mais_menos_custoso(self):
         """Descobre qual área da empresa custa mais e qual custa menos."""
         if not self.data: # Vê se tem dados para calcular
             return "Não tem dados de funcionários para ver qual área custa mais/menos."
         
-        custos = {} # Aqui vamos somar o custo de cada área
-        for f in self.data: # Para cada funcionário
-            dep = f["departamento"] # Pega a área dele
-            custos[dep] = custos.get(dep, 0) + self._calcular_custo_total(f["salario"]) # Soma o custo no total da área
+        agregados = self._agregados() # Somas por área já prontas
+        somas = agregados.somas_salario
+        codigos = [codigo for codigo, count in enumerate(agregados.contagens) if count] # Só as áreas que têm gente
 
-        if not custos: # Se não tem custo de área nenhuma
-            return "Nenhum custo por área calculado. Não consigo dizer qual custa mais/menos."
-        
-        mais = max(custos, key=custos.get) # Pega a área com o maior custo
-        menos = min(custos, key=custos.get) # Pega a área com o menor custo
-        return f"A área que custa mais é: {mais}\nA área que custa menos é: {menos}" # Mostra os resultados
+        mais = max(codigos, key=somas.__getitem__) # Pega a área com o maior custo
+        menos = min(codigos, key=somas.__getitem__) # Pega a área com o menor custo
+        return f"A área que custa mais é: {self.data.departamentos[mais]}\nA área que custa menos é: {self.data.departamentos[menos]}" # Mostra os resultados
 
-    def eficiencia_por_experiencia(self):
-        """Mostra o custo de cada funcionário em relação ao tempo de experiência dele."""
+    def eficiencia_por_experiencia(self, pagina=None, por_pagina=50):
+        """
+        Mostra o custo de cada funcionário em relação ao tempo de experiência dele.
+        Se você pedir uma página, mostra só aquele pedaço do ranking (ValueError se a página não existe).
+        """
         if not self.data: # Vê se tem dados para calcular
             return "Não tem dados de funcionários para calcular a eficiência por experiência."
         
-        eficiencias = [] # Lista para guardar a eficiência de cada um
-        for f in self.data: # Para cada funcionário
-            if f['experiencia'] == 0 and f['salario'] == 0: # Se o funcionário não tem salário nem experiência, pula
-                continue
-            eficiencias.append({ # Adiciona o nome, área e a eficiência dele
-                "nome": f["nome"],
-                "departamento": f["departamento"],
-                "eficiencia": self._calcular_eficiencia(f["salario"], f["experiencia"])
-            })
-
-        if not eficiencias: # Se não conseguiu calcular a eficiência de ninguém
+        agregados = self._agregados() # Ranking de eficiência já pronto
+        if not agregados.ranking: # Se não conseguiu calcular a eficiência de ninguém
             return "Não há dados válidos para calcular a eficiência."
         
-        eficiencias_ordenadas = sorted(eficiencias, key=lambda x: x["eficiencia"]) # Organiza do mais eficiente para o menos eficiente
-        output = ["Quem tem o melhor custo em relação à experiência (Custo por Ano de Experiência):"] # Começa a mensagem
-        for item in eficiencias_ordenadas: # Para cada um na lista organizada
-            output.append(f"- {item['nome']} ({item['departamento']}): R$ {item['eficiencia']:.2f} por ano de experiência") # Mostra o nome, área e a eficiência
+        output = [TITULO_EFICIENCIA] # Começa a mensagem
+        if pagina is None: # Sem página, mostra todo mundo
+            output.extend(self.linhas_eficiencia_por_experiencia())
+        else:
+            pedaco = ranking.pagina(agregados.ranking, pagina, por_pagina) # Só o pedaço pedido (dá ValueError se a página não existe)
+            total_paginas = ranking.total_de_paginas(len(agregados.ranking), por_pagina) # Quantas páginas dá no total
+            output[0] = output[0][:-1] + f", página {pagina} de {total_paginas}:" # Avisa qual página é
+            output.extend(self._linha_eficiencia(i) for i in pedaco)
+        return "\n".join(output) # Junta tudo em uma mensagem só
+
+    def linhas_eficiencia_por_experiencia(self):
+        """Entrega o ranking de eficiência uma linha de cada vez, para quem quer mostrar aos poucos sem montar um textão."""
+        for i in self._agregados().ranking: # Do mais eficiente para o menos eficiente
+            yield self._linha_eficiencia(i)
+
+    def _linha_eficiencia(self, i):
+        """Monta a linha do ranking de eficiência para o funcionário da posição i."""
+        return f"- {self.data.nomes[i]} ({self.data.departamento(i)}): R$ {dinheiro.formatar(self._agregados().eficiencia_em_centavos(i))} por ano de experiência" # Mostra o nome, área e a eficiência
+
+    def menos_eficientes_por_departamento(self, quantidade=3):
+        """Mostra, para cada área, os funcionários que mais custam por ano de experiência."""
+        if not self.data: # Vê se tem dados para calcular
+            return "Não tem dados de funcionários para ver os menos eficientes de cada área."
+
+        agregados = self._agregados() # Ranking por área já pronto (ou montado agora, sem ordenar nada)
+        output = [f"Os {quantidade} menos eficientes de cada área (Custo por Ano de Experiência):"] # Começa a mensagem
+        for codigo, departamento in enumerate(self.data.departamentos): # Para cada área
+            piores = agregados.piores_do_departamento(codigo, quantidade) # Os piores dessa área
+            if not piores: # Área sem ninguém nas contas
+                continue
+            output.append(f"{departamento}:")
+            for i in piores:
+                output.append(f"  - {self.data.nomes[i]}: R$ {dinheiro.formatar(agregados.eficiencia_em_centavos(i))} por ano de experiência")
+        if len(output) == 1: # Ninguém em nenhuma área
+            return "Não há dados válidos para calcular a eficiência."
         return "\n".join(output) # Junta tudo em uma mensagem só
 
     def melhor_custo_beneficio(self):
@@ -196,27 +542,14 @@ Pedro Lima,35,Fortaleza,Desenvolvedor,7200,8,Superior,Ativo,2019-05-18,TI"""
         if not self.data: # Vê se tem dados para calcular
             return "Não tem dados de funcionários para ver o melhor custo-benefício."
 
-        melhor_eficiencia = float('inf') # Começa com um valor bem alto para achar o menor depois
-        funcionarios_melhor_custo_beneficio = [] # Lista para guardar quem é o melhor
-
-        for f in self.data: # Para cada funcionário
-            if f['experiencia'] == 0 and f['salario'] == 0: # Se não tem salário nem experiência, pula
-                continue
-            
-            eficiencia_atual = self._calcular_eficiencia(f["salario"], f["experiencia"]) # Calcula a eficiência dele
-            if eficiencia_atual < melhor_eficiencia: # Se achou alguém mais eficiente que o melhor até agora
-                melhor_eficiencia = eficiencia_atual # Esse é o novo melhor
-                funcionarios_melhor_custo_beneficio = [f] # Começa a lista com ele
-            elif eficiencia_atual == melhor_eficiencia: # Se achou alguém tão eficiente quanto o melhor
-                funcionarios_melhor_custo_beneficio.append(f) # Adiciona ele na lista (empatou)
-        
-        if not funcionarios_melhor_custo_beneficio: # Se não conseguiu encontrar ninguém
+        agregados = self._agregados() # Os melhores estão no começo do ranking
+        if not agregados.ranking: # Se não conseguiu encontrar ninguém
             return "Não consegui achar funcionários com melhor custo-benefício. Vê se os dados de salário e experiência estão certos."
-        else:
-            output = [f"O(s) funcionário(s) com o MELHOR Custo-Benefício (gastando R$ {melhor_eficiencia:.2f} por ano de experiência):"] # Monta a mensagem
-            for f in funcionarios_melhor_custo_beneficio: # Para cada um dos melhores
-                output.append(f"- {f['nome']} (Área: {f['departamento']})") # Mostra o nome e a área
-            return "\n".join(output) # Junta tudo em uma mensagem só
+
+        output = [f"O(s) funcionário(s) com o MELHOR Custo-Benefício (gastando R$ {dinheiro.formatar(dinheiro.arredondar(agregados.melhor_eficiencia()))} por ano de experiência):"] # Monta a mensagem
+        for i in agregados.melhores(): # Para cada um dos melhores
+            output.append(f"- {self.data.nomes[i]} (Área: {self.data.departamento(i)})") # Mostra o nome e a área
+        return "\n".join(output) # Junta tudo em uma mensagem só
 
     def projetar_economia(self, num_otimizar=3):
         """
@@ -226,59 +559,159 @@ Pedro Lima,35,Fortaleza,Desenvolvedor,7200,8,Superior,Ativo,2019-05-18,TI"""
         if not self.data: # Vê se tem dados para calcular
             return "Não tem funcionários para projetar economia."
 
-        funcionarios_com_eficiencia = [] # Lista para guardar todos com a eficiência calculada
-        for f in self.data: # Para cada funcionário
-            if f['experiencia'] == 0 and f['salario'] == 0: # Se não tem salário nem experiência, pula
-                continue
-            eficiencia = self._calcular_eficiencia(f["salario"], f["experiencia"]) # Calcula a eficiência
-            funcionarios_com_eficiencia.append({ # Adiciona todas as informações e a eficiência
-                "nome": f["nome"],
-                "departamento": f["departamento"],
-                "salario": f["salario"],
-                "experiencia": f["experiencia"],
-                "eficiencia": eficiencia,
-                "custo_atual": self._calcular_custo_total(f["salario"])
-            })
-        
-        if not funcionarios_com_eficiencia: # Se não tem dados para projetar
+        agregados = self._agregados() # Média e ranking de eficiência já prontos
+        if not agregados.ranking: # Se não tem dados para projetar
             return "Não consegui projetar nenhuma economia com o que temos."
 
-        total_eficiencia = sum(f['eficiencia'] for f in funcionarios_com_eficiencia) # Soma a eficiência de todo mundo
-        media_eficiencia = total_eficiencia / len(funcionarios_com_eficiencia) # Calcula a eficiência média
-
-        funcionarios_ordenados = sorted(funcionarios_com_eficiencia, key=lambda x: x["eficiencia"], reverse=True) # Organiza do menos eficiente para o mais eficiente
-        top_ineficientes = funcionarios_ordenados[:num_otimizar] # Pega os funcionários que precisam melhorar mais
+        media_eficiencia = agregados.media_eficiencia() # Eficiência média (exata, em centavos)
+        top_ineficientes = agregados.piores(num_otimizar) # Pega os funcionários que precisam melhorar mais
 
-        economia_projetada = 0.0 # Começa a economia em zero
+        economia_projetada = 0 # Começa a economia em zero (em centavos)
         detalhes_otimizacao = [] # Lista para explicar a economia de cada um
         
         if not top_ineficientes: # Se não achou ninguém para otimizar
             return "Não consegui achar funcionários para otimizar com esses critérios."
         
-        for f_ineficiente in top_ineficientes: # Para cada funcionário que pode melhorar
-            if f_ineficiente['eficiencia'] <= media_eficiencia: # Se ele já está bom ou melhor que a média
-                detalhes_otimizacao.append(f"- {f_ineficiente['nome']} já é bom (custo de R$ {media_eficiencia:.2f} por ano). Não tem economia para ele neste caso.")
+        for i in top_ineficientes: # Para cada funcionário que pode melhorar
+            nome = self.data.nomes[i] # Nome de quem estamos olhando
+            if agregados.eficiencia_exata(i) <= media_eficiencia: # Se ele já está bom ou melhor que a média
+                detalhes_otimizacao.append(f"- {nome} já é bom (custo de R$ {dinheiro.formatar(dinheiro.arredondar(media_eficiencia))} por ano). Não tem economia para ele neste caso.")
                 continue # Pula para o próximo
 
-            custo_alvo = media_eficiencia * f_ineficiente['experiencia'] # Quanto ele custaria se fosse eficiente como a média
-            economia_individual = f_ineficiente['custo_atual'] - custo_alvo # Quanto a gente economizaria com ele
+            custo_atual = self._calcular_custo_total(self.data.salarios[i]) # Quanto ele custa hoje
+            custo_alvo = dinheiro.arredondar(media_eficiencia * self.data.experiencias[i]) # Quanto ele custaria se fosse eficiente como a média
+            economia_individual = custo_atual - custo_alvo # Quanto a gente economizaria com ele (a soma das linhas bate com o total)
 
             if economia_individual > 0: # Se realmente dá para economizar
                 economia_projetada += economia_individual # Soma na economia total
                 detalhes_otimizacao.append( # Mostra os detalhes da economia com ele
-                    f"- {f_ineficiente['nome']} (Área: {f_ineficiente['departamento']}): "
-                    f"Custo agora R$ {f_ineficiente['custo_atual']:.2f}, "
-                    f"Custo se for eficiente R$ {custo_alvo:.2f}, Economia R$ {economia_individual:.2f}"
+                    f"- {nome} (Área: {self.data.departamento(i)}): "
+                    f"Custo agora R$ {dinheiro.formatar(custo_atual)}, "
+                    f"Custo se for eficiente R$ {dinheiro.formatar(custo_alvo)}, Economia R$ {dinheiro.formatar(economia_individual)}"
                 )
             else:
-                detalhes_otimizacao.append(f"- {f_ineficiente['nome']} não gera economia neste cenário (já está bom ou não há diferença significativa).") # Não tem economia
+                detalhes_otimizacao.append(f"- {nome} não gera economia neste cenário (já está bom ou não há diferença significativa).") # Não tem economia
 
         if economia_projetada == 0 and not detalhes_otimizacao: # Se não teve economia e nem detalhes para mostrar
             return "Não consegui projetar economia significativa neste cenário."
         elif economia_projetada == 0: # Se a economia é zero mas tem detalhes (ex: todos já eram eficientes)
             return "\n".join(detalhes_otimizacao)
         
-        return f"Economia total que a gente pode ter: R$ {economia_projetada:.2f}\n\nDetalhes de quem pode melhorar:\n" + "\n".join(detalhes_otimizacao) # Mostra o resultado final
+        return f"Economia total que a gente pode ter: R$ {dinheiro.formatar(economia_projetada)}\n\nDetalhes de quem pode melhorar:\n" + "\n".join(detalhes_otimizacao) # Mostra o resultado final
+
+    def simulador_cenarios(self):
+        """O simulador de cenários de economia (veja cenarios.py), refeito só se os dados mudaram."""
+        if self._cache_simulador is None or not self._cache_simulador.atualizado(self.data):
+            with self.instrumentacao.etapa("cenarios_preparar") as etapa:
+                self._cache_simulador = SimuladorCenarios(self.data) # Ordem e somas acumuladas, uma vez só
+                etapa.linhas = len(self.data)
+        return self._cache_simulador
+
+    def simular_cenarios(self, cenarios, max_processos=None):
+        """
+        A projeção de economia para muitos cenários de uma vez (ex: cenarios.grade(fatores=[1.6, 1.8], quantidades=[3, 10])).
+        Devolve um dicionário por cenário com 'pessoas' e 'economia' (em centavos).
+        """
+        simulador = self.simulador_cenarios()
+        with self.instrumentacao.etapa("cenarios") as etapa:
+            tabela = simulador.avaliar(cenarios, max_processos)
+            etapa.linhas = len(tabela)
+        return tabela
+
+    def linhas_do_comando(self, command):
+        """
+        A mesma resposta do process_command, mas entregue uma linha de cada vez.
+        O ranking de eficiência (opção 4) sai direto do ranking, sem montar o texto inteiro.
+        """
+        if self.data and RELATORIOS.get(str(command).lower()) == "eficiencia_por_experiencia" and self._agregados().ranking:
+            yield TITULO_EFICIENCIA
+            yield from self.instrumentacao.medir_geracao("relatorio_eficiencia_por_experiencia", self.linhas_eficiencia_por_experiencia()) # Mede só o tempo de montar as linhas
+        else:
+            yield from self.process_command(command).split("\n")
+
+    # --- Os mesmos relatórios, mas com os números crus (para outros programas lerem) ---
+
+    def registros(self, command, pagina=None, por_pagina=50):
+        """
+        Devolve o resultado de um comando como registros (dicionários) com os números sem formatar,
+        um de cada vez, para quem quer gravar em JSON Lines ou CSV. O ranking de eficiência (opção 4)
+        também pode vir só numa página. Dá ValueError se o comando não existe ou não tem páginas.
+        """
+        relatorio = RELATORIOS.get(str(command).lower()) # Qual relatório o comando chama
+        if relatorio is None:
+            raise ValueError(f"Comando desconhecido: {command}")
+        if pagina is not None and relatorio != "eficiencia_por_experiencia": # Só o ranking é dividido em páginas
+            raise ValueError(f"O comando {command} não tem páginas.")
+        if not self.data: # Sem dados, sem registros
+            return iter(())
+        if pagina is not None:
+            registros = self._registros_eficiencia_por_experiencia(pagina, por_pagina)
+        else:
+            registros = getattr(self, f"_registros_{relatorio}")()
+        return self.instrumentacao.medir_geracao(f"relatorio_{relatorio}", registros) # Mede só o tempo de montar os registros
+
+    def _registros_custo_por_departamento(self):
+        """Custo total e número de funcionários de cada área."""
+        agregados = self._agregados()
+        for codigo, count in enumerate(agregados.contagens):
+            if count: # Só as áreas que têm gente
+                yield {"departamento": self.data.departamentos[codigo], "funcionarios": count, "custo_total": dinheiro.em_reais(self._calcular_custo_total(agregados.somas_salario[codigo]))}
+
+    def _registros_custo_medio(self):
+        """Custo médio por funcionário ativo."""
+        yield {"funcionarios": len(self.data), "custo_medio": dinheiro.em_reais(dinheiro.arredondar(Fraction(self._calcular_custo_total(self._agregados().total_salarios), len(self.data))))}
+
+    def _registros_mais_menos_custoso(self):
+        """A área que custa mais e a que custa menos, com os custos."""
+        agregados = self._agregados()
+        codigos = [codigo for codigo, count in enumerate(agregados.contagens) if count]
+        mais = max(codigos, key=agregados.somas_salario.__getitem__)
+        menos = min(codigos, key=agregados.somas_salario.__getitem__)
+        yield {"mais_custoso": self.data.departamentos[mais], "custo_mais_custoso": dinheiro.em_reais(self._calcular_custo_total(agregados.somas_salario[mais])),
+               "menos_custoso": self.data.departamentos[menos], "custo_menos_custoso": dinheiro.em_reais(self._calcular_custo_total(agregados.somas_salario[menos]))}
+
+    def _registro_funcionario(self, i, **extras):
+        """O registro básico de um funcionário, com o que mais precisar."""
+        return {"nome": self.data.nomes[i], "departamento": self.data.departamento(i), "eficiencia": dinheiro.em_reais(self._agregados().eficiencia_em_centavos(i)), **extras}
+
+    def _registros_eficiencia_por_experiencia(self, pagina=None, por_pagina=50):
+        """
+        O ranking de eficiência, um funcionário por registro: inteiro, ou só a página pedida.
+        A página é conferida já na chamada (ValueError se não existe), antes do primeiro registro.
+        """
+        ordem = self._agregados().ranking # Do mais eficiente para o menos eficiente
+        primeira = 1 # Posição no ranking do primeiro registro entregue
+        if pagina is not None:
+            ordem = ranking.pagina(ordem, pagina, por_pagina) # Só o pedaço pedido
+            primeira = (pagina - 1) * por_pagina + 1
+        return (self._registro_funcionario(i, posicao=posicao) for posicao, i in enumerate(ordem, start=primeira))
+
+    def _registros_melhor_custo_beneficio(self):
+        """Quem empatou no melhor custo-benefício."""
+        agregados = self._agregados()
+        if agregados.ranking:
+            for i in agregados.melhores():
+                yield self._registro_funcionario(i)
+
+    def _registros_projetar_economia(self, num_otimizar=3):
+        """Os menos eficientes, com custo atual, custo na média e economia de cada um."""
+        agregados = self._agregados()
+        if not agregados.ranking:
+            return
+        media_eficiencia = agregados.media_eficiencia()
+        for i in agregados.piores(num_otimizar): # Os que precisam melhorar mais
+            custo_atual = self._calcular_custo_total(self.data.salarios[i])
+            custo_alvo = dinheiro.arredondar(media_eficiencia * self.data.experiencias[i])
+            economia = max(custo_atual - custo_alvo, 0) if agregados.eficiencia_exata(i) > media_eficiencia else 0 # Quem já está na média não economiza nada
+            yield self._registro_funcionario(i, media_eficiencia=dinheiro.em_reais(dinheiro.arredondar(media_eficiencia)), custo_atual=dinheiro.em_reais(custo_atual),
+                                             custo_alvo=dinheiro.em_reais(custo_alvo), economia=dinheiro.em_reais(economia))
+
+    def _registros_menos_eficientes_por_departamento(self, quantidade=3):
+        """Os menos eficientes de cada área."""
+        agregados = self._agregados()
+        for codigo in range(len(self.data.departamentos)):
+            for posicao, i in enumerate(agregados.piores_do_departamento(codigo, quantidade), start=1):
+                yield self._registro_funcionario(i, posicao=posicao)
 
     def easter_egg(self, codigo):
         """Um segredo escondido! Digite 99 para ver."""
@@ -287,8 +720,13 @@ Pedro Lima,35,Fortaleza,Desenvolvedor,7200,8,Superior,Ativo,2019-05-18,TI"""
             return bytes.fromhex(mensagem_hex).decode() # Revela a mensagem secreta
         return "Esse código não serve para o segredo." # Se digitou errado
 
-    def process_command(self, command):
-        """Recebe o que você digitou e decide o que fazer."""
+    def process_command(self, command, pagina=None, por_pagina=50):
+        """
+        Recebe o que você digitou e decide o que fazer.
+        No ranking de eficiência (opção 4), dá para pedir só uma página. Dá ValueError se pedir página de outro comando.
+        """
+        if pagina is not None and RELATORIOS.get(str(command).lower()) != "eficiencia_por_experiencia": # Só o ranking é dividido em páginas
+            raise ValueError(f"O comando {command} não tem páginas.")
         if not self.data: # Se não tem dados carregados
             return "Ops! Não tem dados de funcionários. Não consigo fazer nada agora."
 
@@ -298,17 +736,10 @@ Pedro Lima,35,Fortaleza,Desenvolvedor,7200,8,Superior,Ativo,2019-05-18,TI"""
             return "Já vai? Espero ter ajudado, até a próxima!"
         elif command_lower == "99": # Se você digitou o código secreto
             return self.easter_egg(99)
-        elif command_lower in ["1", "custo total por departamento"]: # Se você pediu a opção 1
-            return self.custo_por_departamento()
-        elif command_lower in ["2", "custo medio por funcionario ativo"]: # Se você pediu a opção 2
-            return self.custo_medio()
-        elif command_lower in ["3", "departamento mais e menos custoso"]: # Se você pediu a opção 3
-            return self.mais_menos_custoso()
-        elif command_lower in ["4", "eficiencia por ano de experiencia"]: # Se você pediu a opção 4
-            return self.eficiencia_por_experiencia()
-        elif command_lower in ["5", "melhor custo-beneficio"]: # Se você pediu a opção 5
-            return self.melhor_custo_beneficio()
-        elif command_lower in ["6", "projecao de economia", "custos"]: # Se você pediu a opção 6
-            return self.projetar_economia()
+        elif command_lower in RELATORIOS: # Se você pediu uma das opções de 1 a 7
+            relatorio = RELATORIOS[command_lower]
+            paginas = {} if pagina is None else {"pagina": pagina, "por_pagina": por_pagina} # Só chega aqui com página na opção 4
+            with self.instrumentacao.etapa(f"relatorio_{relatorio}"): # Mede quanto o relatório demorou
+                return getattr(self, relatorio)(**paginas) # Chama o relatório certo
         else: # Se o que você digitou não é nenhuma opção
-            return "Não entendi o que você pediu. Por favor, escolha um número de 0 a 6 ou o comando '99'."
+            return "Não entendi o que você pediu. Por favor, escolha um número de 0 a 7 ou o comando '99'."
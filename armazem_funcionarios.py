@@ -0,0 +1,155 @@
+import sys # Para "internar" os nomes e não guardar o mesmo texto repetido na memória
+from array import array # Para guardar números em colunas compactas, sem um objeto Python para cada valor
+
+class ArmazemFuncionarios:
+    """
+    Guarda os funcionários em colunas em vez de um dicionário por pessoa.
+    Cada coluna é um array compacto e o departamento vira um código inteiro,
+    assim milhões de linhas cabem em pouca memória e as contas andam rápido.
+    Quem sai da planilha só é marcado como removido; as colunas são
+    apertadas de novo quando os buracos passam da metade. Quem entra numa
+    atualização vai para o fim das colunas, mas cada um lembra a sua linha
+    na planilha, que é o que decide a ordem dos empates nos relatórios.
+    """
+    def __init__(self):
+        self.nomes = [] # Nomes dos funcionários (textos internados, sem cópias repetidas)
+        self.datas_contratacao = [] # Data de contratação de cada um (junto com o nome, identifica a pessoa)
+        self.codigos_departamento = array('l') # Código do departamento de cada funcionário
+        self.salarios = array('q') # Salário de cada funcionário, em centavos (inteiros, para não perder centavos nas somas)
+        self.experiencias = array('l') # Anos de experiência de cada funcionário
+        self.codigos_origem = array('l') # De qual planilha/aba veio cada funcionário (código em self.origens)
+        self.posicoes_planilha = array('q') # Em que linha (contando só os ativos e válidos) da última planilha cada funcionário está
+        self.na_ordem_da_planilha = True # Se a ordem das colunas é a da planilha (deixa de ser quando uma atualização põe alguém novo no meio)
+        self.vivos = bytearray() # 1 se a linha vale, 0 se o funcionário foi removido
+        self.removidos = 0 # Quantas linhas estão marcadas como removidas
+        self.departamentos = [] # Nome de cada departamento, na posição do seu código
+        self._codigo_por_departamento = {} # Caminho inverso: nome do departamento -> código
+        self.origens = [] # Link de cada planilha/aba de onde vieram os dados, na posição do seu código (vazio se veio de uma só)
+        self.versao = 0 # Aumenta toda vez que os dados mudam, para quem guardou contas saber que elas ficaram velhas
+
+    def __len__(self):
+        """Quantos funcionários estão guardados (sem contar os removidos)."""
+        return len(self.salarios) - self.removidos
+
+    def codigo_departamento(self, departamento):
+        """Devolve o código do departamento, criando um novo se ele ainda não existe."""
+        codigo = self._codigo_por_departamento.get(departamento) # Vê se já conhecemos esse departamento
+        if codigo is None: # Se é a primeira vez que ele aparece
+            codigo = len(self.departamentos) # O código é a próxima posição livre
+            self.departamentos.append(departamento) # Guarda o nome do departamento
+            self._codigo_por_departamento[departamento] = codigo # E lembra o código dele
+        return codigo
+
+    def adicionar(self, nome, departamento, salario, experiencia, data_contratacao=None, origem=0, posicao_planilha=None):
+        """
+        Coloca mais um funcionário no final de cada coluna e devolve a posição dele.
+        Sem posicao_planilha, ele fica depois de todos na planilha também.
+        """
+        self.nomes.append(sys.intern(nome) if nome is not None else None) # Guarda o nome sem duplicar textos iguais
+        self.datas_contratacao.append(sys.intern(data_contratacao) if data_contratacao is not None else None) # Guarda a data do mesmo jeito
+        self.codigos_departamento.append(self.codigo_departamento(departamento)) # Guarda só o código da área
+        self.salarios.append(salario) # Guarda o salário (em centavos)
+        self.experiencias.append(experiencia) # Guarda a experiência
+        self.codigos_origem.append(origem) # Guarda de onde ele veio
+        self.posicoes_planilha.append(len(self.salarios) - 1 if posicao_planilha is None else posicao_planilha) # Guarda a linha dele na planilha
+        self.vivos.append(1) # A linha nasce valendo
+        self.versao += 1 # Os dados mudaram
+        return len(self.salarios) - 1
+
+    def alterar(self, i, departamento, salario, experiencia):
+        """Troca os dados do funcionário da posição i, sem mudar ele de lugar."""
+        self.codigos_departamento[i] = self.codigo_departamento(departamento)
+        self.salarios[i] = salario
+        self.experiencias[i] = experiencia
+        self.versao += 1 # Os dados mudaram
+
+    def remover(self, i):
+        """Marca o funcionário da posição i como removido."""
+        self.vivos[i] = 0
+        self.removidos += 1
+        self.versao += 1 # Os dados mudaram
+
+    def precisa_compactar(self):
+        """Diz se os buracos dos removidos já ocupam mais da metade das colunas."""
+        return self.removidos > len(self.salarios) // 2
+
+    def compactar(self):
+        """Tira os buracos dos removidos, mantendo a ordem de quem ficou."""
+        manter = [i for i, vivo in enumerate(self.vivos) if vivo] # Posições que continuam valendo
+        self.nomes = [self.nomes[i] for i in manter]
+        self.datas_contratacao = [self.datas_contratacao[i] for i in manter]
+        self.codigos_departamento = array('l', (self.codigos_departamento[i] for i in manter))
+        self.salarios = array('q', (self.salarios[i] for i in manter))
+        self.experiencias = array('l', (self.experiencias[i] for i in manter))
+        self.codigos_origem = array('l', (self.codigos_origem[i] for i in manter))
+        self.posicoes_planilha = array('q', (self.posicoes_planilha[i] for i in manter))
+        self.vivos = bytearray(b"\x01") * len(manter)
+        self.removidos = 0
+        self.versao += 1 # As posições mudaram
+
+    def juntar(self, outro, origem):
+        """
+        Coloca no fim das colunas todos os funcionários de outro armazém (sem buracos),
+        marcando que eles vieram de 'origem' (o link da planilha/aba).
+        """
+        codigo_origem = len(self.origens) # Código da nova origem
+        self.origens.append(origem)
+        traducao = [self.codigo_departamento(departamento) for departamento in outro.departamentos] # Código lá -> código aqui
+        inicio = len(self) # Na planilha, os de lá vêm depois de todos os daqui
+        self.nomes.extend(outro.nomes)
+        self.datas_contratacao.extend(outro.datas_contratacao)
+        self.codigos_departamento.extend(array('l', (traducao[codigo] for codigo in outro.codigos_departamento)))
+        self.salarios.extend(outro.salarios)
+        self.experiencias.extend(outro.experiencias)
+        self.codigos_origem.extend(array('l', [codigo_origem]) * len(outro.salarios))
+        self.posicoes_planilha.extend(array('q', (inicio + posicao for posicao in outro.posicoes_planilha)))
+        self.vivos.extend(bytearray(b"\x01") * len(outro.salarios))
+        self.versao += 1 # Os dados mudaram
+
+    def origem(self, i):
+        """De qual planilha/aba veio o funcionário da posição i (None se os dados vieram de uma só)."""
+        return self.origens[self.codigos_origem[i]] if self.origens else None
+
+    def posicoes(self):
+        """As posições de todos os funcionários que valem, na ordem das colunas."""
+        if not self.removidos: # Sem buracos, é só contar
+            return range(len(self.salarios))
+        return (i for i, vivo in enumerate(self.vivos) if vivo)
+
+    def posicoes_em_ordem(self):
+        """As posições de todos os funcionários que valem, na ordem em que eles aparecem na planilha."""
+        if self.na_ordem_da_planilha: # As colunas já estão na ordem da planilha
+            return self.posicoes()
+        return sorted(self.posicoes(), key=self.posicoes_planilha.__getitem__)
+
+    def reordenar_departamentos(self, ordem):
+        """
+        Troca os códigos das áreas para seguirem 'ordem' (os códigos atuais, na ordem nova; as áreas
+        que faltarem vão para o fim). Devolve a ordem completa, para quem guarda contas por código.
+        """
+        presentes = set(ordem)
+        ordem = list(ordem) + [codigo for codigo in range(len(self.departamentos)) if codigo not in presentes]
+        traducao = [0] * len(ordem) # Código velho -> código novo
+        for novo, velho in enumerate(ordem):
+            traducao[velho] = novo
+        self.codigos_departamento = array('l', map(traducao.__getitem__, self.codigos_departamento))
+        self.departamentos = [self.departamentos[velho] for velho in ordem]
+        self._codigo_por_departamento = {departamento: codigo for codigo, departamento in enumerate(self.departamentos)}
+        self.versao += 1 # Os códigos mudaram
+        return ordem
+
+    def chaves(self):
+        """
+        Identifica cada funcionário por (nome, data de contratação, ocorrência).
+        A ocorrência separa pessoas repetidas com o mesmo nome e a mesma data, contando na ordem da planilha.
+        """
+        vistos = {} # Quantas vezes cada (nome, data) já apareceu
+        for i in self.posicoes_em_ordem():
+            chave = (self.nomes[i], self.datas_contratacao[i])
+            ocorrencia = vistos.get(chave, 0)
+            vistos[chave] = ocorrencia + 1
+            yield chave + (ocorrencia,), i
+
+    def departamento(self, i):
+        """Devolve o nome do departamento do funcionário na posição i."""
+        return self.departamentos[self.codigos_departamento[i]]
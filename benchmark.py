@@ -0,0 +1,300 @@
+import argparse # Para ler as opções da linha de comando
+import contextlib # Para esconder as mensagens do programa enquanto medimos
+import heapq # Para o jeito do heap na comparação dos piores
+import csv # Para ler o CSV do mesmo jeito nos dois lados da comparação do dinheiro
+import io # Para jogar as mensagens escondidas em lugar nenhum
+import json # Para gravar os resultados da suíte e comparar versões
+import multiprocessing # Para cada rodada da suíte rodar num processo limpo
+import os # Para mexer com os arquivos da planilha inventada
+import platform # Para anotar em que máquina os resultados foram medidos
+import subprocess # Para perguntar ao git em que versão o código está
+import sys # Para sair com erro quando algo piorou
+import tempfile # Para uma pasta de cópias que some depois
+import time # Para medir quanto tempo cada coisa demora
+from concurrent.futures import ProcessPoolExecutor # Para rodar cada rodada da suíte num processo novo
+from datetime import datetime # Para anotar quando os resultados foram medidos
+from array import array # As colunas dos funcionários
+from itertools import repeat # O fator repetido para a coluna inteira
+from operator import mul, truediv # A multiplicação e a divisão como funções, como no agregador
+import tracemalloc # Para medir quanta memória os dados ocupam
+try:
+    import resource # Para saber o pico de memória do processo (não existe no Windows)
+except ImportError:
+    resource = None
+import gerador_dados # Para inventar planilhas inteiras no formato do desafio
+import dinheiro # Para comparar as contas em centavos com as contas em float
+from analisador_csv import CSVAnalyzer, arrumar_linha # A parte inteligente do programa e como ela arruma cada linha
+from armazem_funcionarios import ArmazemFuncionarios # As colunas onde os funcionários ficam guardados
+from cache_snapshot import CacheSnapshots # A cópia binária dos dados no disco
+from servidor_de_teste import servir_csv # O servidor de mentira que entrega a planilha (o mesmo dos testes)
+
+RELATORIOS_MEDIDOS = ["1", "2", "3", "4", "5", "6", "7"] # As opções do menu que a suíte mede
+TAMANHOS_DA_SUITE = [1_000, 10_000, 100_000, 1_000_000] # Padrão da suíte (10 milhões é só pedir: python benchmark.py --suite 10000000 --streaming)
+FOLGA_MINIMA_S = 0.005 # Diferenças menores que isso são ruído e não contam como piora
+
+def funcionarios_inventados(quantidade):
+    """Os funcionários da planilha inventada (gerador_dados), todos ativos e já arrumados como o analisador guarda."""
+    for linha in gerador_dados.gerar_linhas(quantidade, proporcao_inativos=0.0):
+        yield arrumar_linha(dict(zip(gerador_dados.COLUNAS, linha))) # (nome, departamento, salário em centavos, experiência, data)
+
+def memoria_por_linha(quantidade):
+    """Compara quantos bytes cada funcionário ocupa na lista de dicionários antiga e nas colunas novas."""
+    tracemalloc.start() # Começa a contar a memória
+    antes = tracemalloc.get_traced_memory()[0]
+    lista = [{"nome": nome, "departamento": dep, "salario": salario, "experiencia": experiencia} for nome, dep, salario, experiencia, _ in funcionarios_inventados(quantidade)] # Jeito antigo
+    bytes_lista = tracemalloc.get_traced_memory()[0] - antes
+    del lista # Joga fora para não atrapalhar a próxima medida
+
+    antes = tracemalloc.get_traced_memory()[0]
+    armazem = ArmazemFuncionarios() # Jeito novo
+    for funcionario in funcionarios_inventados(quantidade):
+        armazem.adicionar(*funcionario)
+    bytes_armazem = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop() # Para de contar
+    return bytes_lista / quantidade, bytes_armazem / quantidade, armazem
+
+def tempo_dos_relatorios(armazem):
+    """Mede quanto tempo cada opção do menu leva com esses dados."""
+    analyzer = CSVAnalyzer(armazem=armazem) # Usa os funcionários de mentira direto, sem internet
+    tempos = {}
+    for opcao in ["1", "2", "3", "4", "5", "6", "7"]: # Cada opção do menu
+        inicio = time.perf_counter()
+        analyzer.process_command(opcao)
+        tempos[opcao] = time.perf_counter() - inicio
+    return tempos
+
+def piores_com_heap(posicoes, eficiencias, quantidade):
+    """Os k menos eficientes de qualquer grupo de posições, com um heap (O(n log k), sem ordenar tudo)."""
+    return heapq.nlargest(quantidade, posicoes, key=eficiencias.__getitem__)
+
+def comparar_ranking(armazem, quantidades=(1, 3, 10, 100, 1000)):
+    """Compara três jeitos de achar os k menos eficientes: ordenar tudo, usar um heap e ler o ranking mantido."""
+    agregados = CSVAnalyzer(armazem=armazem)._agregados() # Ranking já pronto
+    eficiencias = agregados.eficiencias
+    posicoes = list(armazem.posicoes()) # Na ordem da planilha, sem ordenar (como o jeito antigo recebia)
+    tempos = {}
+    for k in quantidades: # Para cada tamanho de "top k"
+        inicio = time.perf_counter()
+        sorted(posicoes, key=eficiencias.__getitem__, reverse=True)[:k] # Jeito antigo: ordena tudo
+        ordenando = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        piores_com_heap(posicoes, eficiencias, k) # Heap: O(n log k)
+        com_heap = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        agregados.piores(k) # Ranking mantido: O(k)
+        mantido = time.perf_counter() - inicio
+        tempos[k] = (ordenando, com_heap, mantido)
+    return tempos
+
+def comparar_dinheiro(quantidade):
+    """
+    Compara o jeito antigo (float) com o novo (centavos inteiros) do começo ao fim, como o programa faz:
+    lê o CSV, transforma os salários, soma o custo de cada área (x1,8) e calcula a eficiência de cada um.
+    Devolve os tempos dos dois jeitos e quantos centavos o float errou no custo total.
+    """
+    areas = gerador_dados.nomes_dos_departamentos(8) # As áreas que o gerador usa por padrão
+    codigos_areas = {area: codigo for codigo, area in enumerate(areas)}
+    departamento, salario, experiencia = (gerador_dados.COLUNAS.index(coluna) for coluna in ("departamento", "salario", "experiencia_anos"))
+    linhas = [f'{codigos_areas[linha[departamento]]},"{linha[salario]}",{linha[experiencia]}' for linha in gerador_dados.gerar_linhas(quantidade, departamentos=len(areas))] # Salários como na planilha: "5500,00"
+    conteudo = "departamento,salario,experiencia_anos\n" + "\n".join(linhas)
+
+    def ler(centavos):
+        """Lê o CSV em colunas, com o salário lido como o jeito antigo (float) ou o novo (centavos) lê, direto na linha."""
+        codigos, salarios, experiencias = array('l'), array('q' if centavos else 'd'), array('l')
+        leitor = csv.reader(io.StringIO(conteudo))
+        next(leitor) # Pula o cabeçalho
+        for departamento, salario, experiencia in leitor:
+            codigos.append(int(departamento))
+            if not centavos: # Como o _validate_data antigo lia
+                salarios.append(float(salario.replace(",", ".")))
+            else: # Como o arrumar_linha lê
+                salarios.append(dinheiro.para_centavos(salario))
+            experiencias.append(int(experiencia))
+        return codigos, salarios, experiencias
+
+    inicio = time.perf_counter() # Jeito antigo
+    codigos, salarios, experiencias = ler(centavos=False)
+    somas = [0.0] * len(areas)
+    for codigo, salario in zip(codigos, salarios):
+        somas[codigo] += salario
+    custos_float = [soma * 1.8 for soma in somas] # Como o _calcular_custo_total de antes
+    array('d', map(truediv, map(mul, salarios, repeat(1.8)), [experiencia or 1 for experiencia in experiencias])) # A eficiência, com a coluna inteira de uma vez, como nos centavos
+    com_float = time.perf_counter() - inicio
+
+    inicio = time.perf_counter() # Jeito novo
+    codigos, salarios, experiencias = ler(centavos=True)
+    somas = [0] * len(areas)
+    for codigo, salario in zip(codigos, salarios):
+        somas[codigo] += salario
+    custos_centavos = [dinheiro.custo_total(soma) for soma in somas] # Como o _calcular_custo_total de hoje
+    array('d', map(truediv, dinheiro.custos_totais(salarios), [experiencia or 1 for experiencia in experiencias])) # Como o agregador calcula
+    com_centavos = time.perf_counter() - inicio
+
+    erro = abs(round(sum(custos_float) * 100) - sum(custos_centavos)) # Centavos de diferença no custo total
+    return com_float, com_centavos, erro
+
+def tempo_de_inicio(quantidade):
+    """Mede quanto o programa demora para abrir sem cópia salva (frio) e com cópia salva (quente)."""
+    servidor, url = servir_csv(gerador_dados.gerar_csv(quantidade))
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()): # Pasta de cópias nova e sem mensagens
+        inicio = time.perf_counter()
+        CSVAnalyzer(url, streaming=True, cache=CacheSnapshots(pasta)) # Frio: baixa, arruma e salva a cópia
+        frio = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        CSVAnalyzer(url, streaming=True, cache=CacheSnapshots(pasta)) # Quente: lê a cópia
+        quente = time.perf_counter() - inicio
+    servidor.shutdown()
+    return frio, quente
+
+def pico_de_memoria():
+    """O máximo de memória que este processo já usou, em bytes (None se o sistema não informa)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024 # No Linux vem em KB, no macOS em bytes
+
+def medir_rodada(quantidade, opcoes_gerador, streaming=False):
+    """
+    Mede uma rodada completa com uma planilha inventada: carga (download e leitura do CSV),
+    arrumação, contas e cada opção do menu. Devolve um dicionário pronto para virar JSON.
+    Roda de preferência num processo novo (veja rodar_suite), para o pico de memória ser só dela.
+    """
+    tempos = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "planilha.csv")
+        with open(caminho, "w", encoding="utf-8", newline="") as saida: # A planilha vai para o disco, não para a memória
+            gerador_dados.escrever_csv(saida, quantidade, **opcoes_gerador)
+        tamanho_csv = os.path.getsize(caminho)
+        servidor, url = servir_csv(caminho=caminho)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): # Sem as mensagens do programa
+                analyzer = CSVAnalyzer(url, armazem=ArmazemFuncionarios(), streaming=streaming) # Vazio: a carga é medida aqui embaixo
+                inicio = time.perf_counter()
+                sucesso, mensagem = analyzer._load_from_sheets(url) # No modo streaming, a arrumação acontece junto com a carga
+                tempos["carga"] = time.perf_counter() - inicio
+                if not sucesso:
+                    raise RuntimeError(mensagem)
+                if not streaming:
+                    inicio = time.perf_counter()
+                    analyzer._validate_data()
+                    tempos["validacao"] = time.perf_counter() - inicio
+                    analyzer.raw_data = [] # Os dados brutos não são mais precisos
+                inicio = time.perf_counter()
+                analyzer.preparar_contas()
+                tempos["agregados"] = time.perf_counter() - inicio
+                for opcao in RELATORIOS_MEDIDOS: # Cada opção do menu
+                    inicio = time.perf_counter()
+                    analyzer.process_command(opcao)
+                    tempos[f"opcao_{opcao}"] = time.perf_counter() - inicio
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+    return {"linhas": quantidade, "funcionarios": len(analyzer.data), "tamanho_csv_bytes": tamanho_csv,
+            "streaming": streaming, "tempos_s": tempos, "pico_memoria_bytes": pico_de_memoria()}
+
+def versao_do_codigo():
+    """O commit do git em que o código está (None se não der para saber)."""
+    try:
+        resultado = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip() or None
+
+def rodar_suite(tamanhos, opcoes_gerador, streaming=False, rotulo=None, ao_terminar_rodada=None):
+    """
+    Mede uma rodada para cada tamanho, cada uma num processo novo, e junta tudo com as informações da máquina.
+    Se passar ao_terminar_rodada, ela é chamada com cada rodada assim que termina (para mostrar o andamento).
+    """
+    rodadas = []
+    for quantidade in tamanhos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as processo: # Processo limpo: o pico de memória é só desta rodada
+            rodada = processo.submit(medir_rodada, quantidade, opcoes_gerador, streaming).result()
+        rodadas.append(rodada)
+        if ao_terminar_rodada is not None:
+            ao_terminar_rodada(rodada)
+    return {"rotulo": rotulo, "versao": versao_do_codigo(), "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "plataforma": platform.platform(), "gerador": opcoes_gerador, "rodadas": rodadas}
+
+def comparar_resultados(anterior, atual, tolerancia=0.2):
+    """
+    Compara duas execuções da suíte, tamanho por tamanho (só rodadas com o mesmo modo de carga). Devolve as pioras:
+    etapas que ficaram mais de 'tolerancia' mais lentas (ignorando diferenças menores que FOLGA_MINIMA_S)
+    e picos de memória que cresceram além dela.
+    """
+    pioras = []
+    antes_por_tamanho = {(rodada["linhas"], rodada["streaming"]): rodada for rodada in anterior["rodadas"]}
+    for rodada in atual["rodadas"]:
+        antes = antes_por_tamanho.get((rodada["linhas"], rodada["streaming"]))
+        if antes is None: # Esse tamanho não foi medido antes desse jeito
+            continue
+        for etapa, segundos in rodada["tempos_s"].items():
+            segundos_antes = antes["tempos_s"].get(etapa)
+            if segundos_antes is not None and segundos > segundos_antes * (1 + tolerancia) and segundos - segundos_antes > FOLGA_MINIMA_S:
+                pioras.append(f"{rodada['linhas']} linhas, {etapa}: {segundos_antes * 1000:.1f} ms -> {segundos * 1000:.1f} ms")
+        memoria, memoria_antes = rodada["pico_memoria_bytes"], antes["pico_memoria_bytes"]
+        if memoria and memoria_antes and memoria > memoria_antes * (1 + tolerancia):
+            pioras.append(f"{rodada['linhas']} linhas, pico de memória: {memoria_antes / 2**20:.1f} MB -> {memoria / 2**20:.1f} MB")
+    return pioras
+
+def mostrar_rodada(rodada):
+    """Mostra os tempos e o pico de memória de uma rodada da suíte."""
+    print(f"\n{rodada['linhas']} linhas ({rodada['funcionarios']} funcionários válidos, CSV de {rodada['tamanho_csv_bytes'] / 2**20:.1f} MB):")
+    for etapa, segundos in rodada["tempos_s"].items():
+        print(f"  {etapa}: {segundos * 1000:.1f} ms")
+    if rodada["pico_memoria_bytes"] is not None:
+        print(f"  Pico de memória: {rodada['pico_memoria_bytes'] / 2**20:.1f} MB")
+
+def main_suite(tamanhos, opcoes_gerador, streaming=False, arquivo_json=None, arquivo_anterior=None, tolerancia=0.2, rotulo=None):
+    """Roda a suíte, mostra cada rodada, grava o JSON e compara com uma execução anterior. Devolve 1 se algo piorou."""
+    resultado = rodar_suite(tamanhos, opcoes_gerador, streaming, rotulo, mostrar_rodada)
+
+    if arquivo_json: # Guarda para comparar com a próxima versão
+        with open(arquivo_json, "w", encoding="utf-8") as saida:
+            json.dump(resultado, saida, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {arquivo_json}")
+    if arquivo_anterior: # Compara com uma versão anterior
+        with open(arquivo_anterior, encoding="utf-8") as entrada:
+            anterior = json.load(entrada)
+        pioras = comparar_resultados(anterior, resultado, tolerancia)
+        print(f"\nComparando com {arquivo_anterior} (versão {anterior.get('versao')}):")
+        if anterior.get("gerador") != resultado["gerador"]: # Planilhas diferentes não dão uma comparação justa
+            print("  Atenção: a planilha inventada foi gerada com outras opções.")
+        for piora in pioras:
+            print(f"  Piorou: {piora}")
+        if not pioras:
+            print(f"  Nada ficou mais de {tolerancia:.0%} pior.")
+        return 1 if pioras else 0
+    return 0
+
+def main(tamanhos, inicio=False):
+    for quantidade in tamanhos: # Para cada tamanho de planilha
+        bytes_lista, bytes_armazem, armazem = memoria_por_linha(quantidade)
+        print(f"\n{quantidade} funcionários:")
+        print(f"  Memória por linha: lista de dicionários {bytes_lista:.1f} B, colunas {bytes_armazem:.1f} B")
+        for opcao, segundos in tempo_dos_relatorios(armazem).items():
+            print(f"  Opção {opcao}: {segundos * 1000:.1f} ms")
+        for k, (ordenando, com_heap, mantido) in comparar_ranking(armazem).items():
+            print(f"  Piores {k}: ordenando {ordenando * 1000:.1f} ms, heap {com_heap * 1000:.1f} ms, ranking mantido {mantido * 1000:.3f} ms")
+        com_float, com_centavos, erro = comparar_dinheiro(quantidade)
+        print(f"  Dinheiro: float {com_float * 1000:.1f} ms, centavos {com_centavos * 1000:.1f} ms ({com_centavos / com_float:.2f}x o float; o float errou {erro} centavo(s) no custo total)")
+        if inicio: # Também mede a abertura do programa
+            frio, quente = tempo_de_inicio(quantidade)
+            print(f"  Abertura: sem cópia salva {frio * 1000:.1f} ms, com cópia salva {quente * 1000:.1f} ms")
+
+if __name__ == "__main__": # Ex: python benchmark.py 100000 1000000 10000000 --inicio  ou  python benchmark.py --suite --json resultados.json
+    parser = argparse.ArgumentParser(description="Testes de velocidade da calculadora de custos.")
+    parser.add_argument("tamanhos", nargs="*", type=int, help="Quantos funcionários inventar em cada rodada")
+    parser.add_argument("--inicio", action="store_true", help="Também mede a abertura do programa com e sem a cópia salva")
+    parser.add_argument("--suite", action="store_true", help="Mede carga, arrumação e cada opção com uma planilha inventada, com pico de memória")
+    parser.add_argument("--streaming", action="store_true", help="Na suíte, carrega no modo streaming (carga e arrumação juntas)")
+    parser.add_argument("--json", help="Na suíte, grava os resultados nesse arquivo")
+    parser.add_argument("--comparar", help="Na suíte, compara com os resultados gravados de outra versão")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Na comparação, quanto pior pode ficar antes de avisar (padrão: 0.2 = 20%%)")
+    parser.add_argument("--rotulo", help="Um nome para esta execução no JSON (ex: o nome do branch)")
+    gerador_dados.adicionar_opcoes(parser)
+    args = parser.parse_args()
+    if args.suite:
+        sys.exit(main_suite(args.tamanhos or TAMANHOS_DA_SUITE, gerador_dados.opcoes_do_gerador(args), args.streaming,
+                            args.json, args.comparar, args.tolerancia, args.rotulo))
+    main(args.tamanhos or [100_000, 1_000_000], args.inicio)
@@ -0,0 +1,156 @@
+import hashlib # Para tirar a "impressão digital" dos dados
+import json # Para guardar as informações pequenas (nomes das áreas, ETag...) dentro do arquivo
+import os # Para mexer com pastas e arquivos
+import struct # Para escrever e ler o cabeçalho binário do arquivo
+import sys # Para "internar" os nomes lidos, como o armazém faz
+import time # Para saber se a cópia salva já está velha
+from array import array # As colunas são arrays, e arrays viram bytes direto
+from armazem_funcionarios import ArmazemFuncionarios # Onde os funcionários ficam guardados em colunas
+
+MAGICO = b"CALCSNP4" # Marca no começo do arquivo para saber que ele é nosso (a 3 guarda os salários em centavos; a 4 lembra nomes e datas que faltavam)
+CABECALHO = struct.Struct("<8sIqqqq32s") # Marca, tamanho do tipo 'l', linhas, tamanho das infos, dos nomes e das datas, impressão digital
+PASTA_PADRAO = os.path.join(os.path.expanduser("~"), ".cache", "calculadora_custos") # Onde as cópias ficam por padrão
+
+class CacheSnapshots:
+    """
+    Guarda no disco uma cópia binária dos funcionários já arrumados, uma por planilha/aba.
+    Na próxima vez que o programa abrir, ele lê essa cópia em vez de baixar e arrumar tudo de novo.
+    Cópias conferidas há mais de 'validade_segundos' precisam ser conferidas com a planilha antes de serem usadas;
+    cópias sem uso há mais de 'tempo_maximo_segundos', ou que passem do tamanho máximo da pasta, são apagadas.
+    No arquivo, a data de modificação guarda quando a cópia foi conferida e a de acesso, quando foi usada.
+    """
+    def __init__(self, pasta=PASTA_PADRAO, validade_segundos=3600, tempo_maximo_segundos=7 * 24 * 3600, tamanho_maximo_bytes=500 * 1024 * 1024):
+        self.pasta = pasta # Onde os arquivos ficam
+        self.validade_segundos = validade_segundos # Até quando a cópia vale sem perguntar para a planilha
+        self.tempo_maximo_segundos = tempo_maximo_segundos # Cópia sem uso por mais tempo que isso é apagada
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes # Tamanho máximo de todas as cópias juntas
+
+    def _caminho(self, chave):
+        """Onde fica o arquivo de uma planilha/aba."""
+        return os.path.join(self.pasta, f"{chave}.snap")
+
+    def salvar(self, chave, armazem, etag=None, last_modified=None):
+        """
+        Escreve a cópia binária dos funcionários. Se nada mudou desde a última cópia, só marca ela como nova.
+        Só os funcionários que valem vão para o disco, na ordem da planilha; o armazém não é mexido
+        (depois de uma atualização ele continua com os buracos e as contas que já tinha).
+        """
+        infos = json.dumps({"departamentos": armazem.departamentos, "origens": armazem.origens, "etag": etag, "last_modified": last_modified}).encode("utf-8")
+        colunas = [armazem.codigos_departamento, armazem.salarios, armazem.experiencias, armazem.codigos_origem]
+        nomes, datas = armazem.nomes, armazem.datas_contratacao
+        if armazem.removidos or not armazem.na_ordem_da_planilha: # Sem os removidos e na ordem da planilha: quem lê não precisa das linhas de cada um
+            ordem = list(armazem.posicoes_em_ordem())
+            colunas = [array(coluna.typecode, map(coluna.__getitem__, ordem)) for coluna in colunas]
+            nomes, datas = [nomes[i] for i in ordem], [datas[i] for i in ordem]
+        colunas = [coluna.tobytes() for coluna in colunas]
+        faltando = bytes(nome is None for nome in nomes) + bytes(data is None for data in datas) # 1 para cada nome ou data que não veio (None, diferente de "")
+        nomes = "\x00".join(nome or "" for nome in nomes).encode("utf-8") # Todos os nomes num bloco só
+        datas = "\x00".join(data or "" for data in datas).encode("utf-8") # Todas as datas num bloco só
+
+        digital = hashlib.sha256() # Impressão digital do conteúdo
+        for bloco in [infos, nomes, datas, faltando] + colunas:
+            digital.update(bloco)
+        digital = digital.digest()
+
+        caminho = self._caminho(chave)
+        if self._digital_salva(caminho) == digital: # O conteúdo é o mesmo da cópia que já está lá
+            self.tocar(chave)
+            return
+
+        os.makedirs(self.pasta, exist_ok=True) # Cria a pasta se ainda não existe
+        temporario = caminho + ".tmp" # Escreve num arquivo à parte e só troca no final, para nunca deixar uma cópia pela metade
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(CABECALHO.pack(MAGICO, array('l').itemsize, len(armazem), len(infos), len(nomes), len(datas), digital))
+            for bloco in [infos, nomes, datas, faltando] + colunas:
+                arquivo.write(bloco)
+        os.replace(temporario, caminho)
+        self._despejar() # Vê se precisa apagar cópias velhas ou grandes demais
+
+    def _digital_salva(self, caminho):
+        """Lê só a impressão digital de uma cópia que já existe (ou None)."""
+        try:
+            with open(caminho, "rb") as arquivo:
+                cabecalho = arquivo.read(CABECALHO.size)
+        except OSError:
+            return None
+        if len(cabecalho) != CABECALHO.size or cabecalho[:8] != MAGICO:
+            return None
+        return CABECALHO.unpack(cabecalho)[-1]
+
+    def carregar(self, chave):
+        """
+        Lê a cópia de uma planilha/aba. Devolve (armazem, infos) ou None se não tem cópia que sirva.
+        Em infos, 'fresca' diz se a cópia ainda está dentro da validade.
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read() # O arquivo inteiro de uma vez: as colunas vão ser copiadas para os arrays de qualquer jeito
+            return self._ler(memoryview(conteudo), caminho)
+        except (OSError, ValueError, struct.error): # Arquivo sumiu, está vazio ou estragado
+            return None
+
+    def _ler(self, conteudo, caminho):
+        """
+        Monta o armazém a partir do arquivo lido. Os pedaços saem do conteúdo por memoryview, sem cópias
+        no meio do caminho: cada byte é copiado uma vez só, direto para a coluna ou para o texto dos nomes.
+        """
+        magico, tamanho_l, linhas, tamanho_infos, tamanho_nomes, tamanho_datas, _ = CABECALHO.unpack_from(conteudo)
+        if magico != MAGICO or tamanho_l != array('l').itemsize: # Não é nosso ou foi feito em outro tipo de computador
+            return None
+
+        posicao = CABECALHO.size
+        infos = json.loads(str(conteudo[posicao:posicao + tamanho_infos], "utf-8")); posicao += tamanho_infos
+        nomes = str(conteudo[posicao:posicao + tamanho_nomes], "utf-8"); posicao += tamanho_nomes
+        datas = str(conteudo[posicao:posicao + tamanho_datas], "utf-8"); posicao += tamanho_datas
+        faltando = bytes(conteudo[posicao:posicao + 2 * linhas]); posicao += 2 * linhas # Quais nomes e datas eram None
+
+        armazem = ArmazemFuncionarios()
+        for departamento in infos["departamentos"]: # Os códigos das áreas continuam os mesmos
+            armazem.codigo_departamento(departamento)
+        armazem.origens = infos["origens"]
+        for coluna in [armazem.codigos_departamento, armazem.salarios, armazem.experiencias, armazem.codigos_origem]: # Colunas saem direto dos bytes
+            tamanho = linhas * coluna.itemsize
+            coluna.frombytes(conteudo[posicao:posicao + tamanho])
+            posicao += tamanho
+        armazem.nomes = [sys.intern(nome) for nome in nomes.split("\x00")] if linhas else []
+        armazem.datas_contratacao = [sys.intern(data) for data in datas.split("\x00")] if linhas else []
+        if 1 in faltando: # Alguém sem nome ou sem data: volta a ser None (com "" a chave do atualizar() não bateria)
+            armazem.nomes = [None if falta else nome for nome, falta in zip(armazem.nomes, faltando[:linhas])]
+            armazem.datas_contratacao = [None if falta else data for data, falta in zip(armazem.datas_contratacao, faltando[linhas:])]
+        armazem.posicoes_planilha = array('q', range(linhas)) # A cópia foi escrita na ordem da planilha
+        armazem.vivos = bytearray(b"\x01") * linhas
+        armazem.versao = linhas
+
+        conferida_em = os.path.getmtime(caminho) # Quando a cópia foi escrita ou conferida com a planilha pela última vez
+        idade = time.time() - conferida_em
+        os.utime(caminho, (time.time(), conferida_em)) # Marca só que ela foi usada agora (para não ser apagada primeiro)
+        return armazem, {"etag": infos["etag"], "last_modified": infos["last_modified"], "fresca": idade <= self.validade_segundos}
+
+    def tocar(self, chave):
+        """Marca a cópia como conferida agora (a planilha não mudou)."""
+        try:
+            os.utime(self._caminho(chave))
+        except OSError:
+            pass
+
+    def _despejar(self):
+        """Apaga cópias sem uso há muito tempo e, se a pasta passar do tamanho máximo, as menos usadas."""
+        agora = time.time()
+        arquivos = [] # (última vez usada, tamanho, caminho)
+        for nome in os.listdir(self.pasta):
+            if not nome.endswith(".snap"):
+                continue
+            caminho = os.path.join(self.pasta, nome)
+            info = os.stat(caminho)
+            if agora - info.st_atime > self.tempo_maximo_segundos: # Sem uso há tempo demais
+                os.remove(caminho)
+            else:
+                arquivos.append((info.st_atime, info.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos): # Das menos usadas para as mais usadas
+            if total <= self.tamanho_maximo_bytes:
+                break
+            os.remove(caminho)
+            total -= tamanho
@@ -0,0 +1,313 @@
+import argparse # Para ler as opções da linha de comando
+import contextlib # Para mandar as mensagens de carga para a saída de erro
+import csv # Para escrever a tabela de resultados em CSV
+import json # Para escrever a tabela de resultados em JSON Lines
+import sys # Para escrever na saída padrão
+from array import array # Para guardar as somas acumuladas de forma compacta
+from bisect import bisect_left # Para achar em O(log n) quantos passam do alvo
+from concurrent.futures import ProcessPoolExecutor # Para espalhar grades enormes em vários processos
+from fractions import Fraction # Para as contas dos cenários saírem exatas
+from itertools import accumulate, product, repeat # Somas acumuladas e todas as combinações da grade
+from operator import truediv # A divisão como função, para usar no map
+import dinheiro # O dinheiro fica em centavos inteiros, com arredondamento certinho
+
+TAMANHO_DO_LOTE = 10_000 # Quantos cenários cada processo avalia de uma vez
+MINIMO_PARA_PROCESSOS = 50_000 # Grades menores que isso são avaliadas aqui mesmo (abrir processos custaria mais)
+
+# Cada cenário muda o fator de encargos, um aumento (ou corte) igual para todos os salários,
+# quantos dos menos eficientes melhoram e até onde eles melhoram (o alvo de custo por ano).
+# Multiplicar todos os salários pelo mesmo número não muda quem é mais ou menos eficiente,
+# então a ordem é feita uma vez só, sobre o salário puro, e cada cenário vira poucas contas
+# com somas acumuladas: economia = fator * (1 + ajuste) * S[q] - alvo * X[q], onde S e X são
+# as somas dos salários e das experiências dos q primeiros, e q = mín(quantos otimizar,
+# quantos estão acima do alvo).
+
+def _exato(valor):
+    """Transforma o valor numa fração exata (um float vira o número que ele escreve: 1.8 -> 9/5)."""
+    return Fraction(str(valor)) if isinstance(valor, float) else Fraction(valor)
+
+class _Fila:
+    """
+    Um grupo (a empresa toda ou uma área), do menos para o mais eficiente, com as somas
+    acumuladas dos salários e das experiências. Tudo sobre o salário puro, sem encargos.
+    """
+    __slots__ = ("somas_salario", "somas_experiencia", "razoes", "media", "_acima_da_media")
+
+    def __init__(self, salarios, experiencias):
+        self.somas_salario = array('q', accumulate(salarios, initial=0)) # S[q]: soma dos salários dos q primeiros
+        self.somas_experiencia = array('q', accumulate(experiencias, initial=0)) # X[q]: soma das experiências dos q primeiros
+        anos = list(map(max, experiencias, repeat(1))) # No mínimo 1 ano para não dividir por zero
+        self.razoes = array('d', [-salario / ano for salario, ano in zip(salarios, anos)]) # Salário por ano, com o sinal trocado para ficar em ordem crescente
+        por_anos = {} # Anos de experiência -> soma dos salários (para a média exata sem uma fração por pessoa)
+        for salario, ano in zip(salarios, anos):
+            por_anos[ano] = por_anos.get(ano, 0) + salario
+        self.media = sum(Fraction(soma, ano) for ano, soma in por_anos.items()) / len(anos) if anos else Fraction(0) # Salário por ano médio (exato)
+        self._acima_da_media = None # Quantos estão acima da média (contado na primeira vez)
+
+    def __len__(self):
+        return len(self.razoes)
+
+    def _acima(self, j, numerador, denominador):
+        """Se o salário por ano do j-ésimo da fila passa de numerador/denominador (conta exata, só com inteiros)."""
+        salario = self.somas_salario[j + 1] - self.somas_salario[j]
+        experiencia = self.somas_experiencia[j + 1] - self.somas_experiencia[j]
+        return salario * denominador > numerador * max(experiencia, 1)
+
+    def quantos_acima(self, numerador, denominador):
+        """Quantos têm salário por ano acima de numerador/denominador (busca binária pelo float, conferida na beirada)."""
+        quantos = bisect_left(self.razoes, -numerador / denominador) # Conta aproximada, pelo float
+        while quantos > 0 and not self._acima(quantos - 1, numerador, denominador): # O float pode errar por um na beirada
+            quantos -= 1
+        while quantos < len(self) and self._acima(quantos, numerador, denominador):
+            quantos += 1
+        return quantos
+
+    def base_na_media(self, quantidade):
+        """
+        Pessoas e economia (exata, sem o fator nem o ajuste) de levar os 'quantidade' menos eficientes até a média do grupo.
+        A média também é multiplicada pelo fator e pelo ajuste, então quem passa dela é sempre o mesmo.
+        """
+        if self._acima_da_media is None: # Conta uma vez só
+            self._acima_da_media = self.quantos_acima(self.media.numerator, self.media.denominator)
+        q = min(quantidade, self._acima_da_media)
+        return q, self.somas_salario[q] - self.media * self.somas_experiencia[q]
+
+    def somas_acima(self, quantidade, numerador, denominador):
+        """Pessoas e somas de salário e de experiência dos 'quantidade' menos eficientes que passam do limite."""
+        q = min(quantidade, self.quantos_acima(numerador, denominador))
+        return q, self.somas_salario[q], self.somas_experiencia[q]
+
+class SimuladorCenarios:
+    """
+    Avalia milhares de cenários de economia de uma vez, no estilo da projeção de economia (opção 6).
+    A ordem de eficiência e as somas acumuladas são feitas uma vez só (da empresa e de cada área);
+    depois cada cenário custa uma busca binária e poucas contas exatas, arredondadas uma vez só no fim.
+    Por isso a economia pode diferir da opção 6, que arredonda o custo de cada pessoa, em menos de
+    um centavo por pessoa (e empates por um triz podem trocar quem entra por último).
+    """
+    def __init__(self, armazem):
+        self.armazem = armazem # De onde vieram os dados
+        self.versao = armazem.versao # Qual versão dos dados foi usada (se mudar, as contas ficam velhas)
+
+        salarios, experiencias, codigos = armazem.salarios, armazem.experiencias, armazem.codigos_departamento
+        validos = [i for i in armazem.posicoes_em_ordem() if salarios[i] or experiencias[i]] # Os mesmos que entram nas contas de eficiência, na ordem da planilha
+        razoes = array('d', map(truediv, salarios, map(max, experiencias, repeat(1)))) # Salário por ano (o float de uma divisão de inteiros não troca a ordem)
+        ordem = sorted(validos, key=razoes.__getitem__, reverse=True) # Do menos para o mais eficiente (empates na ordem da planilha)
+        self.empresa = _Fila([salarios[i] for i in ordem], [experiencias[i] for i in ordem])
+
+        por_departamento = [[] for _ in armazem.departamentos] # Reparte a ordem da empresa (cada área já sai em ordem)
+        for i in ordem:
+            por_departamento[codigos[i]].append(i)
+        self.departamentos = {armazem.departamentos[codigo]: _Fila([salarios[i] for i in posicoes], [experiencias[i] for i in posicoes])
+                              for codigo, posicoes in enumerate(por_departamento) if posicoes}
+        self._bases = {} # (quantidade, por área) -> economia sem o multiplicador, para os alvos na média
+        self._multiplicadores = {} # (fator, ajuste) -> multiplicador como (numerador, denominador)
+
+    def atualizado(self, armazem):
+        """Diz se estas contas ainda valem para esses dados."""
+        return armazem is self.armazem and armazem.versao == self.versao
+
+    def __getstate__(self):
+        """Para outro processo vai só o que as contas usam, sem o armazém inteiro."""
+        return {**self.__dict__, "armazem": None}
+
+    def _base_na_media(self, quantidade, por_departamento):
+        """Pessoas e economia com alvo na média e sem o fator nem o ajuste: a mesma para todos os fatores e ajustes."""
+        chave = (quantidade, por_departamento)
+        if chave not in self._bases:
+            filas = self.departamentos.values() if por_departamento else [self.empresa]
+            resultados = [fila.base_na_media(quantidade) for fila in filas]
+            self._bases[chave] = (sum(q for q, _ in resultados), sum(economia for _, economia in resultados))
+        return self._bases[chave]
+
+    def _multiplicador(self, fator, ajuste):
+        """fator * (1 + ajuste) como (numerador, denominador), calculado uma vez para cada par da grade."""
+        chave = (fator, ajuste)
+        if chave not in self._multiplicadores:
+            multiplicador = _exato(fator) * (1 + _exato(ajuste))
+            if multiplicador <= 0:
+                raise ValueError(f"Fator {fator} com ajuste {ajuste} deixa os custos zerados ou negativos.")
+            self._multiplicadores[chave] = (multiplicador.numerator, multiplicador.denominator)
+        return self._multiplicadores[chave]
+
+    def avaliar_cenario(self, cenario):
+        """
+        Avalia um cenário (um dicionário como os de grade()) e devolve o mesmo dicionário com
+        'pessoas' (quantas melhoram) e 'economia' (em centavos, arredondada uma vez só).
+        """
+        mn, md = self._multiplicador(cenario.get("fator_encargos", dinheiro.FATOR_ENCARGOS), cenario.get("ajuste_salarial", 0)) # Multiplicador = mn / md
+        quantidade = cenario.get("num_otimizar", 3)
+        alvo = cenario.get("alvo")
+        por_departamento = cenario.get("por_departamento", False)
+        if quantidade < 0:
+            raise ValueError(f"Quantidade de funcionários para otimizar negativa: {quantidade}")
+
+        if alvo is None: # Alvo na média: a parte pesada já está pronta para esta quantidade
+            pessoas, base = self._base_na_media(quantidade, por_departamento)
+            base = Fraction(base)
+            economia = dinheiro.dividir_arredondando(mn * base.numerator, md * base.denominator)
+        elif isinstance(alvo, dict): # Um alvo para cada área (as que faltarem ficam na média da área)
+            if not por_departamento:
+                raise ValueError("Alvos por área só valem em cenários por departamento.")
+            multiplicador = Fraction(mn, md)
+            pessoas, economia = 0, Fraction(0)
+            for nome, fila in self.departamentos.items():
+                if alvo.get(nome) is None:
+                    q, base = fila.base_na_media(quantidade)
+                    economia += multiplicador * base
+                else:
+                    alvo_area = _exato(alvo[nome])
+                    q, soma_salarios, soma_experiencias = fila.somas_acima(quantidade, alvo_area.numerator * md, alvo_area.denominator * mn)
+                    economia += multiplicador * soma_salarios - alvo_area * soma_experiencias
+                pessoas += q
+            economia = dinheiro.arredondar(economia)
+        else: # Um alvo só, em centavos por ano: só somas de inteiros e uma divisão no fim
+            alvo = _exato(alvo)
+            tn, td = alvo.numerator, alvo.denominator
+            filas = self.departamentos.values() if por_departamento else [self.empresa]
+            pessoas = soma_salarios = soma_experiencias = 0
+            for fila in filas: # Quem passa do alvo / multiplicador, no salário puro
+                q, salarios, experiencias = fila.somas_acima(quantidade, tn * md, td * mn)
+                pessoas, soma_salarios, soma_experiencias = pessoas + q, soma_salarios + salarios, soma_experiencias + experiencias
+            economia = dinheiro.dividir_arredondando(mn * td * soma_salarios - tn * md * soma_experiencias, md * td) # mn/md * S - tn/td * X
+        return {**cenario, "pessoas": pessoas, "economia": economia}
+
+    def avaliar(self, cenarios, max_processos=None):
+        """
+        Avalia uma lista de cenários e devolve a tabela de resultados, na mesma ordem.
+        Grades grandes (a partir de MINIMO_PARA_PROCESSOS) são espalhadas em processos;
+        com max_processos=0, tudo roda aqui mesmo.
+        """
+        cenarios = list(cenarios)
+        if max_processos == 0 or len(cenarios) < MINIMO_PARA_PROCESSOS:
+            return [self.avaliar_cenario(cenario) for cenario in cenarios]
+        lotes = [cenarios[inicio:inicio + TAMANHO_DO_LOTE] for inicio in range(0, len(cenarios), TAMANHO_DO_LOTE)]
+        with ProcessPoolExecutor(max_workers=max_processos, initializer=_preparar_processo, initargs=(self,)) as processos: # O simulador vai uma vez para cada processo
+            return [linha for resultado in processos.map(_avaliar_no_processo, lotes) for linha in resultado]
+
+def grade(fatores=(dinheiro.FATOR_ENCARGOS,), ajustes=(0,), quantidades=(3,), alvos=(None,), por_departamento=(False,)):
+    """
+    Todas as combinações dos parâmetros, como uma lista de cenários.
+    - fatores: quanto o salário custa com os encargos (1.8 = 80% a mais);
+    - ajustes: aumento ou corte igual para todos os salários (0.05 = 5% a mais);
+    - quantidades: quantos dos menos eficientes melhoram (em cada área, nos cenários por departamento);
+    - alvos: custo por ano a alcançar, em centavos, None para a média, ou um dicionário área -> alvo;
+    - por_departamento: False compara com a empresa toda, True compara cada área com ela mesma.
+    Alvos por área só entram nas combinações por departamento.
+    """
+    return [{"fator_encargos": fator, "ajuste_salarial": ajuste, "num_otimizar": quantidade, "alvo": alvo, "por_departamento": area}
+            for fator, ajuste, quantidade, alvo, area in product(fatores, ajustes, quantidades, alvos, por_departamento)
+            if area or not isinstance(alvo, dict)]
+
+_simulador_do_processo = None # O simulador que cada processo recebeu ao começar
+
+def _preparar_processo(simulador):
+    global _simulador_do_processo
+    _simulador_do_processo = simulador
+
+def _avaliar_no_processo(cenarios):
+    """Avalia um lote de cenários em outro processo."""
+    return [_simulador_do_processo.avaliar_cenario(cenario) for cenario in cenarios]
+
+def registro(linha):
+    """Uma linha da tabela de resultados com os números crus, em reais (para JSON Lines ou CSV)."""
+    alvo = linha["alvo"]
+    if alvo is None:
+        alvo = "media"
+    elif isinstance(alvo, dict):
+        alvo = ";".join(f"{nome}={dinheiro.em_reais(dinheiro.arredondar(_exato(valor)))}" for nome, valor in alvo.items())
+    else:
+        alvo = dinheiro.em_reais(dinheiro.arredondar(_exato(alvo)))
+    return {
+        "fator_encargos": float(_exato(linha["fator_encargos"])),
+        "ajuste_salarial": float(_exato(linha["ajuste_salarial"])),
+        "num_otimizar": linha["num_otimizar"],
+        "escopo": "departamento" if linha["por_departamento"] else "empresa",
+        "alvo": alvo,
+        "pessoas": linha["pessoas"],
+        "economia": dinheiro.em_reais(linha["economia"]),
+    }
+
+def _ler_alvo(texto):
+    """'media' vira None; um valor em reais vira centavos."""
+    return None if texto.lower() in ("media", "média") else dinheiro.para_centavos(texto)
+
+def _ler_alvo_departamento(texto):
+    """'TI=1500,00' vira ('TI', 150000)."""
+    nome, separador, valor = texto.rpartition("=")
+    if not separador or not nome:
+        raise argparse.ArgumentTypeError(f"Use ÁREA=VALOR, não {texto!r}")
+    return nome, _ler_alvo(valor)
+
+def _fator(texto):
+    """Um fator de encargos: maior que zero (0 ou menos zeraria os custos)."""
+    fator = Fraction(texto)
+    if fator <= 0:
+        raise argparse.ArgumentTypeError(f"o fator precisa ser maior que zero, não {texto}")
+    return fator
+
+def _ajuste(texto):
+    """Um ajuste de salários: maior que -1 (um corte de 100% ou mais zeraria os salários)."""
+    ajuste = Fraction(texto)
+    if ajuste <= -1:
+        raise argparse.ArgumentTypeError(f"o ajuste precisa ser maior que -1 (um corte menor que 100%), não {texto}")
+    return ajuste
+
+def _nao_negativo(texto):
+    """Um número inteiro que não pode ser negativo (quantos otimizar, quantos processos)."""
+    numero = int(texto)
+    if numero < 0:
+        raise argparse.ArgumentTypeError(f"use um número a partir de 0, não {texto}")
+    return numero
+
+def main(argv=None):
+    """Carrega a planilha uma vez e avalia uma grade de cenários de economia, escrevendo uma linha por cenário."""
+    import instrumentacao # Medições opcionais de cada etapa
+    import modo_lote # Carrega a planilha com as mesmas opções do modo lote (só aqui, para os processos não precisarem do analisador)
+
+    parser = argparse.ArgumentParser(description="Simula muitos cenários de economia de uma vez (fator de encargos, ajuste de salários, quantos otimizar e alvos).")
+    parser.add_argument("--fatores", nargs="+", type=_fator, default=[dinheiro.FATOR_ENCARGOS], help="Fatores de encargos, maiores que zero (padrão: 1.8)")
+    parser.add_argument("--ajustes", nargs="+", type=_ajuste, default=[Fraction(0)], help="Ajustes iguais para todos os salários, maiores que -1, ex: -0.05 0 0.1 (padrão: 0)")
+    parser.add_argument("--quantidades", nargs="+", type=_nao_negativo, default=[3], help="Quantos dos menos eficientes otimizar (padrão: 3)")
+    parser.add_argument("--alvos", nargs="+", type=_ler_alvo, default=[None], help="Custo por ano a alcançar, em reais, ou 'media' (padrão: media)")
+    parser.add_argument("--alvo-departamento", action="append", type=_ler_alvo_departamento, metavar="ÁREA=VALOR", help="Alvo de uma área nos cenários por departamento (pode repetir)")
+    parser.add_argument("--escopos", nargs="+", choices=["empresa", "departamento"], default=["empresa"], help="Comparar com a empresa toda ou cada área com ela mesma (padrão: empresa)")
+    parser.add_argument("--processos", type=_nao_negativo, help="Quantos processos usar em grades grandes (0 = nenhum)")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], default="csv", help="Como escrever a tabela (padrão: csv)")
+    modo_lote.adicionar_opcoes_de_carga(parser)
+    args = parser.parse_args(argv)
+
+    medicoes = instrumentacao.da_linha_de_comando(args) # None: vale o que as variáveis de ambiente pedirem
+    try:
+        return _simular(args, medicoes)
+    finally:
+        if medicoes is not None: # O resumo vai para a saída de erro, mesmo se algo deu errado no meio
+            medicoes.encerrar(sys.stderr)
+
+def _simular(args, medicoes):
+    """Carrega a planilha e escreve a tabela com todos os cenários da linha de comando."""
+    import modo_lote # Carrega a planilha com as mesmas opções do modo lote
+    with contextlib.redirect_stdout(sys.stderr): # As mensagens da carga não se misturam com a tabela
+        analyzer = modo_lote.carregar(args, medicoes)
+    if not analyzer.data: # Se não conseguiu arrumar os dados
+        print("Não foi possível simular os cenários porque os dados não estão prontos.", file=sys.stderr)
+        return 1
+
+    alvos = list(args.alvos) + ([dict(args.alvo_departamento)] if args.alvo_departamento else [])
+    cenarios = grade(args.fatores, args.ajustes, args.quantidades, alvos, [escopo == "departamento" for escopo in args.escopos])
+    tabela = analyzer.simular_cenarios(cenarios, args.processos)
+    if args.formato == "jsonl":
+        for linha in tabela:
+            sys.stdout.write(json.dumps(registro(linha), ensure_ascii=False) + "\n")
+    else:
+        escritor = None
+        for linha in tabela:
+            linha = registro(linha)
+            if escritor is None: # Primeira linha: escreve o cabeçalho
+                escritor = csv.DictWriter(sys.stdout, fieldnames=list(linha))
+                escritor.writeheader()
+            escritor.writerow(linha)
+    return 0
+
+if __name__ == "__main__": # Ex: python cenarios.py --fatores 1.6 1.8 2.0 --ajustes 0 0.05 --quantidades 3 10 100 --escopos empresa departamento
+    sys.exit(main())
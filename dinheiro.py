@@ -0,0 +1,92 @@
+from fractions import Fraction # Para médias exatas, sem o erro de arredondamento dos números com vírgula do computador
+from itertools import repeat # Para as contas de uma coluna inteira rodarem dentro do map, sem um laço Python
+from operator import add, floordiv, mul # As contas como funções, para usar no map
+
+# O dinheiro é guardado em centavos (números inteiros), então somas de milhões de salários
+# não perdem nenhum centavo no caminho. Só arredondamos quando uma conta divide ou multiplica
+# por algo que não é inteiro, e sempre do mesmo jeito: meio centavo ou mais sobe (longe do zero).
+
+SEPARADORES = (",", ".") # Separadores de centavos e de milhar aceitos
+FATOR_ENCARGOS = Fraction(18, 10) # Quanto um salário custa para a empresa: 80% a mais de encargos (o mesmo de custo_total)
+
+def para_centavos(texto):
+    """
+    Lê um valor em reais escrito do jeito brasileiro ou do jeito americano e devolve em centavos.
+    O último separador (',' ou '.') é o dos centavos; os outros são de milhar. Um separador que se
+    repete ('1.234.567') ou que aparece sozinho com três dígitos depois ('6.000', '10,000') é de milhar,
+    a não ser que venha depois de um zero só ('0.500' são 50 centavos). Milhar começando com zero
+    ('00.000', '01.234') não vale.
+    Ex: '5.500,00', '5500,5', '5500.00', '6.000' e '5500'. Mais de duas casas depois do separador
+    são arredondadas para o centavo mais próximo. Se estiver bagunçado (ex: '1.2.34'), dá ValueError.
+    """
+    digitos = texto.replace(",", "", 1) # Caminho rápido: '5500,00', o jeito da planilha (o arrumar_linha lê todo salário por aqui)
+    if digitos.isdigit() and texto[-3:-2] == ",":
+        return int(digitos)
+    if texto.isdigit(): # Caminho rápido: reais sem centavos
+        return int(texto) * 100
+
+    original = texto
+    texto = texto.strip()
+    negativo = texto.startswith("-") # Guarda o sinal e trabalha só com os números
+    if negativo or texto.startswith("+"):
+        texto = texto[1:]
+    ultimo = max(texto.rfind(","), texto.rfind(".")) # Onde fica o último separador
+    if ultimo < 0: # Sem separador nenhum
+        inteiro, fracao, milhar = texto, "", None
+    else:
+        separador = texto[ultimo]
+        outro = "," if separador == "." else "."
+        if texto.count(separador) > 1 or (len(texto) - ultimo - 1 == 3 and outro not in texto and texto[:ultimo] != "0"): # Só separadores de milhar: '1.234.567', '6.000' (mas '0.500' é meio real)
+            inteiro, fracao, milhar = texto, "", separador
+        else: # O último é o dos centavos e o outro (se tiver) é o de milhar
+            inteiro, fracao, milhar = texto[:ultimo], texto[ultimo + 1:], outro
+    if milhar is not None and milhar in inteiro: # Confere os grupos de milhar: '1.234.567' sim, '1.2.34' e '00.000' não
+        grupos = inteiro.split(milhar)
+        if not 1 <= len(grupos[0]) <= 3 or grupos[0].startswith("0") or any(len(grupo) != 3 for grupo in grupos[1:]):
+            raise ValueError(f"Valor em reais inválido: {original!r}")
+        inteiro = "".join(grupos)
+    if not (inteiro or fracao) or inteiro and not inteiro.isdigit() or fracao and not fracao.isdigit(): # Vazio ou com algo que não é número
+        raise ValueError(f"Valor em reais inválido: {original!r}")
+    centavos = int(inteiro or "0") * 100 + int(fracao[:2].ljust(2, "0")) # Reais e centavos
+    if len(fracao) > 2 and fracao[2] >= "5": # Sobrou meio centavo ou mais: arredonda para cima
+        centavos += 1
+    return -centavos if negativo else centavos
+
+def dividir_arredondando(numerador, denominador):
+    """Divide dois inteiros e arredonda para o inteiro mais próximo (meio sobe, longe do zero)."""
+    if numerador >= 0 and denominador > 0: # O caso de sempre (salários positivos): uma conta só
+        return (2 * numerador + denominador) // (2 * denominador)
+    quociente, resto = divmod(abs(numerador), abs(denominador))
+    if resto * 2 >= abs(denominador): # Sobrou meio ou mais
+        quociente += 1
+    return quociente if (numerador < 0) == (denominador < 0) else -quociente
+
+def arredondar(valor):
+    """Arredonda um valor exato (Fraction ou inteiro), em centavos, para centavos inteiros."""
+    valor = Fraction(valor)
+    return dividir_arredondando(valor.numerator, valor.denominator)
+
+def custo_total(centavos):
+    """O custo de um salário para a empresa (x1,8, ou seja, 80% de encargos), em centavos, arredondado uma vez só."""
+    if centavos >= 0: # O caso de sempre: x18 é exato em décimos de centavo, +5 arredonda o meio para cima
+        return (centavos * 18 + 5) // 10
+    return -custo_total(-centavos)
+
+def custos_totais(salarios):
+    """
+    O custo_total de uma coluna inteira de salários (em centavos), como um iterador. Sem salários
+    negativos, a conta roda toda dentro do map, sem chamar uma função Python para cada salário.
+    """
+    if salarios and min(salarios) < 0: # Algum negativo: arredonda um por um, longe do zero
+        return map(custo_total, salarios)
+    return map(floordiv, map(add, map(mul, salarios, repeat(18)), repeat(5)), repeat(10))
+
+def formatar(centavos):
+    """Escreve centavos como reais com duas casas (ex: 550000 -> '5500.00'), sem passar por float."""
+    if centavos >= 0:
+        return f"{centavos // 100}.{centavos % 100:02d}"
+    return "-" + formatar(-centavos)
+
+def em_reais(centavos):
+    """Centavos como um número em reais para quem lê JSON/CSV (o float mais próximo, que se escreve com as mesmas casas)."""
+    return centavos / 100
@@ -0,0 +1,113 @@
+import argparse # Para ler as opções da linha de comando
+import csv # Para escrever a planilha inventada em CSV
+import io # Para montar o CSV na memória quando ninguém quer um arquivo
+import random # Para inventar os funcionários
+import sys # Para escrever na saída padrão
+from datetime import date, timedelta # Para inventar datas de contratação
+from itertools import accumulate # Para sortear as áreas com pesos sem refazer as contas a cada linha
+
+COLUNAS = ["nome", "idade", "cidade", "profissao", "salario", "experiencia_anos", "nivel_educacao", "status_emprego", "data_contratacao", "departamento"] # As mesmas colunas da planilha do desafio
+CIDADES = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Porto Alegre", "Fortaleza", "Recife", "Salvador", "Curitiba"]
+PROFISSOES = ["Desenvolvedor", "Designer", "Gerente", "Analista", "Vendedor", "Contador", "Advogado", "Suporte"]
+NIVEIS_EDUCACAO = ["Médio", "Técnico", "Superior", "Pós-graduação", "Mestrado"]
+DEPARTAMENTOS_BASE = ["TI", "Marketing", "Vendas", "Financeiro", "RH", "Jurídico", "Operações", "Produto"] # Nomes das primeiras áreas; as próximas viram "Área 9", "Área 10"...
+DATA_MAIS_ANTIGA = date(2000, 1, 1) # Contratações inventadas ficam entre essa data e DIAS_DE_CONTRATACAO dias depois
+DIAS_DE_CONTRATACAO = 9000
+TAMANHO_DO_LOTE = 10_000 # Quantas linhas sortear de uma vez (sorteios em lote são bem mais rápidos)
+
+def nomes_dos_departamentos(quantidade):
+    """Os nomes das áreas inventadas: os de sempre primeiro e depois 'Área N'."""
+    return [DEPARTAMENTOS_BASE[i] if i < len(DEPARTAMENTOS_BASE) else f"Área {i + 1}" for i in range(quantidade)]
+
+def _estragar_linha(linha, aleatorio):
+    """Estraga uma linha do jeito que as planilhas de verdade costumam vir estragadas."""
+    estrago = aleatorio.randrange(4)
+    if estrago == 0: # Salário escrito por extenso
+        linha[4] = "cinco mil"
+    elif estrago == 1: # Salário em branco
+        linha[4] = ""
+    elif estrago == 2: # Experiência que não é número
+        linha[5] = "três"
+    else: # Experiência com vírgula
+        linha[5] = f"{aleatorio.randint(0, 35)},5"
+    linha[7] = "Ativo" # Só linha de funcionário ativo é conferida, então a estragada precisa estar ativa
+    return linha
+
+def gerar_linhas(quantidade, departamentos=8, assimetria=0.0, proporcao_inativos=0.1, proporcao_baguncadas=0.0, semente=42):
+    """
+    Inventa 'quantidade' linhas da planilha (listas de textos, na ordem de COLUNAS), uma de cada vez.
+    - departamentos: quantas áreas diferentes existem;
+    - assimetria: 0 deixa as áreas do mesmo tamanho; quanto maior, mais gente fica nas primeiras (como uma lei de Zipf);
+    - proporcao_inativos: parte das linhas com status 'Inativo';
+    - proporcao_baguncadas: parte das linhas com salário ou experiência estragados.
+    Com a mesma semente sai sempre a mesma planilha.
+    """
+    aleatorio = random.Random(semente) # Sempre a mesma sorte, para os resultados serem comparáveis
+    nomes_areas = nomes_dos_departamentos(departamentos)
+    datas = [(DATA_MAIS_ANTIGA + timedelta(days=dia)).isoformat() for dia in range(DIAS_DE_CONTRATACAO)] # Todas as datas possíveis, escritas uma vez só
+    pesos_acumulados = list(accumulate(1 / (posicao + 1) ** assimetria for posicao in range(departamentos))) # Peso de cada área
+    for inicio in range(0, quantidade, TAMANHO_DO_LOTE): # Sorteia em lotes
+        tamanho = min(TAMANHO_DO_LOTE, quantidade - inicio)
+        areas = aleatorio.choices(nomes_areas, cum_weights=pesos_acumulados, k=tamanho)
+        for deslocamento, area in enumerate(areas):
+            i = inicio + deslocamento
+            experiencia = aleatorio.randint(0, 35)
+            salario = aleatorio.randint(150_000, 2_500_000) # Em centavos
+            linha = [
+                f"Funcionário {i}",
+                str(aleatorio.randint(18 + experiencia, 70)),
+                aleatorio.choice(CIDADES),
+                aleatorio.choice(PROFISSOES),
+                f"{salario // 100},{salario % 100:02d}", # Do jeito que a planilha escreve: 5500,00
+                str(experiencia),
+                aleatorio.choice(NIVEIS_EDUCACAO),
+                "Inativo" if aleatorio.random() < proporcao_inativos else "Ativo",
+                aleatorio.choice(datas),
+                area,
+            ]
+            if proporcao_baguncadas and aleatorio.random() < proporcao_baguncadas:
+                linha = _estragar_linha(linha, aleatorio)
+            yield linha
+
+def escrever_csv(saida, quantidade, **opcoes):
+    """Escreve a planilha inventada (com cabeçalho) em qualquer arquivo de texto aberto."""
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(COLUNAS)
+    escritor.writerows(gerar_linhas(quantidade, **opcoes))
+
+def gerar_csv(quantidade, **opcoes):
+    """A planilha inventada inteira como bytes (para servir ou guardar)."""
+    saida = io.StringIO()
+    escrever_csv(saida, quantidade, **opcoes)
+    return saida.getvalue().encode("utf-8")
+
+def adicionar_opcoes(parser):
+    """Coloca num parser de linha de comando as opções do gerador (usadas aqui e no benchmark)."""
+    parser.add_argument("--departamentos", type=int, default=8, help="Quantas áreas diferentes (padrão: 8)")
+    parser.add_argument("--assimetria", type=float, default=0.0, help="0 = áreas do mesmo tamanho; maior = mais gente nas primeiras (padrão: 0)")
+    parser.add_argument("--inativos", type=float, default=0.1, help="Parte das linhas com status 'Inativo' (padrão: 0.1)")
+    parser.add_argument("--baguncadas", type=float, default=0.0, help="Parte das linhas com salário ou experiência estragados (padrão: 0)")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do sorteio (padrão: 42)")
+
+def opcoes_do_gerador(args):
+    """As opções do gerador que vieram da linha de comando, prontas para gerar_linhas()."""
+    return {"departamentos": args.departamentos, "assimetria": args.assimetria, "proporcao_inativos": args.inativos,
+            "proporcao_baguncadas": args.baguncadas, "semente": args.semente}
+
+def main(argv=None):
+    """Escreve uma planilha de mentira com o mesmo formato da planilha do desafio."""
+    parser = argparse.ArgumentParser(description="Inventa uma planilha de funcionários no formato da planilha do desafio.")
+    parser.add_argument("linhas", type=int, help="Quantos funcionários inventar")
+    parser.add_argument("-o", "--saida", help="Arquivo para escrever (padrão: saída padrão)")
+    adicionar_opcoes(parser)
+    args = parser.parse_args(argv)
+
+    if args.saida is None:
+        escrever_csv(sys.stdout, args.linhas, **opcoes_do_gerador(args))
+    else:
+        with open(args.saida, "w", encoding="utf-8", newline="") as saida:
+            escrever_csv(saida, args.linhas, **opcoes_do_gerador(args))
+    return 0
+
+if __name__ == "__main__": # Ex: python gerador_dados.py 1000000 --departamentos 30 --assimetria 1.2 --baguncadas 0.01 -o planilha.csv
+    sys.exit(main())
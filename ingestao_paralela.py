@@ -0,0 +1,157 @@
+import csv # Para ler as tabelas (CSV)
+import http.client # Para conversar com o servidor reaproveitando a mesma conexão
+import io # Para trabalhar com textos como se fossem arquivos
+import threading # Para cada trabalhador ter as suas próprias conexões
+import urllib.parse # Para separar o link em servidor, porta e caminho
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed # Para fazer várias coisas ao mesmo tempo
+from analisador_csv import COLUNAS_OBRIGATORIAS, arrumar_linha, montar_url_csv # O mesmo jeito de montar o link e arrumar as linhas da carga normal
+from armazem_funcionarios import ArmazemFuncionarios # Onde os funcionários ficam guardados em colunas
+
+MAX_REDIRECIONAMENTOS = 5 # O Google manda o download para outro endereço; a gente segue até esse tanto de vezes
+
+class BaixadorComConexoes:
+    """
+    Baixa vários links ao mesmo tempo com um número limitado de trabalhadores.
+    Cada trabalhador guarda uma conexão aberta por servidor (keep-alive) e reaproveita
+    ela nos próximos downloads, em vez de abrir uma conexão nova a cada link.
+    """
+    def __init__(self, max_conexoes=8, tempo_limite=60):
+        self.max_conexoes = max_conexoes # Quantos downloads ao mesmo tempo, no máximo
+        self.tempo_limite = tempo_limite # Quantos segundos esperar o servidor antes de desistir
+        self._local = threading.local() # Conexões de cada trabalhador
+        self._abertas = [] # Todas as conexões abertas, de todos os trabalhadores (para fechar no fim)
+        self._trava = threading.Lock()
+
+    def _conexao(self, esquema, servidor):
+        """A conexão aberta deste trabalhador com esse servidor (abre uma se ainda não tem)."""
+        conexoes = self._local.__dict__.setdefault("conexoes", {})
+        conexao = conexoes.get((esquema, servidor))
+        if conexao is None:
+            classe = http.client.HTTPSConnection if esquema == "https" else http.client.HTTPConnection
+            conexao = classe(servidor, timeout=self.tempo_limite)
+            conexoes[(esquema, servidor)] = conexao
+            with self._trava:
+                self._abertas.append(conexao)
+        return conexao
+
+    def baixar(self, url):
+        """Baixa um link inteiro e devolve os bytes, seguindo redirecionamentos."""
+        for _ in range(MAX_REDIRECIONAMENTOS + 1):
+            partes = urllib.parse.urlsplit(url)
+            caminho = partes.path + (f"?{partes.query}" if partes.query else "")
+            conexao = self._conexao(partes.scheme, partes.netloc)
+            try:
+                conexao.request("GET", caminho or "/")
+                resposta = conexao.getresponse()
+                conteudo = resposta.read() # Lê tudo para a conexão ficar livre para o próximo pedido
+            except (http.client.HTTPException, OSError): # A conexão guardada caiu: tenta uma vez com uma nova
+                conexao.close()
+                conexao.request("GET", caminho or "/")
+                resposta = conexao.getresponse()
+                conteudo = resposta.read()
+            if resposta.status in (301, 302, 303, 307, 308): # Mandou a gente para outro endereço
+                url = urllib.parse.urljoin(url, resposta.getheader("Location"))
+                continue
+            if resposta.status != 200:
+                raise OSError(f"O servidor respondeu {resposta.status} {resposta.reason} para {url}")
+            return conteudo
+        raise OSError(f"Redirecionamentos demais para {url}")
+
+    def baixar_varios(self, urls):
+        """Baixa todos os links ao mesmo tempo. Entrega (url, bytes ou erro) conforme cada um termina."""
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_conexoes) as trabalhadores:
+                pedidos = {trabalhadores.submit(self.baixar, url): url for url in urls}
+                for pedido in as_completed(pedidos):
+                    try:
+                        yield pedidos[pedido], pedido.result()
+                    except Exception as e: # Um link que falhou não derruba os outros
+                        yield pedidos[pedido], e
+        finally: # Os trabalhadores acabaram: as conexões deles não servem mais para ninguém
+            self.fechar()
+
+    def fechar(self):
+        """Fecha todas as conexões que os trabalhadores abriram."""
+        with self._trava:
+            abertas, self._abertas = self._abertas, []
+        for conexao in abertas:
+            conexao.close()
+
+def arrumar_aba(conteudo):
+    """
+    Lê e arruma o CSV de uma aba inteira. Roda em outro processo, então recebe e devolve
+    só coisas que dá para mandar entre processos: os bytes e o armazém pronto (com quantas linhas foram puladas).
+    """
+    reader = csv.DictReader(io.StringIO(conteudo.decode("utf-8"))) # Lê a tabela
+    if not reader.fieldnames or not all(h in reader.fieldnames for h in COLUNAS_OBRIGATORIAS): # Vê se as colunas importantes estão lá
+        raise ValueError(f"Faltam colunas importantes. Precisa ter: {COLUNAS_OBRIGATORIAS}")
+    armazem = ArmazemFuncionarios()
+    linhas_ignoradas = 0
+    for linha in reader: # Uma linha de cada vez
+        try:
+            funcionario = arrumar_linha(linha)
+        except (ValueError, KeyError): # Linha bagunçada fica de fora
+            linhas_ignoradas += 1
+            continue
+        if funcionario is not None: # Só quem está ativo
+            armazem.adicionar(*funcionario)
+    return armazem, linhas_ignoradas
+
+def carregar_varias(urls, max_conexoes=8, max_processos=None):
+    """
+    Baixa várias planilhas/abas ao mesmo tempo e arruma cada uma num processo separado,
+    já começando a arrumar as que chegaram enquanto as outras ainda baixam.
+    Devolve o armazém com todo mundo junto (na ordem dos links) e uma lista de avisos.
+    Com max_processos=0, arruma no próprio processo (bom para abas pequenas).
+    Dois links da mesma aba (ex: com e sem '?usp=sharing') entram uma vez só, com a origem do primeiro e um aviso.
+    """
+    baixador = BaixadorComConexoes(max_conexoes)
+    resultados = {} # Link -> armazém arrumado
+    avisos = []
+    links_csv = {} # Link de download -> link que a pessoa passou
+    for url in urls:
+        csv_url = montar_url_csv(url)
+        if csv_url is None:
+            avisos.append(f"Aviso: {url} não parece ser uma URL de Planilha Google.")
+        elif csv_url in links_csv: # A mesma aba de um link anterior: baixar de novo repetiria todo mundo
+            avisos.append(f"Aviso: {url} é a mesma aba de {links_csv[csv_url]}; ela entra uma vez só.")
+        else:
+            links_csv[csv_url] = url
+    processos = ProcessPoolExecutor(max_workers=max_processos) if max_processos != 0 else None
+    try:
+        arrumando = {} # Tarefa de arrumar -> link
+        for csv_url, conteudo in baixador.baixar_varios(list(links_csv)): # Conforme cada download termina
+            url = links_csv[csv_url]
+            if isinstance(conteudo, Exception):
+                avisos.append(f"Aviso: Não consegui baixar {url}: {conteudo}")
+            elif processos is None:
+                arrumando[_arrumar_aqui(conteudo)] = url # Arruma aqui mesmo
+            else:
+                arrumando[processos.submit(arrumar_aba, conteudo)] = url # Manda arrumar em outro processo
+        for tarefa, url in arrumando.items():
+            try:
+                armazem, linhas_ignoradas = tarefa.result()
+            except Exception as e:
+                avisos.append(f"Aviso: Não consegui arrumar {url}: {e}")
+                continue
+            resultados[url] = armazem
+            if linhas_ignoradas:
+                avisos.append(f"Aviso: {linhas_ignoradas} linhas bagunçadas de {url} foram ignoradas.")
+    finally:
+        if processos is not None:
+            processos.shutdown()
+
+    juntos = ArmazemFuncionarios()
+    for url in dict.fromkeys(urls): # Junta na ordem em que os links foram pedidos (sem repetir), não na ordem em que chegaram
+        if url in resultados:
+            juntos.juntar(resultados[url], url)
+    return juntos, avisos
+
+def _arrumar_aqui(conteudo):
+    """Arruma a aba no próprio processo, devolvendo uma tarefa já terminada (igual à de um pool)."""
+    tarefa = Future()
+    try:
+        tarefa.set_result(arrumar_aba(conteudo))
+    except Exception as e:
+        tarefa.set_exception(e)
+    return tarefa
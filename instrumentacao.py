@@ -0,0 +1,248 @@
+import atexit # Para mostrar o resumo e gravar os arquivos quando o programa termina
+import contextlib # Para as etapas virarem blocos "with"
+import cProfile # Para o perfil completo das funções (opcional)
+import io # Para contar os bytes que passam pela leitura
+import os # Para ler as variáveis de ambiente
+import sys # Para escrever o resumo na saída de erro
+import threading # Para o servidor poder medir vários pedidos ao mesmo tempo
+import time # Para medir quanto cada etapa demora
+import tracemalloc # Para medir a memória que cada etapa aloca (opcional)
+
+VARIAVEL_LIGAR = "CALCULADORA_INSTRUMENTACAO" # Com qualquer valor (menos vazio ou 0), liga as medições
+VARIAVEL_PERFIL = "CALCULADORA_PERFIL" # Arquivo para gravar o perfil do cProfile (abre com pstats ou snakeviz)
+VARIAVEL_ALOCACOES = "CALCULADORA_ALOCACOES" # Arquivo para gravar onde a memória foi alocada (liga o tracemalloc)
+LINHAS_DE_ALOCACOES = 30 # Quantos lugares que mais alocaram vão para o arquivo de alocações
+
+class Etapa:
+    """O que foi medido numa etapa: tempo e, se quem mediu anotou, linhas, bytes, rejeitadas e memória."""
+    __slots__ = ("nome", "segundos", "linhas", "bytes", "rejeitadas", "memoria_alocada", "pico_memoria")
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.segundos = 0.0
+        self.linhas = None # Quantas linhas passaram pela etapa
+        self.bytes = None # Quantos bytes vieram da rede ou do disco
+        self.rejeitadas = None # Quantas linhas bagunçadas ficaram de fora
+        self.memoria_alocada = None # Quanto a memória cresceu do começo ao fim da etapa (só com tracemalloc)
+        self.pico_memoria = None # O máximo que a memória passou do começo da etapa (só com tracemalloc)
+
+class _EtapaDesligada:
+    """Aceita as anotações e joga tudo fora (usada quando as medições estão desligadas)."""
+    __slots__ = ()
+
+    def __setattr__(self, nome, valor):
+        pass
+
+ETAPA_DESLIGADA = _EtapaDesligada() # Para quem recebe uma etapa opcional: anotar nela não faz nada
+
+class _Desligada:
+    """
+    As medições desligadas: as etapas não medem nada e não guardam nada.
+    Cada etapa custa só duas chamadas vazias, e nenhuma medição acontece por linha.
+    """
+    ligada = False
+    _bloco = contextlib.nullcontext(ETAPA_DESLIGADA) # O mesmo bloco vazio serve para todas as etapas
+
+    def etapa(self, nome):
+        return self._bloco
+
+    def contar_bytes(self, arquivo, etapa):
+        return arquivo # Sem medições, a leitura vai direto
+
+    def medir_geracao(self, nome, itens):
+        return itens # Sem medições, o gerador vai direto
+
+    def resumo(self):
+        return []
+
+    def relatorio(self):
+        return "As medições estão desligadas."
+
+    def encerrar(self, saida=None):
+        pass
+
+DESLIGADA = _Desligada() # Uma só para o programa inteiro
+
+class Instrumentacao:
+    """
+    Mede o tempo de cada etapa da carga, da arrumação e dos relatórios, com linhas, bytes e
+    linhas rejeitadas. Opcionalmente mede a memória alocada por etapa (tracemalloc), grava
+    um perfil completo das funções (cProfile) e os lugares que mais alocaram memória.
+    As etapas são somadas pelo nome assim que terminam, então a memória das medições não
+    cresce com o número de pedidos (num servidor ligado por dias, por exemplo).
+    O tracemalloc mede o processo inteiro: a memória de uma etapa só é anotada se nenhuma
+    outra thread estava medindo quando ela começou e nenhuma outra etapa começou enquanto
+    ela rodava. Numa etapa dentro de outra, vale a de dentro; a de fora fica sem memória.
+    """
+    ligada = True
+
+    def __init__(self, alocacoes=False, arquivo_perfil=None, arquivo_alocacoes=None):
+        self._somas = {} # Nome da etapa -> o que foi medido nela, somado (na ordem em que apareceram)
+        self.alocacoes = alocacoes or arquivo_alocacoes is not None # Mede memória por etapa
+        self.arquivo_perfil = arquivo_perfil
+        self.arquivo_alocacoes = arquivo_alocacoes
+        self._trava = threading.Lock() # Etapas de várias threads (servidor) são somadas uma de cada vez
+        self._em_andamento = {} # Thread -> quantas etapas dela estão rodando agora
+        self._comecadas = 0 # Quantas etapas já começaram (para saber se outra começou no meio)
+        self._perfil = None
+        if self.alocacoes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if arquivo_perfil is not None:
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+
+    @contextlib.contextmanager
+    def etapa(self, nome):
+        """Mede tudo o que acontece dentro do bloco. O bloco recebe a Etapa para anotar linhas, bytes e rejeitadas."""
+        etapa = Etapa(nome)
+        thread = threading.get_ident()
+        with self._trava:
+            self._comecadas += 1
+            marca = self._comecadas
+            sozinha = not any(quantas for outra, quantas in self._em_andamento.items() if outra != thread) # Nenhuma outra thread medindo
+            self._em_andamento[thread] = self._em_andamento.get(thread, 0) + 1
+            if self.alocacoes and sozinha:
+                memoria_antes = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield etapa
+        finally:
+            etapa.segundos = time.perf_counter() - inicio
+            with self._trava:
+                self._em_andamento[thread] -= 1
+                if not self._em_andamento[thread]:
+                    del self._em_andamento[thread]
+                if self.alocacoes and sozinha and self._comecadas == marca: # Ninguém mexeu no pico enquanto ela rodava
+                    memoria_agora, pico = tracemalloc.get_traced_memory()
+                    etapa.memoria_alocada = memoria_agora - memoria_antes
+                    etapa.pico_memoria = pico - memoria_antes
+                self._somar(etapa)
+
+    def medir_geracao(self, nome, itens):
+        """
+        Mede um gerador (ex: os registros de um relatório) só enquanto ele trabalha: o tempo de quem
+        consome (escrever o JSON, mandar pela rede) fica de fora. Conta os itens como linhas; memória não é medida.
+        """
+        etapa = Etapa(nome)
+        etapa.linhas = 0
+        iterador = iter(itens)
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+                finally:
+                    etapa.segundos += time.perf_counter() - inicio
+                etapa.linhas += 1
+                yield item
+        finally: # Também quando quem consome para no meio
+            with self._trava:
+                self._somar(etapa)
+
+    def _somar(self, etapa):
+        """Soma a etapa que terminou no resumo do seu nome (chamado com a trava)."""
+        soma = self._somas.get(etapa.nome)
+        if soma is None:
+            soma = self._somas[etapa.nome] = {"etapa": etapa.nome, "vezes": 0, "segundos": 0.0, "maior_segundos": 0.0}
+        soma["vezes"] += 1
+        soma["segundos"] += etapa.segundos
+        soma["maior_segundos"] = max(soma["maior_segundos"], etapa.segundos)
+        for campo in ("linhas", "bytes", "rejeitadas", "memoria_alocada"):
+            valor = getattr(etapa, campo)
+            if valor is not None:
+                soma[campo] = soma.get(campo, 0) + valor
+        if etapa.pico_memoria is not None:
+            soma["pico_memoria"] = max(soma.get("pico_memoria", 0), etapa.pico_memoria)
+
+    def contar_bytes(self, arquivo, etapa):
+        """Embrulha um arquivo binário (ex: a resposta da internet) para contar na etapa os bytes lidos."""
+        return io.BufferedReader(_ContadorDeBytes(arquivo, etapa))
+
+    def resumo(self):
+        """
+        As etapas somadas pelo nome, na ordem em que apareceram pela primeira vez: quantas vezes rodaram,
+        tempo total e maior tempo, e a soma de linhas, bytes, rejeitadas e memória (quando medidos).
+        """
+        with self._trava:
+            return [dict(soma) for soma in self._somas.values()]
+
+    def relatorio(self):
+        """O resumo em texto, uma etapa por linha."""
+        linhas = ["Medições por etapa:"]
+        for soma in self.resumo():
+            partes = [f"{soma['segundos'] * 1000:.1f} ms"]
+            if soma["vezes"] > 1:
+                partes.append(f"{soma['vezes']} vezes, a maior {soma['maior_segundos'] * 1000:.1f} ms")
+            if "linhas" in soma:
+                partes.append(f"{soma['linhas']} linhas")
+            if "rejeitadas" in soma:
+                partes.append(f"{soma['rejeitadas']} rejeitadas")
+            if "bytes" in soma:
+                partes.append(f"{soma['bytes'] / 2**20:.2f} MB lidos")
+            if "memoria_alocada" in soma:
+                partes.append(f"memória {soma['memoria_alocada'] / 2**20:+.2f} MB (pico {soma['pico_memoria'] / 2**20:.2f} MB)")
+            linhas.append(f"  {soma['etapa']}: " + ", ".join(partes))
+        return "\n".join(linhas)
+
+    def encerrar(self, saida=None):
+        """Grava o perfil e as alocações (se pedidos) e, se passar uma saída, escreve o resumo nela."""
+        if self._perfil is not None:
+            self._perfil.disable()
+            self._perfil.dump_stats(self.arquivo_perfil)
+            self._perfil = None
+        if self.arquivo_alocacoes is not None and tracemalloc.is_tracing():
+            maiores = tracemalloc.take_snapshot().statistics("lineno")[:LINHAS_DE_ALOCACOES]
+            with open(self.arquivo_alocacoes, "w", encoding="utf-8") as arquivo:
+                arquivo.write("\n".join(str(estatistica) for estatistica in maiores) + "\n")
+        if saida is not None:
+            print(self.relatorio(), file=saida)
+
+class _ContadorDeBytes(io.RawIOBase):
+    """Lê de outro arquivo binário e vai somando na etapa quantos bytes passaram."""
+    def __init__(self, arquivo, etapa):
+        self._arquivo = arquivo
+        self._etapa = etapa
+        etapa.bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        lidos = self._arquivo.readinto(destino)
+        if lidos:
+            self._etapa.bytes += lidos
+        return lidos
+
+def adicionar_opcoes(parser):
+    """Coloca num parser de linha de comando as opções das medições (usadas no modo lote e no servidor)."""
+    parser.add_argument("--instrumentar", action="store_true", help="Mede cada etapa e escreve o resumo na saída de erro no fim")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="Grava o perfil do cProfile nesse arquivo (liga as medições)")
+    parser.add_argument("--alocacoes", metavar="ARQUIVO", help="Grava onde a memória foi alocada (tracemalloc) nesse arquivo (liga as medições)")
+
+def da_linha_de_comando(args):
+    """As medições pedidas na linha de comando, ou None para valer o que as variáveis de ambiente pedirem."""
+    if not (args.instrumentar or args.perfil or args.alocacoes):
+        return None
+    return Instrumentacao(arquivo_perfil=args.perfil, arquivo_alocacoes=args.alocacoes)
+
+_do_ambiente = None # As medições pedidas pelas variáveis de ambiente (uma só para o programa inteiro)
+
+def do_ambiente():
+    """
+    Liga as medições se as variáveis de ambiente pedirem (veja VARIAVEL_*), senão devolve DESLIGADA.
+    Ligadas assim, valem para o programa inteiro: o resumo vai para a saída de erro e os arquivos
+    são gravados quando o programa termina.
+    """
+    global _do_ambiente
+    if _do_ambiente is None:
+        arquivo_perfil = os.environ.get(VARIAVEL_PERFIL) or None
+        arquivo_alocacoes = os.environ.get(VARIAVEL_ALOCACOES) or None
+        if os.environ.get(VARIAVEL_LIGAR, "") in ("", "0") and arquivo_perfil is None and arquivo_alocacoes is None:
+            _do_ambiente = DESLIGADA
+        else:
+            _do_ambiente = Instrumentacao(arquivo_perfil=arquivo_perfil, arquivo_alocacoes=arquivo_alocacoes)
+            atexit.register(_do_ambiente.encerrar, sys.stderr)
+    return _do_ambiente
@@ -1,4 +1,6 @@
-from analisador_csv import CSVAnalyzer # Pega a parte inteligente do programa (o analisador)
+import sys # Para sair com o resultado do modo lote e escrever as medições na saída de erro
+import modo_lote # Para rodar vários comandos de uma vez, sem menu (e carregar a planilha do jeito que a linha de comando pedir)
+import instrumentacao # Medições opcionais de cada etapa
 
 def menu():
     """Mostra todas as opções que você pode escolher no programa."""
@@ -9,11 +11,26 @@ def menu():
     print("4. Eficiência por ano de experiência") # Para ver o custo em relação à experiência de cada um
     print("5. Melhor custo-benefício") # Para achar quem dá o melhor retorno
     print("6. Projeção de economia") # Para ver quanto a gente pode economizar
+    print("7. Menos eficientes por departamento") # Para ver quem mais pesa em cada área
     print("0. Sair do programa") # Para fechar o programa
 
-def executar():
-    """É quem faz o programa rodar! Pede a opção e mostra o resultado."""
-    analyzer = CSVAnalyzer() # Liga a parte inteligente do programa
+def executar(args=None):
+    """
+    É quem faz o programa rodar! Pede a opção e mostra o resultado.
+    Se vier a linha de comando já lida (args), usa o --url, o --sem-cache e as medições que ela pedir.
+    """
+    if args is None: # Sem linha de comando: tudo no padrão
+        args = modo_lote.criar_parser().parse_args([])
+    medicoes = instrumentacao.da_linha_de_comando(args) # None: vale o que as variáveis de ambiente pedirem
+    try:
+        rodar_menu(args, medicoes)
+    finally:
+        if medicoes is not None: # O resumo das medições vai para a saída de erro quando o menu fecha
+            medicoes.encerrar(sys.stderr)
+
+def rodar_menu(args, medicoes):
+    """Carrega a planilha e fica mostrando o menu até você sair."""
+    analyzer = modo_lote.carregar(args, medicoes) # Liga a parte inteligente do programa, lendo a planilha aos poucos ou da cópia salva
     
     # Ele já tentou pegar e arrumar os dados assim que ligou
     if not analyzer.data: # Se não conseguiu arrumar os dados
@@ -32,4 +49,7 @@ def executar():
             break # Desliga o programa
 
 if __name__ == "__main__": # Isso faz o programa começar quando você o executa
-    executar() # Inicia o programa
+    args = modo_lote.criar_parser().parse_args() # As mesmas opções do modo lote (ex: python menu_principal.py 1 2 6 --formato csv)
+    if modo_lote.tem_comandos(args): # Se você passou comandos ou um arquivo com comandos
+        sys.exit(modo_lote.executar_lote(args)) # Roda todos de uma vez, sem menu
+    executar(args) # Sem comandos, abre o menu (com --instrumentar, --url etc. valendo nele também)
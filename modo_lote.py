@@ -0,0 +1,105 @@
+import argparse # Para ler as opções da linha de comando
+import contextlib # Para mandar as mensagens de carga para o lugar certo
+import csv # Para escrever os resultados em CSV
+import json # Para escrever os resultados em JSON Lines
+import sys # Para ler e escrever na entrada e saída padrão
+from analisador_csv import CSVAnalyzer # A parte inteligente do programa
+from cache_snapshot import CacheSnapshots # Guarda uma cópia dos dados no computador para abrir mais rápido
+import instrumentacao # Medições opcionais de cada etapa
+
+def ler_comandos(comandos, arquivo=None):
+    """Junta os comandos da linha de comando com os de um arquivo (um por linha; '-' lê da entrada padrão)."""
+    yield from comandos
+    if arquivo is None:
+        return
+    with (contextlib.nullcontext(sys.stdin) if arquivo == "-" else open(arquivo, encoding="utf-8")) as entrada:
+        for linha in entrada:
+            linha = linha.strip()
+            if linha and not linha.startswith("#"): # Pula linhas vazias e comentários
+                yield linha
+
+def escrever_jsonl(analyzer, comandos, saida):
+    """Escreve um objeto JSON por linha, cada um com o comando que o gerou."""
+    for comando in comandos:
+        try:
+            for registro in analyzer.registros(comando): # Um registro de cada vez, sem montar a lista toda
+                saida.write(json.dumps({"comando": comando, **registro}, ensure_ascii=False) + "\n")
+        except ValueError as e: # Comando que não existe
+            saida.write(json.dumps({"comando": comando, "erro": str(e)}, ensure_ascii=False) + "\n")
+
+def escrever_csv(analyzer, comandos, saida):
+    """Escreve um bloco de CSV por comando, cada bloco com o seu próprio cabeçalho."""
+    escritor = csv.writer(saida)
+    for comando in comandos:
+        try:
+            colunas = None
+            for registro in analyzer.registros(comando):
+                if colunas is None: # Primeiro registro do comando: escreve o cabeçalho
+                    colunas = list(registro)
+                    escritor.writerow(["comando"] + colunas)
+                escritor.writerow([comando] + [registro[coluna] for coluna in colunas])
+        except ValueError as e: # Comando que não existe
+            escritor.writerow(["comando", "erro"])
+            escritor.writerow([comando, str(e)])
+
+def escrever_texto(analyzer, comandos, saida):
+    """Escreve as mesmas mensagens do menu, uma depois da outra, linha por linha."""
+    for comando in comandos:
+        for linha in analyzer.linhas_do_comando(comando): # O ranking inteiro vai saindo aos poucos
+            saida.write(linha + "\n")
+        saida.write("\n")
+
+FORMATOS = {"jsonl": escrever_jsonl, "csv": escrever_csv, "texto": escrever_texto} # Jeitos de escrever o resultado
+
+def criar_parser():
+    """As opções da linha de comando (usadas aqui e no menu_principal, que decide se abre o menu ou roda os comandos)."""
+    parser = argparse.ArgumentParser(description="Roda vários relatórios da calculadora de custos de uma vez, sem menu.")
+    parser.add_argument("comandos", nargs="*", help="Comandos do menu (ex: 1 2 6)")
+    parser.add_argument("--arquivo", help="Arquivo com um comando por linha ('-' para ler da entrada padrão)")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="jsonl", help="Como escrever o resultado (padrão: jsonl)")
+    adicionar_opcoes_de_carga(parser)
+    return parser
+
+def adicionar_opcoes_de_carga(parser):
+    """As opções de onde e como carregar a planilha (--url, --sem-cache e as medições), iguais no lote, no menu, no servidor e nos cenários."""
+    parser.add_argument("--url", help="Link da planilha (padrão: a planilha do desafio)")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa nem grava a cópia salva no computador")
+    instrumentacao.adicionar_opcoes(parser)
+
+def carregar(args, medicoes):
+    """Liga o analisador do jeito que a linha de comando pediu: lendo a planilha aos poucos, com ou sem a cópia salva."""
+    opcoes = {"streaming": True, "cache": None if args.sem_cache else CacheSnapshots(), "instrumentacao": medicoes}
+    if args.url:
+        opcoes["sheets_url"] = args.url
+    return CSVAnalyzer(**opcoes)
+
+def tem_comandos(args):
+    """Se a linha de comando pediu algum comando (direto ou num arquivo)."""
+    return bool(args.comandos) or args.arquivo is not None
+
+def main(argv=None):
+    """Carrega a planilha uma vez só e roda todos os comandos pedidos, sem perguntar nada."""
+    return executar_lote(criar_parser().parse_args(argv))
+
+def executar_lote(args):
+    """Roda os comandos de uma linha de comando já lida, com as medições que ela pedir."""
+    medicoes = instrumentacao.da_linha_de_comando(args) # None: vale o que as variáveis de ambiente pedirem
+    try:
+        return rodar(args, medicoes)
+    finally:
+        if medicoes is not None: # O resumo vai para a saída de erro, longe do resultado
+            medicoes.encerrar(sys.stderr)
+
+def rodar(args, medicoes):
+    """Carrega a planilha e escreve o resultado de todos os comandos."""
+    with contextlib.redirect_stdout(sys.stderr): # As mensagens da carga não se misturam com o resultado
+        analyzer = carregar(args, medicoes)
+    if not analyzer.data: # Se não conseguiu arrumar os dados
+        print("Não foi possível rodar os comandos porque os dados não estão prontos.", file=sys.stderr)
+        return 1
+
+    FORMATOS[args.formato](analyzer, ler_comandos(args.comandos, args.arquivo), sys.stdout)
+    return 0
+
+if __name__ == "__main__": # Ex: python modo_lote.py 1 2 6 --formato csv
+    sys.exit(main())
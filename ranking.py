@@ -0,0 +1,33 @@
+def piores(ordem, eficiencias, quantidade):
+    """
+    Os menos eficientes primeiro, a partir de uma lista já ordenada do mais para o menos eficiente
+    (pela chave (eficiência, linha na planilha), como a do Agregados). Anda do fim para o começo,
+    devolvendo cada grupo de empatados na ordem em que está, que é a da planilha. Custa O(quantidade).
+    """
+    resultado = [] # Quem vai ser devolvido
+    fim = len(ordem) # Até onde ainda falta olhar
+    while fim > 0 and len(resultado) < quantidade: # Enquanto faltar gente e ainda tiver ranking
+        inicio = fim - 1 # Começo do grupo de empatados
+        valor = eficiencias[ordem[inicio]]
+        while inicio > 0 and eficiencias[ordem[inicio - 1]] == valor: # Junta todo mundo com a mesma eficiência
+            inicio -= 1
+        resultado.extend(ordem[inicio:fim]) # O grupo já está na ordem da planilha
+        fim = inicio # Passa para o próximo grupo
+    return resultado[:quantidade]
+
+def total_de_paginas(quantidade, tamanho):
+    """Quantas páginas de 'tamanho' cabem 'quantidade' itens (arredondando para cima; no mínimo uma, mesmo vazia)."""
+    return max(-(-quantidade // tamanho), 1)
+
+def pagina(ordem, numero, tamanho):
+    """
+    Devolve só a página pedida (começando em 1) de uma lista ordenada.
+    Dá ValueError se o tamanho não for pelo menos 1 ou se a página não existir.
+    """
+    if tamanho < 1: # Página sem ninguém não existe (e dividiria por zero)
+        raise ValueError(f"O tamanho da página precisa ser um número a partir de 1, não {tamanho}.")
+    total = total_de_paginas(len(ordem), tamanho)
+    if not 1 <= numero <= total: # Página antes da primeira ou depois da última
+        raise ValueError(f"A página {numero} não existe: são {total} página(s) de {tamanho}.")
+    inicio = (numero - 1) * tamanho # Onde a página começa
+    return ordem[inicio:inicio + tamanho]
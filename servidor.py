@@ -0,0 +1,282 @@
+import argparse # Para ler as opções da linha de comando
+import contextlib # Para montar as travas de leitura e escrita
+import json # Para responder em JSON
+import sys # Para escrever o resumo das medições na saída de erro
+import threading # Para atender vários pedidos ao mesmo tempo
+import time # Para medir quanto cada pedido demora
+import urllib.parse # Para separar o caminho e as opções do link
+from collections import deque # Para guardar só os tempos mais recentes de cada endereço
+from concurrent.futures import Future # Para quem chegou depois esperar a mesma atualização
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # O servidor HTTP que já vem com o Python
+from analisador_csv import RELATORIOS # Os relatórios que a parte inteligente do programa sabe fazer
+import instrumentacao # Medições opcionais de cada etapa
+import modo_lote # As mesmas opções de carga da linha de comando
+
+AMOSTRAS_POR_ENDERECO = 1000 # Quantos tempos recentes guardar por endereço para calcular as medianas
+FORMATOS = ("texto", "json") # Como os relatórios podem vir
+
+class TravaLeituraEscrita:
+    """
+    Deixa muita gente ler ao mesmo tempo, mas só uma pessoa escrever, e sozinha.
+    Quem quer escrever tem a vez: novos leitores esperam até a escrita terminar.
+    """
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._leitores = 0 # Quantos estão lendo agora
+        self._escrevendo = False # Se alguém está escrevendo agora
+        self._escritores_esperando = 0 # Quantos querem escrever
+
+    @contextlib.contextmanager
+    def leitura(self):
+        """Enquanto estiver dentro, ninguém escreve."""
+        with self._condicao:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._leitores -= 1
+                if not self._leitores:
+                    self._condicao.notify_all()
+
+    @contextlib.contextmanager
+    def escrita(self):
+        """Enquanto estiver dentro, ninguém mais lê nem escreve."""
+        with self._condicao:
+            self._escritores_esperando += 1
+            while self._escrevendo or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escrevendo = True
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._escrevendo = False
+                self._condicao.notify_all()
+
+class Metricas:
+    """Conta pedidos e guarda quanto tempo cada endereço leva para responder."""
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._por_endereco = {} # Endereço -> [quantidade, tempo total, maior tempo, tempos recentes]
+
+    def registrar(self, endereco, segundos):
+        """Anota mais um pedido para esse endereço."""
+        with self._trava:
+            dados = self._por_endereco.get(endereco)
+            if dados is None:
+                dados = self._por_endereco[endereco] = [0, 0.0, 0.0, deque(maxlen=AMOSTRAS_POR_ENDERECO)]
+            dados[0] += 1
+            dados[1] += segundos
+            dados[2] = max(dados[2], segundos)
+            dados[3].append(segundos)
+
+    def resumo(self):
+        """Quantidade, média, mediana, p99 e máximo de cada endereço, em milissegundos."""
+        with self._trava:
+            copia = {endereco: (dados[0], dados[1], dados[2], sorted(dados[3])) for endereco, dados in self._por_endereco.items()}
+        resumo = {}
+        for endereco, (quantidade, total, maior, recentes) in copia.items():
+            resumo[endereco] = {
+                "pedidos": quantidade,
+                "media_ms": total / quantidade * 1000,
+                "p50_ms": recentes[len(recentes) // 2] * 1000,
+                "p99_ms": recentes[min(len(recentes) - 1, len(recentes) * 99 // 100)] * 1000,
+                "max_ms": maior * 1000,
+            }
+        return resumo
+
+class ServicoConsultas:
+    """
+    Segura um analisador só, com os dados já arrumados na memória, e responde os relatórios
+    para quem pedir. Atualizações pedidas ao mesmo tempo viram um download só.
+    """
+    def __init__(self, analyzer):
+        self.analyzer = analyzer # Os dados, carregados uma vez
+        self.trava = TravaLeituraEscrita() # Relatórios leem juntos; aplicar uma atualização escreve sozinho
+        self.metricas = Metricas()
+        self._trava_atualizacao = threading.Lock()
+        self._atualizacao = None # A atualização que está acontecendo agora (um Future), se tiver
+
+    def relatorio(self, comando, formato="texto", pagina=None, por_pagina=50):
+        """Responde um comando do menu, em texto ou como registros com os números crus (o ranking, se pedir, numa página só)."""
+        with self.trava.leitura():
+            if formato == "json":
+                return list(self.analyzer.registros(comando, pagina, por_pagina))
+            return self.analyzer.process_command(comando, pagina, por_pagina)
+
+    def atualizar(self):
+        """
+        Atualiza os dados. Se já tem uma atualização acontecendo, espera por ela em vez de baixar de novo.
+        O download acontece sem travar os relatórios; só a aplicação das mudanças trava.
+        """
+        with self._trava_atualizacao:
+            futuro = self._atualizacao
+            dono = futuro is None # Quem chegou primeiro faz o trabalho
+            if dono:
+                futuro = self._atualizacao = Future()
+        if not dono: # Alguém já está atualizando: espera o resultado dele
+            return futuro.result()
+
+        try:
+            sucesso, mensagem, novidade = self.analyzer.baixar_atualizacao() # Sem trava: os relatórios continuam respondendo
+            if novidade is not None:
+                with self.trava.escrita(): # Agora sim, ninguém lê enquanto as mudanças entram
+                    sucesso, mensagem = self.analyzer.aplicar_atualizacao(novidade)
+                    self.analyzer.preparar_contas() # Deixa as contas prontas antes de liberar os leitores
+            futuro.set_result((sucesso, mensagem))
+        except Exception as e:
+            futuro.set_exception(e)
+        finally:
+            with self._trava_atualizacao:
+                self._atualizacao = None
+        return futuro.result()
+
+class PedidosConsultas(BaseHTTPRequestHandler):
+    """
+    Os endereços do servidor:
+      GET  /relatorios/<comando>[?formato=json]  -> o relatório (texto ou registros JSON)
+      GET  /relatorios/4?pagina=2[&por_pagina=50] -> só uma página do ranking de eficiência
+      POST /atualizar                            -> busca a planilha de novo e aplica o que mudou
+      GET  /metricas                             -> quantos pedidos e quanto tempo cada endereço levou
+      GET  /medicoes                             -> as medições de cada etapa da carga e dos relatórios (se ligadas)
+      GET  /saude                                -> se o servidor está de pé e quantos funcionários tem
+    """
+    protocol_version = "HTTP/1.1" # Deixa a conexão aberta para os próximos pedidos
+    servico = None # O ServicoConsultas, preenchido ao ligar o servidor
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        partes = urllib.parse.urlsplit(self.path)
+        opcoes = urllib.parse.parse_qs(partes.query)
+        if partes.path.startswith("/relatorios/"):
+            comando = urllib.parse.unquote(partes.path[len("/relatorios/"):])
+            endereco = f"GET /relatorios/{comando}"
+            if comando.lower() not in RELATORIOS:
+                self._responder(404, {"erro": f"Comando desconhecido: {comando}"})
+                return
+            formato = opcoes.get("formato", ["texto"])[0]
+            if formato not in FORMATOS:
+                self._responder(400, {"erro": f"Formato desconhecido: {formato}. Use um destes: {', '.join(FORMATOS)}."})
+                return
+            try:
+                pagina = int(opcoes["pagina"][0]) if "pagina" in opcoes else None
+                por_pagina = int(opcoes.get("por_pagina", ["50"])[0])
+            except ValueError:
+                pagina = por_pagina = 0 # Cai no erro logo abaixo
+            if (pagina is not None and pagina < 1) or por_pagina < 1:
+                self._responder(400, {"erro": "A página e o tamanho da página precisam ser números a partir de 1."})
+                return
+            try:
+                resultado = self.servico.relatorio(comando, formato, pagina, por_pagina)
+            except ValueError as e: # Página num comando que não tem páginas, ou depois da última
+                self._responder(400, {"erro": str(e)})
+                return
+            if formato == "json":
+                self._responder(200, resultado)
+            else:
+                self._responder_texto(200, resultado)
+        elif partes.path == "/metricas":
+            endereco = "GET /metricas"
+            self._responder(200, self.servico.metricas.resumo())
+        elif partes.path == "/medicoes":
+            endereco = "GET /medicoes"
+            self._responder(200, self.servico.analyzer.medicoes())
+        elif partes.path == "/saude":
+            endereco = "GET /saude"
+            self._responder(200, {"funcionarios": len(self.servico.analyzer.data)})
+        else:
+            self._responder(404, {"erro": "Endereço não encontrado."})
+            return
+        self.servico.metricas.registrar(endereco, time.perf_counter() - inicio)
+
+    def do_POST(self):
+        inicio = time.perf_counter()
+        if not self._descartar_corpo(): # O que vier no corpo não é usado, mas precisa sair da conexão
+            return
+        if urllib.parse.urlsplit(self.path).path != "/atualizar":
+            self._responder(404, {"erro": "Endereço não encontrado."})
+            return
+        sucesso, mensagem = self.servico.atualizar()
+        self._responder(200 if sucesso else 502, {"sucesso": sucesso, "mensagem": mensagem})
+        self.servico.metricas.registrar("POST /atualizar", time.perf_counter() - inicio)
+
+    def _descartar_corpo(self):
+        """
+        Lê e joga fora o corpo do pedido, para o próximo pedido da mesma conexão não começar no meio dele.
+        Sem Content-Length (ou com um inválido) não dá para saber onde o corpo acaba: responde 411 ou 400 e fecha a conexão.
+        """
+        if "Transfer-Encoding" in self.headers: # Corpo em pedaços: não sabemos o tamanho de antemão
+            self.close_connection = True
+            self._responder(411, {"erro": "Mande o pedido com Content-Length."})
+            return False
+        try:
+            tamanho = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            self.close_connection = True
+            self._responder(400, {"erro": "Content-Length inválido."})
+            return False
+        while tamanho > 0: # Lê aos pedaços, sem guardar nada
+            pedaco = self.rfile.read(min(tamanho, 65536))
+            if not pedaco: # A conexão acabou antes do corpo
+                self.close_connection = True
+                return False
+            tamanho -= len(pedaco)
+        return True
+
+    def _responder(self, status, dados):
+        """Responde em JSON."""
+        self._enviar(status, json.dumps(dados, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _responder_texto(self, status, texto):
+        """Responde em texto puro."""
+        self._enviar(status, texto.encode("utf-8"), "text/plain; charset=utf-8")
+
+    def _enviar(self, status, corpo, tipo):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args): # Sem uma linha de log a cada pedido
+        pass
+
+def criar_servidor(analyzer, endereco="127.0.0.1", porta=8765):
+    """Monta o servidor (ainda sem ligar) em volta de um analisador já carregado."""
+    pedidos = type("Pedidos", (PedidosConsultas,), {"servico": ServicoConsultas(analyzer)}) # Cada servidor com o seu serviço
+    return ThreadingHTTPServer((endereco, porta), pedidos)
+
+def main(argv=None):
+    """Carrega a planilha uma vez e fica respondendo os relatórios até alguém desligar (Ctrl+C)."""
+    parser = argparse.ArgumentParser(description="Servidor local que responde os relatórios da calculadora de custos.")
+    parser.add_argument("--endereco", default="127.0.0.1", help="Endereço para escutar (padrão: só este computador)")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta para escutar (padrão: 8765)")
+    modo_lote.adicionar_opcoes_de_carga(parser)
+    args = parser.parse_args(argv)
+
+    medicoes = instrumentacao.da_linha_de_comando(args) # None: vale o que as variáveis de ambiente pedirem
+    analyzer = modo_lote.carregar(args, medicoes)
+    if not analyzer.data: # Se não conseguiu arrumar os dados
+        print("Não foi possível ligar o servidor porque os dados não estão prontos.")
+        return 1
+
+    servidor = criar_servidor(analyzer, args.endereco, args.porta)
+    print(f"Servidor pronto em http://{args.endereco}:{servidor.server_port}/ (Ctrl+C para desligar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        if medicoes is not None: # Resumo e arquivos das medições quando o servidor desliga
+            medicoes.encerrar(sys.stderr)
+    return 0
+
+if __name__ == "__main__": # Ex: python servidor.py --porta 8765
+    raise SystemExit(main())
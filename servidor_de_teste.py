@@ -0,0 +1,58 @@
+# Um servidor de mentira que faz de conta que é o Google entregando a planilha em CSV.
+# Usado pelo benchmark e pelos testes, para nenhum dos dois precisar da internet.
+
+import hashlib # Para o ETag: uma impressão digital do conteúdo
+import http.server # Para fazer de conta que somos o Google servindo a planilha
+import os # Para saber o tamanho do arquivo
+import shutil # Para mandar um arquivo grande aos pedaços
+import threading # Para o servidor de mentira rodar junto com o teste
+
+class PedidosPlanilha(http.server.BaseHTTPRequestHandler):
+    """
+    Entrega o CSV do servidor (self.server.conteudo em bytes, ou o arquivo self.server.caminho).
+    Com self.server.etag ligado, manda um ETag e responde 304 (sem a tabela) quando a planilha não mudou.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        servidor = self.server
+        servidor.pedidos.append(self.headers.get("If-None-Match")) # Anota cada pedido (e o ETag que veio junto)
+        servidor.liberada.wait() # Os testes podem segurar a resposta para ver o que acontece enquanto isso
+        conteudo, caminho = servidor.conteudo, servidor.caminho
+        if servidor.etag:
+            digital = hashlib.sha1(conteudo) if caminho is None else hashlib.sha1(f"{os.path.getsize(caminho)}:{os.stat(caminho).st_mtime_ns}".encode())
+            etag = f'"{digital.hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag: # Não mudou: responde sem a tabela
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(200)
+        if servidor.etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(conteudo) if caminho is None else os.path.getsize(caminho)))
+        self.end_headers()
+        if caminho is None:
+            self.wfile.write(conteudo)
+        else:
+            with open(caminho, "rb") as arquivo: # Planilhas enormes não cabem inteiras na memória
+                shutil.copyfileobj(arquivo, self.wfile)
+
+    def log_message(self, *args): # Sem mensagens a cada pedido
+        pass
+
+def servir_csv(conteudo=None, caminho=None, etag=False):
+    """
+    Liga um servidor de mentira no computador que entrega o CSV. Devolve o servidor e o link.
+    O CSV pode vir em bytes (conteudo) ou de um arquivo (caminho), que é mandado aos pedaços.
+    Dá para trocar a planilha depois (servidor.conteudo), ver os pedidos que chegaram (servidor.pedidos)
+    e segurar as respostas (servidor.liberada.clear()) até chamar servidor.liberada.set().
+    """
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), PedidosPlanilha)
+    servidor.conteudo, servidor.caminho, servidor.etag = conteudo, caminho, etag
+    servidor.pedidos = [] # O If-None-Match de cada pedido (None se não veio)
+    servidor.liberada = threading.Event()
+    servidor.liberada.set()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}/planilha.csv"
@@ -0,0 +1,36 @@
+import random # Para montar tabelas aleatórias
+import unittest
+from fractions import Fraction # Para conferir com a conta exata
+from analisador_csv import CSVAnalyzer
+from armazem_funcionarios import ArmazemFuncionarios
+
+def analisador_com(funcionarios):
+    """Um analisador com esses funcionários (nome, departamento, salário em centavos, experiência), sem internet."""
+    armazem = ArmazemFuncionarios()
+    for nome, departamento, salario, experiencia in funcionarios:
+        armazem.adicionar(nome, departamento, salario, experiencia, "2020-01-01")
+    return CSVAnalyzer(armazem=armazem)
+
+class TesteMelhorCustoBeneficio(unittest.TestCase):
+    def test_eficiencia_que_nao_cabe_num_float(self):
+        # 1000,01 x 1,8 / 3 anos = 600,006 por ano: não existe float exatamente igual
+        analyzer = analisador_com([("A", "TI", 100001, 3), ("B", "TI", 200000, 3)])
+        self.assertIn("- A (Área: TI)", analyzer.process_command("5"))
+        self.assertEqual([registro["nome"] for registro in analyzer.registros("5")], ["A"])
+
+    def test_empatados_aparecem_todos(self):
+        analyzer = analisador_com([("A", "TI", 100001, 3), ("B", "RH", 100001, 3), ("C", "TI", 900000, 1)])
+        self.assertEqual([registro["nome"] for registro in analyzer.registros("5")], ["A", "B"])
+
+    def test_tabelas_aleatorias(self):
+        aleatorio = random.Random(7)
+        for _ in range(200):
+            funcionarios = [(f"P{i}", aleatorio.choice(["TI", "RH"]), aleatorio.randint(1, 3_000_000), aleatorio.randint(0, 30))
+                            for i in range(aleatorio.randint(1, 20))]
+            analyzer = analisador_com(funcionarios)
+            eficiencias = [Fraction((salario * 18 + 5) // 10, max(experiencia, 1)) for _, _, salario, experiencia in funcionarios]
+            esperados = [nome for (nome, *_), eficiencia in zip(funcionarios, eficiencias) if eficiencia == min(eficiencias)]
+            self.assertEqual([registro["nome"] for registro in analyzer.registros("5")], esperados)
+
+if __name__ == "__main__":
+    unittest.main()
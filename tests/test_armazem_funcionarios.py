@@ -0,0 +1,90 @@
+import unittest
+from armazem_funcionarios import ArmazemFuncionarios
+
+def armazem_com(funcionarios):
+    """Um armazém com esses funcionários (nome, departamento, salário em centavos, experiência, data)."""
+    armazem = ArmazemFuncionarios()
+    for funcionario in funcionarios:
+        armazem.adicionar(*funcionario)
+    return armazem
+
+def linhas(armazem):
+    """Os funcionários que valem, na ordem da planilha, como (nome, departamento, salário, experiência, data)."""
+    return [(armazem.nomes[i], armazem.departamento(i), armazem.salarios[i], armazem.experiencias[i], armazem.datas_contratacao[i])
+            for i in armazem.posicoes_em_ordem()]
+
+FUNCIONARIOS = [("Ana", "TI", 500000, 2, "2020-01-01"), ("Bia", "RH", 400000, 3, "2021-05-10"),
+                ("Caio", "TI", 600000, 4, "2019-03-02"), ("Davi", "Vendas", 700000, 5, "2020-01-01")]
+
+class TesteRemoverECompactar(unittest.TestCase):
+    def test_remover_marca_sem_apagar(self):
+        armazem = armazem_com(FUNCIONARIOS)
+        versao = armazem.versao
+        armazem.remover(1)
+        self.assertEqual(len(armazem), 3)
+        self.assertEqual(len(armazem.salarios), 4) # A coluna continua com o buraco
+        self.assertEqual(armazem.removidos, 1)
+        self.assertEqual(list(armazem.posicoes()), [0, 2, 3])
+        self.assertGreater(armazem.versao, versao)
+
+    def test_precisa_compactar_so_passando_da_metade(self):
+        armazem = armazem_com(FUNCIONARIOS)
+        armazem.remover(0)
+        armazem.remover(1)
+        self.assertFalse(armazem.precisa_compactar()) # Metade exata ainda não
+        armazem.remover(2)
+        self.assertTrue(armazem.precisa_compactar())
+
+    def test_compactar_tira_os_buracos_e_mantem_a_ordem(self):
+        armazem = armazem_com(FUNCIONARIOS)
+        armazem.remover(0)
+        armazem.remover(2)
+        antes = linhas(armazem)
+        posicoes = [armazem.posicoes_planilha[i] for i in armazem.posicoes()]
+        versao = armazem.versao
+        armazem.compactar()
+        self.assertEqual(linhas(armazem), antes)
+        self.assertEqual(list(armazem.posicoes_planilha), posicoes) # Cada um lembra a sua linha na planilha
+        self.assertEqual(armazem.removidos, 0)
+        self.assertEqual(len(armazem.salarios), 2)
+        self.assertEqual(list(armazem.vivos), [1, 1])
+        self.assertEqual(list(armazem.posicoes()), [0, 1])
+        self.assertGreater(armazem.versao, versao)
+
+class TesteJuntar(unittest.TestCase):
+    def test_juntar_traduz_as_areas_e_marca_a_origem(self):
+        armazem = armazem_com(FUNCIONARIOS[:2])
+        armazem.origens.append("aba1")
+        outro = armazem_com([("Eva", "Jurídico", 300000, 1, "2022-01-01"), ("Caio", "TI", 600000, 4, "2019-03-02")])
+        armazem.juntar(outro, "aba2")
+        self.assertEqual(linhas(armazem), FUNCIONARIOS[:2] + [("Eva", "Jurídico", 300000, 1, "2022-01-01"), ("Caio", "TI", 600000, 4, "2019-03-02")])
+        self.assertEqual(armazem.departamentos, ["TI", "RH", "Jurídico"]) # TI não ganha um código novo
+        self.assertEqual([armazem.origem(i) for i in range(4)], ["aba1", "aba1", "aba2", "aba2"])
+        self.assertEqual(list(armazem.posicoes_planilha), [0, 1, 2, 3])
+
+    def test_juntar_depois_de_remover_continua_na_ordem_da_planilha(self):
+        armazem = armazem_com(FUNCIONARIOS)
+        armazem.remover(1)
+        armazem.juntar(armazem_com([("Eva", "RH", 300000, 1, "2022-01-01")]), "aba2")
+        self.assertEqual([armazem.nomes[i] for i in armazem.posicoes_em_ordem()], ["Ana", "Caio", "Davi", "Eva"])
+        self.assertEqual(armazem.posicoes_planilha[4], 3) # Logo depois dos 3 que valiam
+
+class TesteChaves(unittest.TestCase):
+    def test_ocorrencias_separam_pessoas_repetidas(self):
+        armazem = armazem_com([("Ana", "TI", 500000, 2, "2020-01-01"), ("Bia", "RH", 400000, 3, "2020-01-01"),
+                               ("Ana", "RH", 900000, 2, "2020-01-01"), ("Ana", "TI", 500000, 2, "2021-01-01"),
+                               ("Ana", "TI", 100000, 1, "2020-01-01")])
+        self.assertEqual(list(armazem.chaves()), [(("Ana", "2020-01-01", 0), 0), (("Bia", "2020-01-01", 0), 1),
+                                                  (("Ana", "2020-01-01", 1), 2), (("Ana", "2021-01-01", 0), 3),
+                                                  (("Ana", "2020-01-01", 2), 4)])
+
+    def test_chaves_pulam_os_removidos_e_seguem_a_planilha(self):
+        armazem = armazem_com([("Ana", "TI", 500000, 2, "2020-01-01"), ("Ana", "RH", 900000, 2, "2020-01-01")])
+        armazem.adicionar("Ana", "TI", 100000, 1, "2020-01-01", posicao_planilha=0) # Entrou antes das outras na planilha
+        armazem.posicoes_planilha[0], armazem.posicoes_planilha[1] = 1, 2
+        armazem.na_ordem_da_planilha = False
+        armazem.remover(1)
+        self.assertEqual(list(armazem.chaves()), [(("Ana", "2020-01-01", 0), 2), (("Ana", "2020-01-01", 1), 0)])
+
+if __name__ == "__main__":
+    unittest.main()
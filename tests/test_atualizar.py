@@ -0,0 +1,148 @@
+import contextlib
+import io
+import random
+import tempfile
+import unittest
+from analisador_csv import CSVAnalyzer
+from cache_snapshot import CacheSnapshots
+from servidor_de_teste import servir_csv
+
+CABECALHO = "nome,departamento,salario,experiencia_anos,status_emprego,data_contratacao\n"
+COMANDOS = ["1", "2", "3", "4", "5", "6", "7"]
+
+def csv_de(linhas):
+    """O CSV com essas linhas (nome, departamento, salário, experiência, status, data)."""
+    return (CABECALHO + "".join(",".join(map(str, linha)) + "\n" for linha in linhas)).encode("utf-8")
+
+class TesteAtualizar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor, cls.url = servir_csv(b"", etag=True) # A planilha muda a cada teste; o ETag segue o conteúdo
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        self.servidor.pedidos.clear()
+
+    def publicar(self, linhas):
+        self.servidor.conteudo = csv_de(linhas)
+
+    def carregar(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return CSVAnalyzer(self.url, streaming=True)
+
+    def assertIgualCargaDoZero(self, analyzer):
+        do_zero = self.carregar()
+        for comando in COMANDOS:
+            with self.subTest(comando=comando):
+                self.assertEqual(list(analyzer.registros(comando)), list(do_zero.registros(comando)))
+                self.assertEqual(analyzer.process_command(comando), do_zero.process_command(comando))
+
+    def test_planilha_que_nao_mudou_responde_304(self):
+        self.publicar([("Ana", "TI", 5000, 2, "Ativo", "2020-01-01")])
+        analyzer = self.carregar()
+        sucesso, mensagem = analyzer.atualizar()
+        self.assertTrue(sucesso)
+        self.assertIn("não mudou", mensagem)
+        self.assertIsNone(self.servidor.pedidos[0]) # A carga pergunta sem ETag
+        self.assertIsNotNone(self.servidor.pedidos[1]) # O atualizar manda o ETag que recebeu
+
+    def test_novos_alterados_e_removidos(self):
+        self.publicar([("Ana", "TI", 5000, 2, "Ativo", "2020-01-01"), ("Bia", "RH", 4000, 3, "Ativo", "2020-01-01"),
+                       ("Caio", "TI", 6000, 4, "Ativo", "2020-01-01")])
+        analyzer = self.carregar()
+        self.publicar([("Ana", "TI", 5500, 2, "Ativo", "2020-01-01"), ("Caio", "TI", 6000, 4, "Ativo", "2020-01-01"),
+                       ("Davi", "Vendas", 7000, 5, "Ativo", "2020-01-01"), ("Eva", "RH", 3000, 1, "Inativo", "2020-01-01")])
+        sucesso, mensagem = analyzer.atualizar()
+        self.assertTrue(sucesso)
+        self.assertEqual(mensagem, "Planilha atualizada: 1 novo(s), 1 alterado(s), 1 removido(s).")
+        self.assertIgualCargaDoZero(analyzer)
+
+    def test_empates_na_ordem_da_planilha_depois_de_atualizar(self):
+        self.publicar([("B", "TI", 2000, 2, "Ativo", "2020-01-01"), ("C", "TI", 5000, 9, "Ativo", "2020-01-01")])
+        analyzer = self.carregar()
+        self.publicar([("A", "TI", 1000, 1, "Ativo", "2020-01-01"), ("B", "TI", 2000, 2, "Ativo", "2020-01-01"),
+                       ("C", "TI", 5000, 9, "Ativo", "2020-01-01")]) # A entra antes de B, com a mesma eficiência
+        analyzer.atualizar()
+        self.assertEqual([registro["nome"] for registro in analyzer.registros("6")][0], "A")
+        self.assertIgualCargaDoZero(analyzer)
+
+    def test_chaves_repetidas(self):
+        self.publicar([("Ana", "TI", 5000, 2, "Ativo", "2020-01-01"), ("Ana", "TI", 9000, 2, "Ativo", "2020-01-01")])
+        analyzer = self.carregar()
+        self.publicar([("Ana", "TI", 5000, 2, "Ativo", "2020-01-01"), ("Ana", "RH", 9000, 2, "Ativo", "2020-01-01"),
+                       ("Ana", "TI", 7000, 2, "Ativo", "2020-01-01")])
+        self.assertEqual(analyzer.atualizar()[1], "Planilha atualizada: 1 novo(s), 1 alterado(s), 0 removido(s).")
+        self.assertIgualCargaDoZero(analyzer)
+        self.publicar([("Ana", "TI", 7000, 2, "Ativo", "2020-01-01")]) # Sobra uma Ana: as ocorrências são contadas de novo
+        self.assertEqual(analyzer.atualizar()[1], "Planilha atualizada: 0 novo(s), 1 alterado(s), 2 removido(s).")
+        self.assertEqual(len(analyzer.data), 1)
+        self.assertIgualCargaDoZero(analyzer)
+
+    def test_com_copia_salva_nao_refaz_as_contas(self):
+        linhas = [(f"P{i}", "TI" if i % 2 else "RH", 3000 + i, 1 + i % 5, "Ativo", "2020-01-01") for i in range(10)]
+        self.publicar(linhas)
+        with tempfile.TemporaryDirectory() as pasta:
+            with contextlib.redirect_stdout(io.StringIO()):
+                analyzer = CSVAnalyzer(self.url, streaming=True, cache=CacheSnapshots(pasta))
+            agregados = analyzer._agregados()
+            self.publicar(linhas[1:]) # Sai um só
+            self.assertEqual(analyzer.atualizar()[1], "Planilha atualizada: 0 novo(s), 0 alterado(s), 1 removido(s).")
+            self.assertIs(analyzer._agregados(), agregados) # Corrigidas aos poucos, sem compactar nem refazer
+            self.assertEqual(analyzer.data.removidos, 1)
+            with contextlib.redirect_stdout(io.StringIO()):
+                da_copia = CSVAnalyzer(self.url, streaming=True, cache=CacheSnapshots(pasta))
+            self.assertEqual(list(da_copia.data.nomes), [linha[0] for linha in linhas[1:]])
+            for comando in COMANDOS:
+                self.assertEqual(list(da_copia.registros(comando)), list(analyzer.registros(comando)))
+
+    def test_data_que_falta_depois_da_copia_salva(self):
+        linhas = [("Ana", "TI", 5000, 2, "Ativo"), ("Bia", "RH", 4000, 3, "Ativo"), ("Caio", "TI", 6000, 4, "Ativo")] # Sem a coluna da data
+        self.publicar(linhas)
+        with tempfile.TemporaryDirectory() as pasta:
+            with contextlib.redirect_stdout(io.StringIO()):
+                CSVAnalyzer(self.url, streaming=True, cache=CacheSnapshots(pasta)) # Grava a cópia
+                da_copia = CSVAnalyzer(self.url, streaming=True, cache=CacheSnapshots(pasta)) # E abre por ela
+            self.assertIsNone(da_copia.data.datas_contratacao[0])
+            self.publicar([linhas[0], ("Bia", "RH", 4500, 3, "Ativo"), linhas[2]])
+            self.assertEqual(da_copia.atualizar()[1], "Planilha atualizada: 0 novo(s), 1 alterado(s), 0 removido(s).") # Só a Bia, sem tirar e pôr todo mundo
+            self.assertIgualCargaDoZero(da_copia)
+
+    def test_compacta_quando_sobram_muitos_buracos(self):
+        linhas = [(f"P{i}", "TI" if i % 2 else "RH", 3000 + i, 1 + i % 5, "Ativo", "2020-01-01") for i in range(10)]
+        self.publicar(linhas)
+        analyzer = self.carregar()
+        self.publicar(linhas[:4]) # Sai mais da metade
+        analyzer.atualizar()
+        self.assertEqual(analyzer.data.removidos, 0)
+        self.assertEqual(len(analyzer.data.salarios), 4)
+        self.assertIgualCargaDoZero(analyzer)
+        self.publicar(linhas[:4] + [("Novo", "TI", 9999, 3, "Ativo", "2020-01-01")]) # O índice por chave é refeito depois de compactar
+        self.assertEqual(analyzer.atualizar()[1], "Planilha atualizada: 1 novo(s), 0 alterado(s), 0 removido(s).")
+        self.assertIgualCargaDoZero(analyzer)
+
+    def test_igual_a_carga_do_zero_em_planilhas_aleatorias(self):
+        aleatorio = random.Random(11)
+        areas = ["TI", "RH", "Vendas", "Jurídico"]
+        def pessoa(i):
+            return (f"P{i}", aleatorio.choice(areas), aleatorio.choice([1000, 2000, 3000, 6000]), aleatorio.randint(0, 3),
+                    "Ativo" if aleatorio.random() < 0.9 else "Inativo", aleatorio.choice(["2020-01-01", "2021-01-01"]))
+        linhas = [pessoa(i) for i in range(30)]
+        self.publicar(linhas)
+        analyzer = self.carregar()
+        for rodada in range(25):
+            linhas = [linha for linha in linhas if aleatorio.random() > 0.15] # Alguns saem
+            for _ in range(aleatorio.randint(0, 8)): # Outros entram em qualquer lugar, até repetindo nomes
+                linhas.insert(aleatorio.randint(0, len(linhas)), pessoa(aleatorio.randint(0, 60)))
+            linhas = [pessoa(int(linha[0][1:])) if aleatorio.random() < 0.1 else linha for linha in linhas] # Outros mudam
+            if rodada % 5 == 4: # De vez em quando a planilha é reordenada
+                aleatorio.shuffle(linhas)
+            self.publicar(linhas)
+            self.assertTrue(analyzer.atualizar()[0])
+            self.assertIgualCargaDoZero(analyzer)
+
+if __name__ == "__main__":
+    unittest.main()
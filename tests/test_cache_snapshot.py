@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from analisador_csv import CSVAnalyzer
+from armazem_funcionarios import ArmazemFuncionarios
+from cache_snapshot import CacheSnapshots
+from tests.test_agregador import analisador_com
+
+PLANILHA = "https://docs.google.com/spreadsheets/d/abc123/edit"
+
+class TesteCacheSnapshots(unittest.TestCase):
+    def test_ida_e_volta(self):
+        original = analisador_com([("Ana", "TI", 550050, 2), ("Bia", "RH", 400000, 0), ("Çé", "TI", 1, 30)]).data
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheSnapshots(pasta)
+            cache.salvar("chave", original, etag='"v1"')
+            armazem, infos = cache.carregar("chave")
+        self.assertEqual(list(armazem.nomes), list(original.nomes))
+        self.assertEqual(list(armazem.salarios), list(original.salarios))
+        self.assertEqual(list(armazem.experiencias), list(original.experiencias))
+        self.assertEqual([armazem.departamento(i) for i in range(len(armazem))], [original.departamento(i) for i in range(len(original))])
+        self.assertEqual(infos["etag"], '"v1"')
+        self.assertTrue(infos["fresca"])
+
+    def test_nome_e_data_que_faltam_continuam_none(self):
+        original = ArmazemFuncionarios()
+        original.adicionar("Ana", "TI", 100000, 2, None) # Sem data
+        original.adicionar(None, "RH", 200000, 3, "") # Sem nome e com a data em branco
+        original.adicionar("", "TI", 300000, 1, "2020-01-01")
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheSnapshots(pasta)
+            cache.salvar("chave", original)
+            armazem, _ = cache.carregar("chave")
+        self.assertEqual(armazem.nomes, ["Ana", None, ""])
+        self.assertEqual(armazem.datas_contratacao, [None, "", "2020-01-01"])
+        self.assertEqual(list(armazem.chaves()), list(original.chaves()))
+
+    def test_salva_so_quem_vale_sem_mexer_no_armazem(self):
+        original = analisador_com([("Ana", "TI", 550050, 2), ("Bia", "RH", 400000, 0), ("Caio", "TI", 1, 30)]).data
+        original.remover(1)
+        original.adicionar("Davi", "RH", 300000, 4, "2020-01-01", posicao_planilha=0) # Entrou numa atualização, antes de todos
+        original.na_ordem_da_planilha = False
+        original.posicoes_planilha[0], original.posicoes_planilha[2] = 1, 2
+        versao = original.versao
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheSnapshots(pasta)
+            cache.salvar("chave", original)
+            armazem, _ = cache.carregar("chave")
+        self.assertEqual((original.removidos, original.versao, len(original.salarios)), (1, versao, 4)) # Os buracos continuam lá
+        self.assertEqual(list(armazem.nomes), ["Davi", "Ana", "Caio"]) # Na ordem da planilha
+        self.assertEqual(list(armazem.salarios), [300000, 550050, 1])
+        self.assertEqual(list(armazem.posicoes_planilha), [0, 1, 2])
+
+    def test_arquivo_estragado(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheSnapshots(pasta)
+            with open(cache._caminho("chave"), "wb") as arquivo:
+                arquivo.write(b"CALCSNP3 pela metade")
+            self.assertIsNone(cache.carregar("chave"))
+            self.assertIsNone(cache.carregar("nao_existe"))
+
+    def test_chave_vem_do_link_de_download(self):
+        chave = lambda url: CSVAnalyzer(url, armazem=ArmazemFuncionarios())._chave_cache() # Sem internet
+        self.assertEqual(chave(PLANILHA + "#gid=5"), chave(PLANILHA + "?usp=sharing#gid=5")) # Mesma aba, links diferentes
+        self.assertNotEqual(chave(PLANILHA + "#gid=5"), chave(PLANILHA + "#gid=6"))
+        self.assertNotEqual(chave(PLANILHA), chave("https://docs.google.com/spreadsheets/d/outra/edit"))
+
+if __name__ == "__main__":
+    unittest.main()
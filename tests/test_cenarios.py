@@ -0,0 +1,90 @@
+import contextlib
+import io
+import random # Para montar tabelas aleatórias
+import unittest
+from fractions import Fraction # Para conferir com a conta exata
+from unittest import mock
+import cenarios
+import dinheiro
+from tests.test_agregador import analisador_com
+
+def economia_ingenua(funcionarios, cenario):
+    """
+    A conta do cenário feita do jeito mais simples, pessoa por pessoa e com frações exatas:
+    ordena cada grupo do menos para o mais eficiente, pega os primeiros e soma quem passa do alvo.
+    """
+    multiplicador = cenarios._exato(cenario["fator_encargos"]) * (1 + cenarios._exato(cenario["ajuste_salarial"]))
+    validos = [(departamento, salario, experiencia) for _, departamento, salario, experiencia in funcionarios if salario or experiencia]
+    if cenario["por_departamento"]:
+        grupos = {}
+        for pessoa in validos:
+            grupos.setdefault(pessoa[0], []).append(pessoa)
+    else:
+        grupos = {None: validos}
+    alvos = cenario["alvo"] if isinstance(cenario["alvo"], dict) else {}
+    pessoas, economia = 0, Fraction(0)
+    for departamento, grupo in grupos.items():
+        custos_por_ano = [multiplicador * salario / max(experiencia, 1) for _, salario, experiencia in grupo]
+        alvo = alvos.get(departamento) if isinstance(cenario["alvo"], dict) else cenario["alvo"]
+        alvo = sum(custos_por_ano) / len(grupo) if alvo is None else cenarios._exato(alvo) # Sem alvo: a média do grupo
+        ordem = sorted(range(len(grupo)), key=lambda j: -custos_por_ano[j]) # Empates na ordem da planilha
+        for j in ordem[:cenario["num_otimizar"]]:
+            if custos_por_ano[j] > alvo:
+                pessoas += 1
+                economia += multiplicador * grupo[j][1] - alvo * grupo[j][2]
+    return pessoas, dinheiro.arredondar(economia)
+
+def funcionarios_aleatorios(aleatorio, quantidade):
+    return [(f"P{i}", aleatorio.choice(["TI", "RH", "Vendas"]), aleatorio.choice([0, 150000, 300000, aleatorio.randint(1, 2_000_000)]),
+             aleatorio.randint(0, 12)) for i in range(quantidade)]
+
+class TesteCenarios(unittest.TestCase):
+    def test_igual_a_conta_ingenua(self):
+        aleatorio = random.Random(5)
+        for _ in range(40):
+            funcionarios = funcionarios_aleatorios(aleatorio, aleatorio.randint(1, 25))
+            simulador = cenarios.SimuladorCenarios(analisador_com(funcionarios).data)
+            grade = cenarios.grade(fatores=[Fraction(9, 5), 1.6, 2], ajustes=[0, Fraction(-1, 10), 0.05], quantidades=[0, 1, 3, 100],
+                                   alvos=[None, 50000, 133333, {"TI": 80000, "Vendas": 250000}], por_departamento=[False, True])
+            for cenario, linha in zip(grade, simulador.avaliar(grade, max_processos=0)):
+                with self.subTest(cenario=cenario):
+                    self.assertEqual((linha["pessoas"], linha["economia"]), economia_ingenua(funcionarios, cenario))
+
+    def test_cenario_padrao_perto_da_opcao_6(self):
+        aleatorio = random.Random(8)
+        for _ in range(100):
+            funcionarios = funcionarios_aleatorios(aleatorio, aleatorio.randint(1, 30))
+            analyzer = analisador_com(funcionarios)
+            linha, = analyzer.simular_cenarios(cenarios.grade())
+            economia = sum(round(registro["economia"] * 100) for registro in analyzer.registros("6"))
+            with self.subTest(funcionarios=funcionarios):
+                self.assertLessEqual(abs(linha["economia"] - economia), linha["pessoas"]) # No máximo 1 centavo por pessoa
+
+    def test_com_processos_da_o_mesmo_que_sem(self):
+        funcionarios = funcionarios_aleatorios(random.Random(3), 200)
+        simulador = cenarios.SimuladorCenarios(analisador_com(funcionarios).data)
+        grade = cenarios.grade(fatores=[1.6, 1.8], ajustes=[0, 0.1], quantidades=[1, 5, 50], alvos=[None, 90000, {"RH": 70000}],
+                               por_departamento=[False, True])
+        with mock.patch.object(cenarios, "MINIMO_PARA_PROCESSOS", 0), mock.patch.object(cenarios, "TAMANHO_DO_LOTE", 7): # Grade pequena, mas em lotes e processos
+            self.assertEqual(simulador.avaliar(grade, max_processos=2), simulador.avaliar(grade, max_processos=0))
+
+class TesteLinhaDeComando(unittest.TestCase):
+    def test_valores_invalidos_param_no_argparse(self):
+        for argumentos in (["--ajustes", "-1"], ["--ajustes", "-1.5"], ["--quantidades", "-1"], ["--fatores", "0"], ["--processos", "-2"]):
+            with self.subTest(argumentos=argumentos):
+                with contextlib.redirect_stderr(io.StringIO()) as erro, self.assertRaises(SystemExit) as saida:
+                    cenarios.main(argumentos + ["--sem-cache"])
+                self.assertEqual(saida.exception.code, 2)
+                self.assertIn(argumentos[0], erro.getvalue())
+
+    def test_medicoes_encerradas_mesmo_com_erro(self):
+        medicoes = mock.Mock()
+        analyzer = analisador_com([("A", "TI", 100000, 2)])
+        with mock.patch("instrumentacao.da_linha_de_comando", return_value=medicoes), mock.patch("modo_lote.carregar", return_value=analyzer), \
+             mock.patch.object(analyzer, "simular_cenarios", side_effect=RuntimeError("falhou")):
+            with self.assertRaises(RuntimeError):
+                cenarios.main(["--sem-cache"])
+        medicoes.encerrar.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
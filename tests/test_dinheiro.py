@@ -0,0 +1,43 @@
+import unittest
+from fractions import Fraction
+import dinheiro
+
+class TesteParaCentavos(unittest.TestCase):
+    def test_formatos_aceitos(self):
+        casos = {
+            "5500": 550000, "5500,00": 550000, "5500.00": 550000, "5500,5": 550050, "5.500,50": 550050,
+            "1,234.56": 123456, "1.234.567": 123456700, "1.234.567,89": 123456789, ",50": 50,
+            "-12,34": -1234, " 7,10 ": 710, "1234.5678": 123457, "0,0049": 0, "0,0050": 1,
+        }
+        for texto, centavos in casos.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(dinheiro.para_centavos(texto), centavos)
+
+    def test_tres_digitos_depois_de_um_separador_so_sao_milhar(self):
+        self.assertEqual(dinheiro.para_centavos("6.000"), 600000)
+        self.assertEqual(dinheiro.para_centavos("5.500"), 550000)
+        self.assertEqual(dinheiro.para_centavos("10,000"), 1000000)
+        self.assertEqual(dinheiro.para_centavos("-6.000"), -600000)
+
+    def test_zero_antes_do_separador_e_centavos(self):
+        self.assertEqual(dinheiro.para_centavos("0.500"), 50) # Meio real, não quinhentos
+        self.assertEqual(dinheiro.para_centavos("0,500"), 50)
+        self.assertEqual(dinheiro.para_centavos("-0.505"), -51)
+
+    def test_valores_baguncados(self):
+        for texto in ["1.2.34", "12.34.56", "1000.000", "1.234.5678", "cinco mil", "", "-", "5,5,5", "1.23,45",
+                      "00.000", "01.234", "0.500.000", "00,500"]:
+            with self.subTest(texto=texto):
+                with self.assertRaises(ValueError):
+                    dinheiro.para_centavos(texto)
+
+class TesteArredondamento(unittest.TestCase):
+    def test_meio_centavo_sobe(self):
+        self.assertEqual(dinheiro.custo_total(1), 2) # 1,8 -> 2
+        self.assertEqual(dinheiro.custo_total(-1), -2)
+        self.assertEqual(dinheiro.arredondar(Fraction(5, 2)), 3)
+        self.assertEqual(dinheiro.arredondar(Fraction(-5, 2)), -3)
+        self.assertEqual(dinheiro.formatar(-5), "-0.05")
+
+if __name__ == "__main__":
+    unittest.main()
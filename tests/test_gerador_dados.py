@@ -0,0 +1,53 @@
+import csv
+import io
+import unittest
+from collections import Counter
+import gerador_dados
+from analisador_csv import arrumar_linha
+
+def estragada(linha):
+    """Se a carga descartaria a linha por ter números bagunçados."""
+    try:
+        arrumar_linha(linha)
+    except ValueError:
+        return True
+    return False
+
+class TesteGerador(unittest.TestCase):
+    def test_mesma_semente_mesma_planilha(self):
+        opcoes = {"departamentos": 12, "assimetria": 1.0, "proporcao_inativos": 0.2, "proporcao_baguncadas": 0.05}
+        self.assertEqual(gerador_dados.gerar_csv(500, semente=3, **opcoes), gerador_dados.gerar_csv(500, semente=3, **opcoes))
+        self.assertNotEqual(gerador_dados.gerar_csv(500, semente=3, **opcoes), gerador_dados.gerar_csv(500, semente=4, **opcoes))
+
+    def test_formato_da_planilha(self):
+        linhas = list(csv.reader(io.StringIO(gerador_dados.gerar_csv(200).decode("utf-8"))))
+        self.assertEqual(linhas[0], gerador_dados.COLUNAS)
+        self.assertEqual(len(linhas), 201)
+        self.assertTrue(all(len(linha) == len(gerador_dados.COLUNAS) for linha in linhas[1:]))
+
+    def test_proporcao_de_inativos(self):
+        status = gerador_dados.COLUNAS.index("status_emprego")
+        for proporcao in (0.0, 0.3, 1.0):
+            with self.subTest(proporcao=proporcao):
+                inativos = sum(linha[status] == "Inativo" for linha in gerador_dados.gerar_linhas(20_000, proporcao_inativos=proporcao))
+                self.assertAlmostEqual(inativos / 20_000, proporcao, delta=0.02)
+
+    def test_proporcao_de_baguncadas(self):
+        for proporcao in (0.0, 0.1):
+            with self.subTest(proporcao=proporcao):
+                linhas = [dict(zip(gerador_dados.COLUNAS, linha)) for linha in gerador_dados.gerar_linhas(20_000, proporcao_inativos=0, proporcao_baguncadas=proporcao)]
+                estragadas = sum(map(estragada, linhas)) # As mesmas que a carga descartaria
+                self.assertAlmostEqual(estragadas / 20_000, proporcao, delta=0.01)
+
+    def test_assimetria_enche_as_primeiras_areas(self):
+        departamento = gerador_dados.COLUNAS.index("departamento")
+        iguais = Counter(linha[departamento] for linha in gerador_dados.gerar_linhas(20_000, departamentos=10))
+        self.assertEqual(set(iguais), set(gerador_dados.nomes_dos_departamentos(10)))
+        self.assertLess(max(iguais.values()) / min(iguais.values()), 1.2) # Sem assimetria, todas do mesmo tamanho
+        tortas = Counter(linha[departamento] for linha in gerador_dados.gerar_linhas(20_000, departamentos=10, assimetria=1.5))
+        tamanhos = [tortas[area] for area in gerador_dados.nomes_dos_departamentos(10)]
+        self.assertEqual(tamanhos, sorted(tamanhos, reverse=True)) # As primeiras áreas são as maiores
+        self.assertGreater(tamanhos[0] / tamanhos[-1], 10) # Peso 1 contra 1/10^1,5 (uns 31 vezes)
+
+if __name__ == "__main__":
+    unittest.main()
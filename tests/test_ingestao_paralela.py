@@ -0,0 +1,103 @@
+import http.server
+import threading
+import time
+import unittest
+from unittest import mock
+from ingestao_paralela import BaixadorComConexoes, carregar_varias
+
+CABECALHO = "nome,departamento,salario,experiencia_anos,status_emprego,data_contratacao\n"
+ABAS = { # Caminho -> (segundos que o servidor demora, linhas da aba)
+    "/lenta.csv": (0.4, ["Ana,TI,5000,2,Ativo,2020-01-01", "Bia,RH,4000,3,Ativo,2020-01-01"]),
+    "/media.csv": (0.2, ["Caio,Vendas,6000,4,Ativo,2020-01-01"]),
+    "/rapida.csv": (0.0, ["Davi,TI,7000,5,Ativo,2020-01-01", "Eva,TI,7000,5,Inativo,2020-01-01"]),
+}
+
+class PlanilhasDeMentira(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Mantém a conexão aberta, como o Google
+
+    def do_GET(self):
+        if self.path == "/redireciona.csv": # Manda para outra aba, como o export do Google faz
+            self._responder(302, b"", {"Location": "/rapida.csv"})
+        elif self.path in ABAS:
+            demora, linhas = ABAS[self.path]
+            time.sleep(demora)
+            self._responder(200, (CABECALHO + "\n".join(linhas) + "\n").encode("utf-8"))
+        else:
+            self._responder(404, b"nada aqui")
+
+    def _responder(self, status, corpo, cabecalhos={}):
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+class TesteIngestaoParalela(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), PlanilhasDeMentira)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.servidor.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def test_baixa_ao_mesmo_tempo(self):
+        urls = [self.base + caminho for caminho in ABAS]
+        inicio = time.perf_counter()
+        resultados = dict(BaixadorComConexoes().baixar_varios(urls))
+        tempo = time.perf_counter() - inicio
+        self.assertTrue(all(isinstance(conteudo, bytes) for conteudo in resultados.values()))
+        self.assertLess(tempo, 0.4 + 0.2) # Perto da aba mais lenta (0,4 s), longe da soma de todas (0,6 s)
+
+    def test_link_que_falha_nao_derruba_os_outros(self):
+        resultados = dict(BaixadorComConexoes().baixar_varios([self.base + "/nao_existe.csv", self.base + "/rapida.csv"]))
+        self.assertIsInstance(resultados[self.base + "/nao_existe.csv"], OSError)
+        self.assertIn(b"Davi", resultados[self.base + "/rapida.csv"])
+        armazem, avisos = carregar_varias([self.base + "/nao_existe.csv", self.base + "/media.csv"], max_processos=0)
+        self.assertEqual(list(armazem.nomes), ["Caio"])
+        self.assertTrue(any("nao_existe" in aviso for aviso in avisos))
+
+    def test_segue_redirecionamento(self):
+        self.assertIn(b"Davi", BaixadorComConexoes().baixar(self.base + "/redireciona.csv"))
+
+    def test_junta_na_ordem_dos_links_e_lembra_a_origem(self):
+        urls = [self.base + "/lenta.csv", self.base + "/rapida.csv", self.base + "/media.csv"] # A primeira é a última a chegar
+        for max_processos in (0, 2): # Arrumando aqui mesmo e em outros processos
+            with self.subTest(max_processos=max_processos):
+                armazem, avisos = carregar_varias(urls, max_processos=max_processos)
+                self.assertEqual(avisos, [])
+                self.assertEqual(list(armazem.nomes), ["Ana", "Bia", "Davi", "Caio"]) # Eva está inativa
+                self.assertEqual([armazem.origem(i) for i in range(len(armazem.nomes))], [urls[0], urls[0], urls[1], urls[2]])
+
+    def test_links_da_mesma_aba_entram_uma_vez(self):
+        urls = [self.base + "/media.csv#a", self.base + "/rapida.csv", self.base + "/media.csv#b", self.base + "/rapida.csv"]
+        with mock.patch("ingestao_paralela.montar_url_csv", side_effect=lambda url: url.split("#")[0]): # Como '/edit' e '/edit?usp=sharing' no Google
+            armazem, avisos = carregar_varias(urls, max_processos=0)
+        self.assertEqual(list(armazem.nomes), ["Caio", "Davi"]) # Ninguém repetido
+        self.assertEqual([armazem.origem(i) for i in range(len(armazem))], [urls[0], urls[1]]) # A origem é o primeiro link de cada aba
+        self.assertEqual(len(avisos), 2)
+        self.assertIn(urls[2], avisos[0])
+        self.assertIn(urls[0], avisos[0])
+
+    def test_fecha_as_conexoes_no_fim(self):
+        baixador = BaixadorComConexoes()
+        abertas = []
+        original = baixador._conexao
+        def guardar(esquema, servidor): # Anota cada conexão que os trabalhadores usam
+            conexao = original(esquema, servidor)
+            abertas.append(conexao)
+            return conexao
+        baixador._conexao = guardar
+        list(baixador.baixar_varios([self.base + caminho for caminho in ABAS]))
+        self.assertTrue(abertas)
+        self.assertTrue(all(conexao.sock is None for conexao in abertas)) # Nenhum socket ficou aberto
+
+if __name__ == "__main__":
+    unittest.main()
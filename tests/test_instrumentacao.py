@@ -0,0 +1,73 @@
+import threading
+import time
+import tracemalloc
+import unittest
+from analisador_csv import CSVAnalyzer
+from armazem_funcionarios import ArmazemFuncionarios
+from instrumentacao import DESLIGADA, Instrumentacao
+
+def por_nome(medicoes):
+    return {soma["etapa"]: soma for soma in medicoes.resumo()}
+
+class TesteInstrumentacao(unittest.TestCase):
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_etapas_sao_somadas_e_nao_guardadas(self):
+        medicoes = Instrumentacao()
+        for i in range(10_000): # Como um servidor respondendo muitos pedidos
+            with medicoes.etapa("relatorio") as etapa:
+                etapa.linhas = 2
+        self.assertEqual(por_nome(medicoes)["relatorio"]["vezes"], 10_000)
+        self.assertEqual(por_nome(medicoes)["relatorio"]["linhas"], 20_000)
+        self.assertEqual(len(medicoes._somas), 1) # Uma soma por nome, não uma etapa por pedido
+
+    def test_etapa_dentro_de_outra_mede_so_a_de_dentro(self):
+        medicoes = Instrumentacao(alocacoes=True)
+        with medicoes.etapa("de_fora"):
+            with medicoes.etapa("de_dentro"): # Zeraria o pico da de fora
+                guardado = bytearray(100_000)
+        self.assertGreaterEqual(por_nome(medicoes)["de_dentro"]["pico_memoria"], 100_000)
+        self.assertNotIn("pico_memoria", por_nome(medicoes)["de_fora"])
+        del guardado
+
+    def test_memoria_nao_e_anotada_com_threads_ao_mesmo_tempo(self):
+        medicoes = Instrumentacao(alocacoes=True)
+        juntas = threading.Barrier(2)
+        def medir(nome):
+            with medicoes.etapa(nome):
+                juntas.wait() # As duas etapas rodam ao mesmo tempo
+        threads = [threading.Thread(target=medir, args=(nome,)) for nome in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for nome in ("a", "b"):
+            self.assertNotIn("pico_memoria", por_nome(medicoes)[nome])
+
+    def test_gerador_mede_so_o_proprio_tempo(self):
+        medicoes = Instrumentacao()
+        for _ in medicoes.medir_geracao("registros", range(3)):
+            time.sleep(0.05) # Quem consome demora; isso não é do relatório
+        soma = por_nome(medicoes)["registros"]
+        self.assertEqual(soma["linhas"], 3)
+        self.assertLess(soma["segundos"], 0.05)
+
+    def test_registros_dos_relatorios_sao_medidos(self):
+        armazem = ArmazemFuncionarios()
+        armazem.adicionar("A", "TI", 500000, 2, "2020-01-01")
+        armazem.adicionar("B", "RH", 400000, 3, "2020-01-01")
+        medicoes = Instrumentacao()
+        analyzer = CSVAnalyzer(armazem=armazem, instrumentacao=medicoes)
+        list(analyzer.registros("1"))
+        list(analyzer.linhas_do_comando("4"))
+        self.assertEqual(por_nome(medicoes)["relatorio_custo_por_departamento"]["linhas"], 2)
+        self.assertEqual(por_nome(medicoes)["relatorio_eficiencia_por_experiencia"]["linhas"], 2)
+
+    def test_desligada_nao_embrulha_nada(self):
+        itens = iter([1, 2])
+        self.assertIs(DESLIGADA.medir_geracao("x", itens), itens)
+        self.assertEqual(DESLIGADA.resumo(), [])
+
+if __name__ == "__main__":
+    unittest.main()
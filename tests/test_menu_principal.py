@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import unittest
+import gerador_dados
+import modo_lote
+from servidor_de_teste import servir_csv # O servidor de mentira que entrega um CSV
+
+PASTA = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Onde o menu_principal.py está
+
+class TesteMenuOuLote(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor, cls.url = servir_csv(gerador_dados.gerar_csv(50))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def _rodar(self, *argumentos, entrada=""):
+        return subprocess.run([sys.executable, "menu_principal.py", *argumentos, "--sem-cache", "--url", self.url],
+                              input=entrada, capture_output=True, text=True, cwd=PASTA, timeout=60)
+
+    def test_so_opcoes_abre_o_menu(self):
+        resultado = self._rodar("--instrumentar", entrada="1\n0\n")
+        self.assertIn("Escolha uma opção", resultado.stdout)
+        self.assertIn("relatorio_custo_por_departamento", resultado.stderr) # As medições valeram no menu
+
+    def test_comandos_rodam_sem_menu(self):
+        resultado = self._rodar("2")
+        self.assertNotIn("Escolha uma opção", resultado.stdout)
+        self.assertIn('"comando": "2"', resultado.stdout)
+
+    def test_tem_comandos(self):
+        parser = modo_lote.criar_parser()
+        self.assertFalse(modo_lote.tem_comandos(parser.parse_args(["--instrumentar", "--formato", "csv"])))
+        self.assertTrue(modo_lote.tem_comandos(parser.parse_args(["1"])))
+        self.assertTrue(modo_lote.tem_comandos(parser.parse_args(["--arquivo", "-"])))
+
+if __name__ == "__main__":
+    unittest.main()
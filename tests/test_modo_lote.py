@@ -0,0 +1,80 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import modo_lote
+from analisador_csv import CSVAnalyzer
+from servidor_de_teste import servir_csv
+from tests.test_atualizar import csv_de
+
+LINHAS = [("Ana", "TI", 5500, 2, "Ativo", "2020-01-01"), ("Bia", "RH", "4000.50", 3, "Ativo", "2021-01-01"),
+          ("Caio", "TI", 6000, 0, "Ativo", "2019-01-01"), ("Davi", "Vendas", 7000, 5, "Inativo", "2020-01-01")]
+
+class TesteModoLote(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor, cls.url = servir_csv(csv_de(LINHAS))
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.analyzer = CSVAnalyzer(cls.url, streaming=True) # Para comparar com o que o lote escreve
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def rodar(self, *argumentos, entrada=""):
+        """Roda o lote com esses argumentos e devolve o código de saída e o que foi escrito na saída padrão."""
+        args = modo_lote.criar_parser().parse_args([*argumentos, "--sem-cache", "--url", self.url])
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(io.StringIO()), mock.patch("sys.stdin", io.StringIO(entrada)):
+            codigo = modo_lote.executar_lote(args)
+        return codigo, saida.getvalue()
+
+    def test_jsonl_com_comando_desconhecido(self):
+        codigo, saida = self.rodar("1", "99", "6")
+        self.assertEqual(codigo, 0)
+        registros = [json.loads(linha) for linha in saida.splitlines()]
+        esperado = ([{"comando": "1", **registro} for registro in self.analyzer.registros("1")]
+                    + [{"comando": "99", "erro": "Comando desconhecido: 99"}]
+                    + [{"comando": "6", **registro} for registro in self.analyzer.registros("6")])
+        self.assertEqual(registros, esperado)
+
+    def test_csv_com_um_cabecalho_por_comando(self):
+        codigo, saida = self.rodar("1", "nada", "5", "--formato", "csv")
+        self.assertEqual(codigo, 0)
+        linhas = list(csv.reader(io.StringIO(saida)))
+        blocos = [] # (cabeçalho, linhas) de cada comando
+        for linha in linhas:
+            if linha[0] == "comando": # Começo de um bloco
+                blocos.append((linha, []))
+            else:
+                blocos[-1][1].append(dict(zip(blocos[-1][0], linha)))
+        self.assertEqual([cabecalho for cabecalho, _ in blocos], [["comando", "departamento", "funcionarios", "custo_total"], ["comando", "erro"],
+                                                                   ["comando", "nome", "departamento", "eficiencia"]])
+        self.assertEqual(blocos[0][1], [{"comando": "1", **{chave: str(valor) for chave, valor in registro.items()}} for registro in self.analyzer.registros("1")])
+        self.assertEqual(blocos[1][1], [{"comando": "nada", "erro": "Comando desconhecido: nada"}])
+        self.assertEqual([registro["nome"] for registro in blocos[2][1]], [registro["nome"] for registro in self.analyzer.registros("5")])
+
+    def test_arquivo_da_entrada_padrao_pula_vazias_e_comentarios(self):
+        codigo, saida = self.rodar("2", "--arquivo", "-", entrada="\n# o custo médio de novo\n  3  \n\n#4\n1\n")
+        self.assertEqual(codigo, 0)
+        self.assertEqual([json.loads(linha)["comando"] for linha in saida.splitlines()], ["2", "3"] + ["1"] * len(list(self.analyzer.registros("1"))))
+
+    def test_comandos_de_um_arquivo_depois_dos_da_linha(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as arquivo:
+            arquivo.write("# comandos\n6\n\n 7\n")
+        self.addCleanup(os.remove, arquivo.name)
+        self.assertEqual(list(modo_lote.ler_comandos(["1", "2"], arquivo.name)), ["1", "2", "6", "7"])
+        self.assertEqual(list(modo_lote.ler_comandos(["1"])), ["1"])
+
+    def test_texto_igual_ao_menu(self):
+        codigo, saida = self.rodar("2", "4", "--formato", "texto")
+        self.assertEqual(codigo, 0)
+        self.assertEqual(saida, self.analyzer.process_command("2") + "\n\n" + self.analyzer.process_command("4") + "\n\n")
+
+if __name__ == "__main__":
+    unittest.main()
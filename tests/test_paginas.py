@@ -0,0 +1,77 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from servidor import criar_servidor
+from tests.test_agregador import analisador_com
+
+FUNCIONARIOS = [(f"P{i}", "TI" if i % 2 else "RH", 300000 + i * 1000, 1 + i % 7) for i in range(23)]
+
+class TestePaginasDoRanking(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = analisador_com(FUNCIONARIOS)
+
+    def test_paginas_juntas_dao_o_ranking_inteiro(self):
+        inteiro = list(self.analyzer.registros("4"))
+        juntas = []
+        for pagina in range(1, 4): # 23 funcionários em páginas de 10: 10, 10 e 3
+            juntas.extend(self.analyzer.registros("4", pagina=pagina, por_pagina=10))
+        self.assertEqual(juntas, inteiro) # Mesma ordem e mesmas posições
+
+    def test_texto_de_uma_pagina(self):
+        texto = self.analyzer.process_command("4", pagina=3, por_pagina=10)
+        self.assertIn("página 3 de 3:", texto.splitlines()[0])
+        self.assertEqual(texto.splitlines()[1:], self.analyzer.process_command("4").splitlines()[21:])
+
+    def test_pagina_que_nao_existe(self):
+        for pagina, por_pagina in ((4, 10), (5, 10), (0, 10), (-1, 10), (1, 0), (1, -5)):
+            with self.subTest(pagina=pagina, por_pagina=por_pagina):
+                with self.assertRaises(ValueError):
+                    self.analyzer.process_command("4", pagina=pagina, por_pagina=por_pagina)
+                with self.assertRaises(ValueError): # Logo na chamada, antes de ler o primeiro registro
+                    self.analyzer.registros("4", pagina=pagina, por_pagina=por_pagina)
+
+    def test_comando_sem_paginas(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.process_command("1", pagina=1)
+        with self.assertRaises(ValueError):
+            self.analyzer.registros("5", pagina=1)
+
+class TestePaginasNoServidor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = analisador_com(FUNCIONARIOS)
+        cls.servidor = criar_servidor(cls.analyzer, porta=0)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.servidor.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def _pedir(self, caminho):
+        try:
+            with urllib.request.urlopen(self.base + caminho) as resposta:
+                return resposta.status, resposta.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_pagina_em_json(self):
+        status, corpo = self._pedir("/relatorios/4?formato=json&pagina=2&por_pagina=5")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(corpo), list(self.analyzer.registros("4"))[5:10])
+
+    def test_pagina_em_texto(self):
+        status, corpo = self._pedir("/relatorios/4?pagina=1&por_pagina=5")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(corpo.splitlines()), 1 + 5)
+
+    def test_pagina_invalida(self):
+        for caminho in ("/relatorios/4?pagina=0", "/relatorios/4?pagina=dois", "/relatorios/4?pagina=1&por_pagina=0", "/relatorios/1?pagina=1",
+                        "/relatorios/4?pagina=5&por_pagina=10"):
+            self.assertEqual(self._pedir(caminho)[0], 400, caminho)
+
+if __name__ == "__main__":
+    unittest.main()
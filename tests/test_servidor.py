@@ -0,0 +1,190 @@
+import contextlib
+import http.client
+import io
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from analisador_csv import CSVAnalyzer
+from servidor import criar_servidor
+from servidor_de_teste import servir_csv
+from tests.test_atualizar import csv_de
+
+ANTES = [(f"P{i}", "TI" if i % 2 else "RH", 3000 + i * 10, 1 + i % 5, "Ativo", "2020-01-01") for i in range(40)]
+DEPOIS = ANTES[5:] + [(f"N{i}", "Vendas", 2000 + i, 2, "Ativo", "2020-01-01") for i in range(8)] # Uns saem, outros entram
+COMANDOS = ["1", "2", "3", "4", "5", "6", "7"]
+
+def esperar(condicao, limite=10):
+    """Espera a condição ficar verdadeira (ou o limite de segundos passar)."""
+    fim = time.monotonic() + limite
+    while not condicao() and time.monotonic() < fim:
+        time.sleep(0.01)
+    return condicao()
+
+class TesteServidor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.planilha, cls.url = servir_csv(b"", etag=True) # Conta os downloads e pode segurar a resposta
+        cls.respostas = {} # Planilha -> comando -> registros de uma carga do zero
+        for linhas in (ANTES, DEPOIS):
+            cls.planilha.conteudo = csv_de(linhas)
+            analyzer = cls.carregar()
+            cls.respostas[id(linhas)] = {comando: list(analyzer.registros(comando)) for comando in COMANDOS}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.planilha.shutdown()
+        cls.planilha.server_close()
+
+    @classmethod
+    def carregar(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return CSVAnalyzer(cls.url, streaming=True)
+
+    def setUp(self):
+        self.planilha.conteudo = csv_de(ANTES)
+        self.planilha.liberada.set()
+        self.analyzer = self.carregar()
+        self.planilha.pedidos.clear()
+        self.servidor = criar_servidor(self.analyzer, porta=0)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.servidor.server_port}"
+
+    def tearDown(self):
+        self.planilha.liberada.set()
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def _pedir(self, caminho, metodo="GET"):
+        pedido = urllib.request.Request(self.base + caminho, method=metodo, data=b"" if metodo == "POST" else None)
+        try:
+            with urllib.request.urlopen(pedido, timeout=30) as resposta:
+                return resposta.status, resposta.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_atualizacoes_juntas_viram_um_download_so(self):
+        servico = self.servidor.RequestHandlerClass.servico
+        chegaram = [] # Quem já pediu a atualização ao serviço
+        atualizar = servico.atualizar
+        def contando():
+            chegaram.append(1)
+            return atualizar()
+        servico.atualizar = contando
+
+        self.planilha.liberada.clear() # O primeiro download fica esperando
+        self.planilha.conteudo = csv_de(DEPOIS)
+        respostas = []
+        pedidos = [threading.Thread(target=lambda: respostas.append(self._pedir("/atualizar", "POST"))) for _ in range(5)]
+        for pedido in pedidos:
+            pedido.start()
+        self.assertTrue(esperar(lambda: len(chegaram) == 5 and len(self.planilha.pedidos) >= 1))
+        time.sleep(0.2) # Deixa os que chegaram depois começarem a esperar o primeiro
+        self.planilha.liberada.set()
+        for pedido in pedidos:
+            pedido.join()
+
+        self.assertEqual(len(self.planilha.pedidos), 1)
+        self.assertEqual(len(respostas), 5)
+        for status, corpo in respostas:
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(corpo), {"sucesso": True, "mensagem": "Planilha atualizada: 8 novo(s), 0 alterado(s), 5 removido(s)."})
+        self.assertEqual(json.loads(self._pedir("/metricas")[1])["POST /atualizar"]["pedidos"], 5)
+
+    def test_relatorios_certos_enquanto_atualiza(self):
+        self.planilha.liberada.clear() # Download demorado: os relatórios continuam com os dados de antes
+        self.planilha.conteudo = csv_de(DEPOIS)
+        atualizacao = threading.Thread(target=self._pedir, args=("/atualizar", "POST"))
+        atualizacao.start()
+        self.assertTrue(esperar(lambda: len(self.planilha.pedidos) >= 1))
+        for comando in COMANDOS:
+            self.assertEqual(json.loads(self._pedir(f"/relatorios/{comando}?formato=json")[1]), self.respostas[id(ANTES)][comando])
+        self.planilha.liberada.set()
+        atualizacao.join()
+        for comando in COMANDOS:
+            self.assertEqual(json.loads(self._pedir(f"/relatorios/{comando}?formato=json")[1]), self.respostas[id(DEPOIS)][comando])
+
+        # Leitores o tempo todo enquanto a planilha vai e volta: cada resposta é inteira de uma das duas, nunca uma mistura
+        erros, parar = [], threading.Event()
+        def ler(comando):
+            while not parar.is_set():
+                status, corpo = self._pedir(f"/relatorios/{comando}?formato=json")
+                if status != 200 or json.loads(corpo) not in (self.respostas[id(ANTES)][comando], self.respostas[id(DEPOIS)][comando]):
+                    erros.append((comando, status))
+        leitores = [threading.Thread(target=ler, args=(comando,)) for comando in ("1", "4", "6", "7")]
+        for leitor in leitores:
+            leitor.start()
+        for linhas in (ANTES, DEPOIS, ANTES, DEPOIS):
+            self.planilha.conteudo = csv_de(linhas)
+            self.assertEqual(self._pedir("/atualizar", "POST")[0], 200)
+        parar.set()
+        for leitor in leitores:
+            leitor.join()
+        self.assertEqual(erros, [])
+
+    def test_metricas_contam_os_pedidos(self):
+        for _ in range(3):
+            self._pedir("/saude")
+        self._pedir("/relatorios/2")
+        self._pedir("/relatorios/4?pagina=1&por_pagina=5")
+        metricas = json.loads(self._pedir("/metricas")[1])
+        self.assertEqual(metricas["GET /saude"]["pedidos"], 3)
+        self.assertEqual(metricas["GET /relatorios/2"]["pedidos"], 1)
+        self.assertEqual(metricas["GET /relatorios/4"]["pedidos"], 1)
+        self.assertNotIn("GET /metricas", metricas) # O próprio pedido só conta depois de responder
+        self.assertEqual(set(metricas["GET /saude"]), {"pedidos", "media_ms", "p50_ms", "p99_ms", "max_ms"})
+        self.assertEqual(json.loads(self._pedir("/metricas")[1])["GET /metricas"]["pedidos"], 1)
+
+    def test_saude(self):
+        status, corpo = self._pedir("/saude")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(corpo), {"funcionarios": len(ANTES)})
+
+    def test_comando_ou_endereco_desconhecido_da_404(self):
+        status, corpo = self._pedir("/relatorios/42")
+        self.assertEqual(status, 404)
+        self.assertIn("42", json.loads(corpo)["erro"])
+        self.assertEqual(self._pedir("/nada")[0], 404)
+        self.assertEqual(self._pedir("/relatorios/1", "POST")[0], 404)
+        self.assertEqual(json.loads(self._pedir("/metricas")[1]), {}) # Pedidos errados não entram nas métricas
+
+    def test_formato_desconhecido_da_400(self):
+        status, corpo = self._pedir("/relatorios/1?formato=xml")
+        self.assertEqual(status, 400)
+        self.assertIn("texto, json", json.loads(corpo)["erro"])
+
+    def test_corpo_do_post_nao_atrapalha_o_proximo_pedido(self):
+        conexao = http.client.HTTPConnection("127.0.0.1", self.servidor.server_port, timeout=30)
+        try:
+            conexao.request("POST", "/atualizar", body=b"GET /nada HTTP/1.1\r\n\r\n") # Um corpo que pareceria outro pedido
+            resposta = conexao.getresponse()
+            self.assertEqual(resposta.status, 200)
+            resposta.read()
+            conexao.request("GET", "/saude") # Na mesma conexão
+            resposta = conexao.getresponse()
+            self.assertEqual((resposta.status, json.loads(resposta.read())), (200, {"funcionarios": len(ANTES)}))
+        finally:
+            conexao.close()
+
+    def test_post_sem_tamanho_conhecido(self):
+        conexao = http.client.HTTPConnection("127.0.0.1", self.servidor.server_port, timeout=30)
+        try:
+            conexao.putrequest("POST", "/atualizar")
+            conexao.putheader("Transfer-Encoding", "chunked") # Em pedaços, sem Content-Length
+            conexao.endheaders()
+            self.assertEqual(conexao.getresponse().status, 411)
+        finally:
+            conexao.close()
+        conexao = http.client.HTTPConnection("127.0.0.1", self.servidor.server_port, timeout=30)
+        try:
+            conexao.putrequest("POST", "/atualizar")
+            conexao.putheader("Content-Length", "muito")
+            conexao.endheaders()
+            self.assertEqual(conexao.getresponse().status, 400)
+        finally:
+            conexao.close()
+
+if __name__ == "__main__":
+    unittest.main()
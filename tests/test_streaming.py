@@ -0,0 +1,67 @@
+import contextlib # Para esconder as mensagens da carga
+import io
+import os
+import tempfile # Para a planilha inventada ficar num arquivo, como uma planilha enorme ficaria
+import tracemalloc
+import unittest
+import gerador_dados # Inventa a planilha
+from analisador_csv import CSVAnalyzer
+from instrumentacao import Instrumentacao
+from servidor_de_teste import servir_csv # O servidor de mentira que entrega um CSV
+
+# Quantas linhas a planilha inventada tem. O padrão (uns 9 MB) roda em segundos;
+# com CALCULADORA_TESTE_LINHAS=30000000 ela passa de 2,5 GB e o teste é o mesmo (só demora bem mais).
+LINHAS = int(os.environ.get("CALCULADORA_TESTE_LINHAS", "100000"))
+SOBRA_FIXA = 2**20 # Quanto a leitura pode usar além das colunas guardadas: pedaços do texto e a linha da vez
+SOBRA_POR_LINHA = 16 # Mais a troca de lugar das colunas quando elas crescem (a lista velha e a nova existem juntas por um instante)
+BYTES_POR_LINHA_GUARDADA = 400 # As colunas guardadas crescem com as linhas ativas (nome, data, números)
+
+class TesteLeituraAosPoucos(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8", newline="") as arquivo:
+            gerador_dados.escrever_csv(arquivo, LINHAS, proporcao_baguncadas=0.001)
+        cls.caminho = arquivo.name
+        cls.tamanho = os.path.getsize(cls.caminho)
+        cls.servidor, cls.url = servir_csv(caminho=cls.caminho) # Manda o arquivo aos pedaços, sem ler ele inteiro
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        os.remove(cls.caminho)
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def carregar(self, streaming, medir_memoria=True):
+        medicoes = Instrumentacao(alocacoes=medir_memoria) # Mede a memória de cada etapa com o tracemalloc
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = CSVAnalyzer(self.url, streaming=streaming, instrumentacao=medicoes)
+        return analyzer, {soma["etapa"]: soma for soma in medicoes.resumo()}
+
+    def test_leitura_nao_guarda_o_texto(self):
+        analyzer, etapas = self.carregar(streaming=True)
+        leitura = etapas["leitura_e_validacao"]
+        self.assertEqual(leitura["bytes"], self.tamanho) # Leu a planilha inteira
+        self.assertEqual(leitura["linhas"], LINHAS)
+        self.assertFalse(analyzer.raw_data)
+        sobra = leitura["pico_memoria"] - leitura["memoria_alocada"] # O que a leitura usou e já devolveu: pedaços do texto e a linha da vez
+        self.assertLess(sobra, SOBRA_FIXA + SOBRA_POR_LINHA * len(analyzer.data))
+        self.assertLess(sobra, self.tamanho / 4)
+        # O que fica são as colunas arrumadas: crescem com as linhas ativas, bem menos que o texto virando dicionários
+        self.assertLess(leitura["memoria_alocada"], BYTES_POR_LINHA_GUARDADA * len(analyzer.data))
+
+    def test_sem_streaming_guarda_o_texto_inteiro(self):
+        analyzer, etapas = self.carregar(streaming=False) # Para comparar: o jeito antigo guarda o texto e o raw_data
+        self.assertGreaterEqual(etapas["download"]["pico_memoria"], self.tamanho)
+        self.assertGreater(etapas["csv"]["memoria_alocada"], self.tamanho)
+
+    def test_mesmo_resultado_com_e_sem_streaming(self):
+        com, _ = self.carregar(streaming=True, medir_memoria=False)
+        sem, _ = self.carregar(streaming=False, medir_memoria=False)
+        for comando in ["1", "2", "3", "5", "6", "7"]:
+            self.assertEqual(com.process_command(comando), sem.process_command(comando))
+
+if __name__ == "__main__":
+    unittest.main()